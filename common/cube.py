@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+# Tabel cube agregat: ditulis ETL (etl/cube.py), dibaca dashboard lewat AggregateCube
+CUBE_TABLE = 'agg_app_cube'
+SKETCH_TABLE = 'agg_app_cube_sketch'
+
+# Grain cube: kategori x tipe harga x content rating x bucket rating
+CUBE_DIMENSIONS = ['category', 'price_type', 'content_rating', 'rating_bucket']
+CUBE_METRICS = ['rating', 'total_installs', 'total_reviews', 'size_mb']
+
+
+class AggregateCube:
+    """Cube agregat dari ETL: sel (count, sum, sum of squares) plus sketch kuantil per sel.
+
+    Agregat hasil filter dihitung dengan roll-up sel, tanpa membaca baris fact,
+    selama filter sejajar dengan dimensi cube (lihat select()).
+    """
+
+    def __init__(self, cells, sketches):
+        self.cells = cells.reset_index(drop=True)
+        self.sketches = sketches
+        self.sketch_metrics = set(sketches['metric'].unique())
+
+    @property
+    def total_rows(self):
+        return int(self.cells['row_count'].sum())
+
+    def select(self, categories=None, price_type=None, rating_range=None):
+        """CubeSelection untuk parameter filter sidebar, atau None jika filter tidak sejajar dengan cube.
+
+        Filter rating sejajar jika setiap sel seluruhnya di dalam atau seluruhnya di luar
+        range (dicek dengan rating_min/rating_max sel, perbandingan sama dengan filter_frame).
+        """
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        if categories:
+            mask &= cells['category'].isin(categories).to_numpy()
+        if price_type and price_type != 'all':
+            mask &= (cells['price_type'] == price_type).to_numpy()
+        if rating_range:
+            low, high = rating_range
+            inside = ((cells['rating_min'] >= low) & (cells['rating_max'] <= high)).to_numpy()
+            outside = ((cells['rating_max'] < low) | (cells['rating_min'] > high)
+                       | cells['rating_min'].isna()).to_numpy()
+            if not (inside | outside)[mask].all():
+                return None
+            mask &= inside
+        return CubeSelection(self, mask)
+
+
+class CubeSelection:
+    """Sel cube yang lolos filter; menyediakan roll-up statistik dan kuantil"""
+
+    def __init__(self, cube, mask):
+        self.cube = cube
+        self.cells = cube.cells[mask]
+
+    @property
+    def rows(self):
+        return int(self.cells['row_count'].sum())
+
+    def stats(self, by=None):
+        """Jumlah baris, mean dan std (ddof=1, seperti pandas) per metrik, opsional per dimensi"""
+        sum_columns = ['row_count'] + [
+            f"{metric}_{stat}" for metric in CUBE_METRICS for stat in ('count', 'sum', 'sumsq')
+        ]
+        if by is None:
+            totals = self.cells[sum_columns].sum().to_frame().T
+        else:
+            totals = self.cells.groupby(by)[sum_columns].sum()
+
+        result = pd.DataFrame({'rows': totals['row_count']}, index=totals.index)
+        for metric in CUBE_METRICS:
+            n = totals[f"{metric}_count"]
+            total = totals[f"{metric}_sum"]
+            mean = total / n.where(n > 0)
+            variance = (totals[f"{metric}_sumsq"] - total * mean) / (n - 1).where(n > 1)
+            result[f"{metric}_count"] = n
+            result[f"{metric}_mean"] = mean
+            result[f"{metric}_std"] = np.sqrt(variance.clip(lower=0))
+        return result if by is not None else result.iloc[0]
+
+    def value_counts(self, metric):
+        """Jumlah baris per nilai metrik (dari sketch), urut naik menurut nilai.
+
+        Bucket rating ETL selebar 0.01, jadi untuk rating 1 desimal setiap bucket berisi tepat satu nilai;
+        bucket yang berisi beberapa nilai dihitung pada nilai terkecilnya.
+        """
+        sketch = self.cube.sketches
+        sketch = sketch[(sketch['metric'] == metric) & sketch['cell_id'].isin(self.cells['cell_id'])]
+        return sketch.groupby('value_min')['value_count'].sum().sort_index()
+
+    def quantile(self, metric, q=0.5, by=None, exact=False):
+        """Kuantil dari sketch dengan interpolasi linear antar rank seperti pandas
+        (median jumlah genap = rata-rata dua nilai tengah).
+
+        Rank yang jatuh di bucket berisi satu nilai memberi nilai tepat; bucket berisi beberapa
+        nilai memberi titik tengahnya (error relatif <= 1% untuk bucket log ETL). exact=True
+        mengembalikan None jika ada rank seperti itu, sehingga pemanggil bisa menghitung dari baris data.
+        """
+        sketch = self.cube.sketches
+        sketch = sketch[(sketch['metric'] == metric) & sketch['cell_id'].isin(self.cells['cell_id'])]
+        keys = [by] if by is not None else []
+        if by is not None:
+            sketch = sketch.merge(self.cells[['cell_id', by]], on='cell_id')
+        buckets = sketch.groupby(keys + ['bucket']).agg(
+            value_count=('value_count', 'sum'), value_min=('value_min', 'min'), value_max=('value_max', 'max')
+        ).reset_index()
+
+        if by is not None:
+            cumulative = buckets.groupby(by)['value_count'].cumsum()
+            total = buckets.groupby(by)['value_count'].transform('sum')
+        else:
+            cumulative = buckets['value_count'].cumsum()
+            total = pd.Series(buckets['value_count'].sum(), index=buckets.index)
+        position = q * (total - 1)
+        lower, lower_exact = self._value_at_rank(buckets, cumulative, np.floor(position), by)
+        upper, upper_exact = self._value_at_rank(buckets, cumulative, np.ceil(position), by)
+        if exact and not (lower_exact and upper_exact):
+            return None
+        group = buckets[by] if by is not None else pd.Series(0, index=buckets.index)
+        fraction = (position - np.floor(position)).groupby(group).first()
+        values = lower + (upper - lower) * fraction
+        if by is None:
+            return float(values.iloc[0]) if len(values) else np.nan
+        return pd.Series(values.to_numpy(), index=values.index.to_numpy(), name=metric)
+
+    @staticmethod
+    def _value_at_rank(buckets, cumulative, rank, by):
+        """Nilai (0-based) rank per grup, dari bucket pertama yang cumulative count-nya melewati rank.
+
+        Mengembalikan (nilai, tepat): tepat jika semua bucket itu hanya berisi satu nilai.
+        """
+        hits = buckets[cumulative > rank]
+        group = hits[by] if by is not None else pd.Series(0, index=hits.index)
+        hits = hits.groupby(group).head(1)
+        # Bucket dengan satu nilai memberi nilai tepat, selain itu titik tengah bucket
+        values = (hits['value_min'] + hits['value_max']) / 2
+        values.index = hits[by].to_numpy() if by is not None else np.zeros(len(hits), dtype=int)
+        return values, bool((hits['value_min'] == hits['value_max']).all())
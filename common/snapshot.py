@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # snapshot opsional, tanpa pyarrow dashboard langsung memakai JOIN ke database
+    pa = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_PATH = os.environ.get('DW_SNAPSHOT_PATH', os.path.join(BASE_DIR, '../dw/app_reviews.arrow'))
+EXPORT_DIR = os.environ.get('ETL_EXPORT_DIR', os.path.join(BASE_DIR, '../tables'))
+MANIFEST_NAME = 'manifest.json'
+
+# Naikkan jika kolom/tipe snapshot berubah; dashboard menolak versi yang tidak dikenalnya
+SNAPSHOT_SCHEMA_VERSION = 1
+
+# Join tabel fact ke semua dimensi: dipakai snapshot ETL dan JOIN dashboard (load_data_from_db)
+SNAPSHOT_JOINS = """
+    FROM fact_app_reviews f
+    JOIN dim_app a ON f.app_id = a.app_id
+    JOIN dim_price p ON f.price_id = p.price_id
+    JOIN dim_contentRating c ON f.contentRating_id = c.contentRating_id
+    JOIN dim_device d ON f.device_id = d.device_id
+    JOIN dim_date dt ON f.date_id = dt.date_id
+"""
+
+SNAPSHOT_QUERY = f"""
+    SELECT
+        f.fact_id,
+        a.app_name,
+        a.category,
+        a.genres,
+        a.current_ver,
+        p.price_value,
+        p.price_type,
+        c.content_rating,
+        d.android_version,
+        d.size_mb,
+        dt.release_date,
+        dt.release_month,
+        dt.release_year,
+        f.rating,
+        f.total_reviews,
+        f.total_installs
+    {SNAPSHOT_JOINS}
+    ORDER BY f.fact_id
+"""
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """Baca snapshot Arrow hasil ETL lewat memory map.
+
+    Mengembalikan (DataFrame, metadata) atau None jika file tidak ada, pyarrow
+    tidak terinstall, atau versi schema-nya berbeda.
+    """
+    if pa is None or not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        metadata = {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()}
+        if metadata.get('schema_version') != str(SNAPSHOT_SCHEMA_VERSION):
+            print(f"Snapshot schema versi {metadata.get('schema_version')} tidak didukung, diabaikan")
+            return None
+        # Kolom dictionary Arrow langsung menjadi categorical pandas
+        df = table.to_pandas(date_as_object=True)
+        return df, metadata
+    except Exception as e:
+        print(f"Error membaca snapshot: {e}")
+        return None
+
+
+# ===============================
+# EXPORT TABEL (tables/ + manifest.json)
+# ===============================
+
+def read_export_manifest(export_dir=EXPORT_DIR):
+    """Manifest export ETL (run id, jumlah baris, checksum per tabel) atau None"""
+    try:
+        with open(os.path.join(export_dir, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_exported_table(table_name, export_dir=EXPORT_DIR, manifest=None, verify=False):
+    """Baca satu tabel hasil export sebagai pyarrow.Table lewat memory map (zero-copy).
+
+    Jumlah baris selalu dicek terhadap manifest; verify=True juga mencocokkan
+    checksum file (membaca seluruh file, jadi tidak lagi zero-copy).
+    """
+    if pa is None:
+        raise ImportError("Paket 'pyarrow' belum terinstall (pip install pyarrow)")
+    manifest = manifest or read_export_manifest(export_dir)
+    if manifest is None or manifest.get('format') != 'arrow' or table_name not in manifest['tables']:
+        raise FileNotFoundError(f"Export Arrow untuk {table_name} tidak ditemukan di {export_dir}")
+
+    entry = manifest['tables'][table_name]
+    path = os.path.join(export_dir, entry['file'])
+    if verify and _sha256(path) != entry['sha256']:
+        raise ValueError(f"Checksum {entry['file']} tidak cocok dengan manifest")
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    if table.num_rows != entry['rows']:
+        raise ValueError(f"{entry['file']} berisi {table.num_rows} baris, manifest mencatat {entry['rows']}")
+    return table
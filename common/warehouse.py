@@ -0,0 +1,273 @@
+import os
+import re
+import sqlite3
+import time
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(BASE_DIR, '../dw/schema.sql')
+DEFAULT_SQLITE_PATH = os.path.join(BASE_DIR, '../dw/playstore_dw.db')
+
+# Tipe Python/pandas/numpy yang dikirim ETL sebagai parameter query
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=' '))
+sqlite3.register_adapter(pd.Timestamp, lambda value: value.date().isoformat() if value == value.normalize()
+                         else value.isoformat(sep=' '))
+sqlite3.register_adapter(np.int64, int)
+sqlite3.register_adapter(np.float64, float)
+
+# ===============================
+# SQLITE: adapter supaya query ETL (gaya MySQL) bisa dipakai apa adanya
+# ===============================
+
+def translate_mysql_query(query):
+    """Placeholder %s -> ? dan INSERT IGNORE -> INSERT OR IGNORE"""
+    return query.replace('%s', '?').replace('INSERT IGNORE', 'INSERT OR IGNORE')
+
+
+class SQLiteCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        return self._cursor.execute(translate_mysql_query(query), params)
+
+    def executemany(self, query, rows):
+        return self._cursor.executemany(translate_mysql_query(query), rows)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self):
+        return SQLiteCursor(self._connection.cursor())
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+# ===============================
+# KONFIGURASI BERSAMA (ETL & DASHBOARD)
+# ===============================
+
+def warehouse_url(backend=None, sqlite_path=None):
+    """URL SQLAlchemy sesuai DW_BACKEND (mysql/sqlite).
+
+    Kredensial MySQL dibaca dari DW_HOST, DW_PORT, DW_USER, DW_PASSWORD dan DW_DATABASE,
+    path SQLite dari DW_SQLITE_PATH.
+    """
+    backend = backend or os.environ.get('DW_BACKEND', 'mysql')
+    if backend == 'sqlite':
+        path = os.path.abspath(sqlite_path or os.environ.get('DW_SQLITE_PATH', DEFAULT_SQLITE_PATH))
+        return f"sqlite:///{path}"
+    if backend == 'mysql':
+        return URL.create(
+            'mysql+mysqlconnector',
+            username=os.environ.get('DW_USER', 'root'),
+            password=os.environ.get('DW_PASSWORD', ''),
+            host=os.environ.get('DW_HOST', 'localhost'),
+            port=int(os.environ.get('DW_PORT', 3306)),
+            database=os.environ.get('DW_DATABASE', 'playstoredb'),
+        )
+    raise ValueError(f"Unknown warehouse backend: {backend}")
+
+
+def pool_settings():
+    """Ukuran pool per proses; dengan N worker dashboard, koneksi maksimum = N * (size + overflow)"""
+    return {
+        'pool_size': int(os.environ.get('DW_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DW_POOL_MAX_OVERFLOW', 5)),
+        'pool_recycle': int(os.environ.get('DW_POOL_RECYCLE', 1800)),
+        'pool_timeout': float(os.environ.get('DW_POOL_TIMEOUT', 30)),
+        'pool_pre_ping': True,
+    }
+
+
+def create_warehouse_engine(backend=None, sqlite_path=None, allow_local_infile=False):
+    """Engine SQLAlchemy ber-pool untuk warehouse, dipakai ETL maupun dashboard"""
+    url = warehouse_url(backend, sqlite_path)
+    if str(url).startswith('sqlite'):
+        engine = create_engine(url, connect_args={'timeout': 30}, **pool_settings())
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            # WAL supaya dashboard bisa membaca selama ETL menulis
+            dbapi_connection.execute("PRAGMA journal_mode=WAL")
+            dbapi_connection.execute("PRAGMA synchronous=NORMAL")
+            dbapi_connection.execute("PRAGMA temp_store=MEMORY")
+        return engine
+    return create_engine(url, connect_args={'allow_local_infile': allow_local_infile}, **pool_settings())
+
+
+# ===============================
+# BACKEND WAREHOUSE (ETL)
+# ===============================
+
+class PooledWarehouse:
+    """Koneksi DB-API dari satu engine SQLAlchemy ber-pool per backend.
+
+    close() pada koneksi mengembalikannya ke pool. Waktu tunggu checkout dicatat
+    di checkout_count/checkout_wait/max_checkout_wait.
+    """
+
+    def __init__(self):
+        self._engines = {}
+        self.checkout_count = 0
+        self.checkout_wait = 0.0
+        self.max_checkout_wait = 0.0
+
+    def _create_engine(self, allow_local_infile):
+        raise NotImplementedError
+
+    def engine(self, allow_local_infile=False):
+        if allow_local_infile not in self._engines:
+            self._engines[allow_local_infile] = self._create_engine(allow_local_infile)
+        return self._engines[allow_local_infile]
+
+    def _checkout(self, allow_local_infile=False):
+        start = time.perf_counter()
+        connection = self.engine(allow_local_infile).raw_connection()
+        wait = time.perf_counter() - start
+        self.checkout_count += 1
+        self.checkout_wait += wait
+        self.max_checkout_wait = max(self.max_checkout_wait, wait)
+        return connection
+
+    def connect(self, allow_local_infile=False):
+        return self._checkout(allow_local_infile)
+
+    def pool_summary(self):
+        average = self.checkout_wait / self.checkout_count * 1000 if self.checkout_count else 0.0
+        return (f"{self.checkout_count} checkouts, avg wait {average:.1f}ms, "
+                f"max wait {self.max_checkout_wait * 1000:.1f}ms")
+
+    def dispose(self):
+        for engine in self._engines.values():
+            engine.dispose()
+        self._engines = {}
+
+
+class MySQLWarehouse(PooledWarehouse):
+    name = 'mysql'
+    supports_load_data = True
+    fact_batch_size = 1000
+
+    def _create_engine(self, allow_local_infile):
+        return create_warehouse_engine('mysql', allow_local_infile=allow_local_infile)
+
+    def ensure_schema(self, conn):
+        # Schema MySQL dibuat manual dari dw/schema.sql (lihat README)
+        pass
+
+    def existing_indexes(self, conn, table):
+        """{nama index: (kolom berurutan, unique)}"""
+        cur = conn.cursor()
+        try:
+            cur.execute(f"SHOW INDEX FROM {table}")
+            rows = sorted(cur.fetchall(), key=lambda row: (row[2], row[3]))
+        finally:
+            cur.close()
+        indexes = {}
+        for row in rows:
+            columns, _ = indexes.get(row[2], ((), None))
+            indexes[row[2]] = (columns + (row[4],), not int(row[1]))
+        return indexes
+
+    def explain(self, conn, query):
+        """Satu baris per tabel: akses, index yang dipakai dan estimasi baris"""
+        cur = conn.cursor()
+        try:
+            cur.execute(f"EXPLAIN {query}")
+            columns = [column[0] for column in cur.description]
+            plans = [dict(zip(columns, row)) for row in cur.fetchall()]
+        finally:
+            cur.close()
+        return [f"{plan.get('table')}: type={plan.get('type')} key={plan.get('key')} "
+                f"rows={plan.get('rows')} {plan.get('Extra') or ''}".strip() for plan in plans]
+
+
+class SQLiteWarehouse(PooledWarehouse):
+    """Warehouse embedded di satu file SQLite (WAL), untuk mesin tanpa server MySQL"""
+    name = 'sqlite'
+    supports_load_data = False
+    # Satu executemany per chunk = satu transaksi per tabel per chunk
+    fact_batch_size = 100000
+
+    def __init__(self, path=DEFAULT_SQLITE_PATH):
+        super().__init__()
+        self.path = path
+
+    def _create_engine(self, allow_local_infile):
+        return create_warehouse_engine('sqlite', sqlite_path=self.path)
+
+    def connect(self, allow_local_infile=False):
+        return SQLiteConnection(self._checkout())
+
+    def ensure_schema(self, conn):
+        """Buat tabel dari dw/schema.sql (SERIAL -> INTEGER PRIMARY KEY) jika belum ada"""
+        with open(SCHEMA_PATH) as f:
+            schema = f.read()
+        schema = schema.replace('SERIAL PRIMARY KEY', 'INTEGER PRIMARY KEY AUTOINCREMENT')
+        schema = re.sub(r'CREATE TABLE (?!IF NOT EXISTS)', 'CREATE TABLE IF NOT EXISTS ', schema)
+        conn._connection.executescript(schema)
+
+    def existing_indexes(self, conn, table):
+        """{nama index: (kolom berurutan, unique)}"""
+        cur = conn.cursor()
+        try:
+            cur.execute(f"PRAGMA index_list({table})")
+            index_list = cur.fetchall()
+            indexes = {}
+            for row in index_list:
+                cur.execute(f"PRAGMA index_info({row[1]})")
+                indexes[row[1]] = (tuple(info[2] for info in sorted(cur.fetchall())), bool(row[2]))
+            return indexes
+        finally:
+            cur.close()
+
+    def explain(self, conn, query):
+        cur = conn.cursor()
+        try:
+            cur.execute(f"EXPLAIN QUERY PLAN {query}")
+            return [row[3] for row in cur.fetchall()]
+        finally:
+            cur.close()
+
+
+def create_warehouse(backend=None):
+    """Backend warehouse sesuai DW_BACKEND (mysql/sqlite), path SQLite dari DW_SQLITE_PATH"""
+    backend = backend or os.environ.get('DW_BACKEND', 'mysql')
+    if backend == 'sqlite':
+        return SQLiteWarehouse(os.environ.get('DW_SQLITE_PATH', DEFAULT_SQLITE_PATH))
+    if backend == 'mysql':
+        return MySQLWarehouse()
+    raise ValueError(f"Unknown warehouse backend: {backend}")
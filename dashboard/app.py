@@ -1,5 +1,5 @@
 import dash
-from dash import dcc, html, Input, Output, State, callback_context, dash_table
+from dash import dcc, html, Input, Output, State, Patch, callback_context, dash_table
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -7,21 +7,125 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, date
 import os
-import mysql.connector
-from sqlalchemy import create_engine
+import sys
+import hashlib
+import json
 import warnings
+from flask import jsonify
 warnings.filterwarnings('ignore')
 
+# common/ (konfigurasi warehouse, cube dan snapshot bersama ETL) ada di root repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
 # Import functions and styles from other files
 from functions import *
 from styles import *
+from datasets import create_registry, make_filter_spec, next_overlay_key, next_candidate_id, overlay_frame
+from cache import create_cache, filter_cache_key
+from query_engine import create_query_engine
+from warehouse import pool_stats
+from refresher import create_refresher
 
 # ===============================
 # KONEKSI DATABASE & LOAD DATA
 # ===============================
 
-# Memuat data awal
-df = load_data_from_db()
+# Dataset tinggal di memori server; browser hanya menyimpan version id
+registry = create_registry()
+
+# Saat import hanya ringkasan run ETL terakhir yang dibaca (untuk layout); dataset dimuat
+# saat callback pertama membutuhkannya, run ETL berikutnya dimuat ulang oleh thread latar belakang
+refresher = create_refresher(registry, load_data_from_db, load_cube_from_db, fetch_latest_run_id,
+                             compute_dataset_summary)
+latest_run_id, latest_summary = fetch_latest_run_summary()
+if latest_summary is not None:
+    refresher.prime(latest_run_id, latest_summary)
+else:
+    # Database tidak bisa dicek atau run ETL lama tanpa ringkasan: muat dataset sekarang
+    refresher.load(latest_run_id)
+refresher.start()
+
+def get_dataset(dataset_ref):
+    """DataFrame untuk isi app-data-store ({'version': ...}), fallback ke dataset aktif"""
+    state = refresher.ensure_loaded()
+    version = dataset_ref.get('version') if dataset_ref else state.version
+    dataset = registry.get(version)
+    return dataset if dataset is not None else state.df
+
+def resolve_version(dataset_ref):
+    """Version id yang datasetnya benar-benar tersedia (versi yang sudah tergusur -> dataset aktif)"""
+    state = refresher.ensure_loaded()
+    version = dataset_ref.get('version') if dataset_ref else state.version
+    return version if registry.get(version) is not None else state.version
+
+# Statistik referensi analisis aplikasi baru, dibangun sekali per versi dataset
+reference_cache = create_cache('reference', default_size=8)
+
+def get_reference_index(dataset_ref):
+    version = resolve_version(dataset_ref)
+    return reference_cache.get_or_compute(version, lambda: ReferenceIndex(get_dataset({'version': version})))
+
+# Figure analisis aplikasi baru tinggal di server; analysis-results-store hanya berisi handle + parameter
+analysis_cache = create_cache('analysis', default_size=64)
+
+def analysis_handle(version, new_app):
+    """Handle deterministik, sehingga worker lain bisa membangun ulang hasil yang sama"""
+    payload = json.dumps({'version': version, 'app': new_app}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+def get_analysis_results(analysis_ref):
+    """Hasil analysis-results-store ({handle, version, app}) dari cache, dibangun jika belum ada"""
+    return analysis_cache.get_or_compute(
+        analysis_ref['handle'],
+        lambda: build_analysis_results(analysis_ref['app'], get_reference_index({'version': analysis_ref['version']}))
+    )
+
+def get_cube_rollup(filter_spec):
+    """CubeSelection untuk filter spec, None jika tidak ada cube untuk versinya atau filter tidak sejajar"""
+    cube = refresher.cubes.get(filter_spec.get('version'))
+    if cube is None:
+        return None
+    return cube.select(filter_spec.get('categories'), filter_spec.get('price_type'),
+                       filter_spec.get('rating_range'))
+
+# Cache hasil filter dan agregat per tab, key: (version, kategori, tipe harga, range rating)
+# Hasil filter dataset dasar dipakai bersama semua sesi; agregat juga di-key dengan overlay sesi
+filter_cache = create_cache('filter', default_max_mb=256)
+aggregate_cache = create_cache('aggregate', default_size=192)
+
+def get_filtered_frame(filter_spec, dataset_ref, candidates=None):
+    """Hasil filter dataset dasar (dari cache) digabung dengan kandidat sesi yang lolos filter"""
+    base = filter_cache.get_or_compute(
+        filter_cache_key(filter_spec),
+        lambda: resolve_filter_spec(registry, filter_spec, fallback=get_dataset(dataset_ref))
+    )
+    overlay = overlay_frame(candidates)
+    if overlay is None:
+        return base
+    overlay = filter_frame(overlay, filter_spec.get('categories'), filter_spec.get('price_type'),
+                           filter_spec.get('rating_range'))
+    if overlay.empty:
+        return base
+    return apply_schema(pd.concat([base, overlay], ignore_index=True))
+
+# Engine analitik opsional (DASHBOARD_QUERY_ENGINE=duckdb)
+query_engine = create_query_engine()
+
+def get_tab_aggregates(active_tab, filter_spec, dataset_ref, candidates=None):
+    """Agregat tab dari cache; None jika hasil filter kosong"""
+    overlay_key = filter_spec.get('overlay') if candidates else None
+    
+    def build():
+        # Cube dan engine hanya berisi dataset dasar, jadi sesi dengan overlay memakai jalur pandas
+        return compute_tab_aggregates(
+            active_tab, filter_spec,
+            get_dataset=lambda: get_dataset(filter_spec),
+            get_filtered=lambda spec: get_filtered_frame(spec, dataset_ref, candidates),
+            rollup=get_cube_rollup(filter_spec) if overlay_key is None else None,
+            engine=query_engine if overlay_key is None else None,
+        )
+    
+    return aggregate_cache.get_or_compute((active_tab,) + filter_cache_key(filter_spec) + (overlay_key,), build)
 
 # ===============================
 # INISIALISASI APLIKASI DASH
@@ -34,41 +138,74 @@ app.title = "Dashboard Analisis Google Play Store"
 external_stylesheets = ['https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css']
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
+@app.server.route('/cache-stats')
+def cache_stats():
+    # Counter hit/miss untuk monitoring
+    return jsonify([filter_cache.stats(), aggregate_cache.stats(), reference_cache.stats(), analysis_cache.stats()])
+
+@app.server.route('/pool-stats')
+def warehouse_pool_stats():
+    # Waktu tunggu checkout dan pemakaian pool koneksi warehouse proses ini
+    return jsonify(pool_stats())
+
 # Layout Utama
-app.layout = html.Div([
-    create_header(df),
+def build_layout(state):
+    """Layout untuk satu versi dataset; hanya memakai ringkasan, bukan baris data"""
+    summary = state.summary
+    return html.Div([
+        create_header(summary),
     
-    html.Div([
-        # Sidebar dengan filter (tanpa visualisasi)
         html.Div([
-            create_filters(df),
-            create_data_input(df)  # Form input tetap di sidebar
-        ], className="sidebar"),
+            # Sidebar dengan filter (tanpa visualisasi)
+            html.Div([
+                create_filters(summary),
+                create_data_input(summary)  # Form input tetap di sidebar
+            ], className="sidebar"),
         
-        # Area konten utama yang diperluas
-        html.Div([
-            # Tab untuk berbagai analisis
-            dcc.Tabs(id="main-tabs", value='overview', children=[
-                dcc.Tab(label='📊 Gambaran Pasar', value='overview', className="custom-tab"),
-                dcc.Tab(label='🚀 Faktor Kesuksesan', value='success-factors', className="custom-tab"),
-                dcc.Tab(label='💰 Monetisasi', value='revenue-insights', className="custom-tab"),
-                dcc.Tab(label='🔍 Analisis Aplikasi Baru', value='app-analysis', className="custom-tab"),
-            ], className="custom-tabs"),
+            # Area konten utama yang diperluas
+            html.Div([
+                # Tab untuk berbagai analisis
+                dcc.Tabs(id="main-tabs", value='overview', children=[
+                    dcc.Tab(label='📊 Gambaran Pasar', value='overview', className="custom-tab"),
+                    dcc.Tab(label='🚀 Faktor Kesuksesan', value='success-factors', className="custom-tab"),
+                    dcc.Tab(label='💰 Monetisasi', value='revenue-insights', className="custom-tab"),
+                    dcc.Tab(label='🔍 Analisis Aplikasi Baru', value='app-analysis', className="custom-tab"),
+                ], className="custom-tabs"),
             
-            # Area konten yang berubah berdasarkan tab
-            dcc.Loading(
-                id="loading-tab-content",
-                type="circle",
-                children=html.Div(id='tab-content', className="tab-content")
-            )
-        ], className="main-content")
-    ], className="dashboard-body"),
+                # Area konten yang berubah berdasarkan tab
+                dcc.Loading(
+                    id="loading-tab-content",
+                    type="circle",
+                    children=html.Div(id='tab-content', className="tab-content")
+                )
+            ], className="main-content")
+        ], className="dashboard-body"),
     
-    # Komponen penyimpanan data
-    dcc.Store(id='filtered-data-store'),
-    dcc.Store(id='app-data-store', data=df.to_dict('records') if not df.empty else []),
-    dcc.Store(id='analysis-results-store'),  # Store baru untuk hasil analisis
-], className="dashboard-container")
+        # Komponen penyimpanan data
+        dcc.Store(id='filtered-data-store'),
+        dcc.Store(id='app-data-store', data={'version': state.version, 'overlay': None, 'candidate_count': 0}),
+        dcc.Store(id='candidate-store', data=[]),  # Kandidat aplikasi sesi ini (append-only)
+        dcc.Store(id='analysis-results-store'),  # Store baru untuk hasil analisis
+
+        # Cek berkala apakah dataset di server sudah diganti oleh refresher
+        dcc.Interval(id='dataset-refresh-interval', interval=max(refresher.interval, 1) * 1000,
+                     disabled=refresher.interval <= 0),
+    ], className="dashboard-container")
+
+# Layout terakhir yang dibuat, di-cache per versi dataset
+_layout_cache = {}
+
+def serve_layout():
+    """Dipanggil Dash setiap page load; layout dibuat ulang hanya jika versi dataset berubah"""
+    state = refresher.state
+    layout = _layout_cache.get(state.version)
+    if layout is None:
+        layout = build_layout(state)
+        _layout_cache.clear()
+        _layout_cache[state.version] = layout
+    return layout
+
+app.layout = serve_layout
 
 # ===============================
 # FUNGSI CALLBACK UTAMA
@@ -81,12 +218,45 @@ app.layout = html.Div([
      Input('rating-range', 'value'),
      Input('app-data-store', 'data')]
 )
-def update_filtered_data(categories, price_type, rating_range, stored_data):
-    return filter_data(categories, price_type, rating_range, stored_data)
+def update_filtered_data(categories, price_type, rating_range, dataset_ref):
+    # Yang dikirim ke browser hanya version id, key overlay + parameter filter, bukan baris data
+    version = (dataset_ref or {}).get('version') or refresher.ensure_loaded().version
+    overlay = dataset_ref.get('overlay') if dataset_ref else None
+    return make_filter_spec(version, categories, price_type, rating_range, overlay)
+
+@app.callback(
+    [Output('app-data-store', 'data', allow_duplicate=True),
+     Output('category-filter', 'options'),
+     Output('input-category', 'options'),
+     Output('rating-range', 'min'),
+     Output('rating-range', 'max')] +
+    [Output(metric_id, 'children') for metric_id in HEADER_METRIC_IDS],
+    [Input('dataset-refresh-interval', 'n_intervals')],
+    [State('app-data-store', 'data')],
+    prevent_initial_call='initial_duplicate'
+)
+def sync_dataset_version(n_intervals, dataset_ref):
+    # Hanya membaca state refresher (tidak pernah menunggu reload); thread dijalankan ulang jika worker hasil fork
+    refresher.start()
+    state = refresher.ensure_loaded()
+    version = dataset_ref.get('version') if dataset_ref else None
+    if version == state.version:
+        raise dash.exceptions.PreventUpdate
+    summary = state.summary
+    category_options = [{'label': cat, 'value': cat} for cat in summary['categories']]
+    # Kandidat sesi ada di overlay terpisah, jadi semua sesi ikut pindah ke dataset baru
+    return [
+        dict(dataset_ref or {}, version=state.version),
+        category_options,
+        category_options,
+        summary['rating_min'],
+        summary['rating_max'],
+    ] + format_header_metrics(summary)
 
 @app.callback(
     [
         Output('app-data-store', 'data'),
+        Output('candidate-store', 'data'),
         Output('add-app-output', 'children'),
         Output('analysis-results-store', 'data')
     ],
@@ -101,7 +271,7 @@ def update_filtered_data(categories, price_type, rating_range, stored_data):
     ],
     prevent_initial_call=True
 )
-def analyze_new_app(n_clicks, app_name, category, rating, installs, size, current_data):
+def analyze_new_app(n_clicks, app_name, category, rating, installs, size, dataset_ref):
     if n_clicks is None or n_clicks == 0:
         raise dash.exceptions.PreventUpdate
     
@@ -109,6 +279,7 @@ def analyze_new_app(n_clicks, app_name, category, rating, installs, size, curren
         # Validasi input
         if not all([app_name, category, rating, installs, size]):
             return [
+                dash.no_update,
                 dash.no_update,
                 html.Div("⚠️ Harap isi semua field yang diperlukan!", className="error-message"),
                 dash.no_update
@@ -121,11 +292,16 @@ def analyze_new_app(n_clicks, app_name, category, rating, installs, size, curren
         
         if not (1 <= rating <= 5):
             return [
+                dash.no_update,
                 dash.no_update,
                 html.Div("⚠️ Rating harus antara 1 sampai 5!", className="error-message"),
                 dash.no_update
             ]
         
+        dataset_ref = dataset_ref or {}
+        candidate_count = dataset_ref.get('candidate_count', 0)
+        reference_version = resolve_version(dataset_ref)
+        
         # Buat entri aplikasi baru
         new_app = {
             'app_name': app_name,
@@ -135,21 +311,22 @@ def analyze_new_app(n_clicks, app_name, category, rating, installs, size, curren
             'size_mb': size,
             'price_type': 'Free',
             'release_year': datetime.now().year,
-            'fact_id': len(current_data) + 1 if current_data else 1
+            'fact_id': next_candidate_id(candidate_count)
         }
         
-        # Update data store
-        updated_data = current_data + [new_app] if current_data else [new_app]
+        # Kandidat ditambahkan ke overlay sesi; dataset dasar tidak disalin maupun dikirim ulang
+        candidates = Patch()
+        candidates.append(new_app)
+        updated_ref = dict(dataset_ref, overlay=next_overlay_key(dataset_ref.get('overlay'), new_app),
+                           candidate_count=candidate_count + 1)
         
-        # Buat semua visualisasi
-        analysis_results = {
-            'app_name': app_name,
-            'rating_fig': create_rating_comparison(new_app, current_data),
-            'installs_fig': create_installs_comparison(new_app, current_data),
-            'radar_fig': create_radar_analysis(new_app, current_data),
-            'trend_fig': create_category_trend(new_app, current_data),
-            'comparison_table': create_comparison_table(new_app, current_data)
+        # Visualisasi dibangun sekali di server; browser hanya menerima parameter kandidat dan handle
+        analysis_ref = {
+            'handle': analysis_handle(reference_version, new_app),
+            'version': reference_version,
+            'app': new_app,
         }
+        get_analysis_results(analysis_ref)
         
         # Pesan sukses
         success_msg = html.Div([
@@ -158,9 +335,10 @@ def analyze_new_app(n_clicks, app_name, category, rating, installs, size, curren
         ], className="success-message")
         
         return [
-            updated_data,
+            updated_ref,
+            candidates,
             success_msg,
-            analysis_results
+            analysis_ref
         ]
         
     except Exception as e:
@@ -170,6 +348,7 @@ def analyze_new_app(n_clicks, app_name, category, rating, installs, size, curren
         ], className="error-message")
         
         return [
+            dash.no_update,
             dash.no_update,
             error_msg,
             dash.no_update
@@ -180,63 +359,29 @@ def analyze_new_app(n_clicks, app_name, category, rating, installs, size, curren
     [Input('main-tabs', 'value'),
      Input('filtered-data-store', 'data'),
      Input('analysis-results-store', 'data')],
-    [State('app-data-store', 'data')]
+    [State('app-data-store', 'data'),
+     State('candidate-store', 'data')]
 )
-def render_tab_content(active_tab, filtered_data, analysis_results, app_data):
+def render_tab_content(active_tab, filter_spec, analysis_ref, dataset_ref, candidates):
     ctx = dash.callback_context
     
     # Handle ketika tab analysis dipilih dan ada hasil analisis
-    if active_tab == 'app-analysis' and analysis_results:
-        # Buat layout dari hasil analisis yang tersimpan
-        return html.Div([
-            html.H3(f"Analisis Aplikasi: {analysis_results['app_name']}", className="analysis-header"),
-            
-            # Baris pertama visualisasi
-            html.Div([
-                html.Div([
-                    dcc.Graph(figure=analysis_results['rating_fig'], className="analysis-graph"),
-                    html.P("Perbandingan Rating", className="analysis-description")
-                ], className="analysis-card"),
-                
-                html.Div([
-                    dcc.Graph(figure=analysis_results['installs_fig'], className="analysis-graph"),
-                    html.P("Perbandingan Jumlah Install", className="analysis-description")
-                ], className="analysis-card"),
-            ], className="analysis-row"),
-            
-            # Baris kedua visualisasi
-            html.Div([
-                html.Div([
-                    dcc.Graph(figure=analysis_results['radar_fig'], className="analysis-graph"),
-                    html.P("Analisis Komprehensif", className="analysis-description")
-                ], className="analysis-card"),
-                
-                html.Div([
-                    dcc.Graph(figure=analysis_results['trend_fig'], className="analysis-graph"),
-                    html.P("Trend Kategori", className="analysis-description")
-                ], className="analysis-card"),
-            ], className="analysis-row"),
-            
-            # Tabel perbandingan
-            html.Div([
-                html.H4("Ringkasan Perbandingan", className="table-header"),
-                analysis_results['comparison_table']
-            ], className="analysis-table-container")
-        ], className="analysis-main-content")
+    if active_tab == 'app-analysis' and analysis_ref:
+        # Figure diambil dari cache server berdasarkan handle di store
+        return render_analysis_content(analysis_ref['app']['app_name'], get_analysis_results(analysis_ref))
     
     # Handle untuk tab lainnya
-    if not filtered_data:
+    if not filter_spec:
         return html.Div("Tidak ada data yang tersedia dengan filter saat ini.", className="no-data-message")
     
     try:
-        df = pd.DataFrame(filtered_data)
-        
-        if active_tab == 'overview':
-            return create_overview_content(df)
-        elif active_tab == 'success-factors':
-            return create_success_factors_content(df)
-        elif active_tab == 'revenue-insights':
-            return create_revenue_insights_content(df)
+        if active_tab in TAB_AGGREGATES:
+            # Filter + agregat di-cache per (tab, version, parameter filter, overlay)
+            aggregates = get_tab_aggregates(active_tab, filter_spec, dataset_ref, candidates)
+            if aggregates is None:
+                return html.Div("Tidak ada data yang tersedia dengan filter saat ini.", className="no-data-message")
+            _, render = TAB_AGGREGATES[active_tab]
+            return render(aggregates)
         elif active_tab == 'app-analysis':
             return html.Div([
                 html.H3("Analisis Aplikasi Baru", className="analysis-header"),
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def _sizeof(value):
+    """Perkiraan ukuran nilai cache dalam byte (DataFrame dihitung dari memory_usage)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, dict):
+        return sum(_sizeof(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Cache LRU thread-safe dengan batas jumlah entri, batas ukuran (byte) dan TTL.
+
+    Counter hit/miss/eviction bisa dibaca lewat stats() untuk monitoring.
+    """
+
+    def __init__(self, name, maxsize=128, ttl=600, max_bytes=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Kembalikan (found, value)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < now:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[2]
+
+    def set(self, key, value):
+        size = _sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.maxsize
+                or (self.max_bytes and self._bytes > self.max_bytes and len(self._entries) > 1)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        found, value = self.get(key)
+        if found:
+            return value
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
+
+
+def filter_cache_key(filter_spec):
+    """Key cache dari filter spec yang dinormalisasi (urutan kategori tidak berpengaruh)"""
+    if not filter_spec:
+        return None
+    rating_range = filter_spec.get('rating_range')
+    return (
+        filter_spec.get('version'),
+        tuple(sorted(filter_spec.get('categories') or [])),
+        filter_spec.get('price_type') or 'all',
+        tuple(round(float(value), 2) for value in rating_range) if rating_range else None,
+    )
+
+
+def create_cache(name, default_size=64, default_max_mb=None):
+    """Cache sesuai konfigurasi environment per cache, mis. untuk name='filter':
+    DASHBOARD_FILTER_CACHE_SIZE, DASHBOARD_FILTER_CACHE_MAX_MB dan DASHBOARD_FILTER_CACHE_TTL
+
+    Ukuran tiap cache punya default sendiri, jadi tidak ada variabel bersama yang menimpanya;
+    TTL yang tidak diatur per cache memakai DASHBOARD_CACHE_TTL (default 600 detik).
+    """
+    prefix = f"DASHBOARD_{name.upper()}_CACHE"
+    max_mb = os.environ.get(f'{prefix}_MAX_MB', default_max_mb)
+    return LRUCache(
+        name,
+        maxsize=int(os.environ.get(f'{prefix}_SIZE', default_size)),
+        ttl=float(os.environ.get(f'{prefix}_TTL', os.environ.get('DASHBOARD_CACHE_TTL', 600))),
+        max_bytes=int(float(max_mb) * 1024 * 1024) if max_mb else None,
+    )
@@ -7,8 +7,12 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, date
 import os
-import mysql.connector
-from sqlalchemy import create_engine
+import sys
+
+# common/ (konfigurasi warehouse, cube dan snapshot bersama ETL) ada di root repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from warehouse import raw_connection, warehouse_connection
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -17,15 +21,9 @@ warnings.filterwarnings('ignore')
 # ===============================
 
 def create_connection():
-    """Membuat koneksi ke database MySQL"""
+    """Membuat koneksi ke database MySQL (dari pool bersama, lihat warehouse.py)"""
     try:
-        return mysql.connector.connect(
-            host="localhost",
-            user="root",  
-            password="",
-            database="playstoredb",
-            port=3306
-        )
+        return raw_connection()
     except Exception as e:
         print(f"Error koneksi database: {e}")
         return None
@@ -33,7 +31,6 @@ def create_connection():
 def load_data_from_db():
     """Memuat data dari database MySQL"""
     try:
-        engine = create_engine("mysql+mysqlconnector://root:@localhost:3306/playstoredb")
         query = """
         SELECT 
             f.fact_id,
@@ -59,8 +56,8 @@ def load_data_from_db():
         JOIN dim_device d ON f.device_id = d.device_id
         JOIN dim_date dt ON f.date_id = dt.date_id
         """
-        df = pd.read_sql_query(query, engine)
-        engine.dispose()
+        with warehouse_connection() as connection:
+            df = pd.read_sql_query(query, connection)
         return df
     except Exception as e:
         print(f"Error memuat data: {e}")
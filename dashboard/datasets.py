@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from schema import apply_schema
+
+try:
+    import redis
+except ImportError:  # backend redis opsional
+    redis = None
+
+# ===============================
+# BACKEND PENYIMPANAN DATASET
+# ===============================
+
+class DiskBackend:
+    """Simpan dataset sebagai file pickle, bisa dibaca semua worker di mesin yang sama"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, version):
+        return os.path.join(self.directory, f"dataset-{version}.pkl")
+
+    def save(self, version, df):
+        path = self._path(version)
+        if os.path.exists(path):
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, version):
+        try:
+            with open(self._path(version), 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+
+class RedisBackend:
+    """Simpan dataset di Redis (atau server yang kompatibel) untuk deployment multi-mesin"""
+
+    def __init__(self, url, ttl=24 * 3600):
+        if redis is None:
+            raise ImportError("Paket 'redis' belum terinstall (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def save(self, version, df):
+        self.client.set(f"dataset:{version}", pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL), ex=self.ttl)
+
+    def load(self, version):
+        payload = self.client.get(f"dataset:{version}")
+        return pickle.loads(payload) if payload is not None else None
+
+
+# ===============================
+# REGISTRY DATASET
+# ===============================
+
+def dataset_version(df):
+    """Version id dari isi DataFrame, sehingga data yang sama selalu mendapat id yang sama di setiap worker"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    digest.update(','.join(map(str, df.columns)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class DatasetRegistry:
+    """Dataset yang tinggal di memori server; dcc.Store cukup menyimpan version id-nya.
+
+    Versi terbaru disimpan di memori (LRU, maksimal max_versions), versi yang
+    di-pin tidak pernah dibuang. Backend opsional (disk/redis) dipakai agar
+    worker lain bisa mengambil versi yang tidak ada di memorinya sendiri.
+    """
+
+    def __init__(self, backend=None, max_versions=8):
+        self.backend = backend
+        self.max_versions = max_versions
+        self._frames = OrderedDict()
+        self._pinned = set()
+        self._lock = threading.Lock()
+
+    def register(self, df, pin=False):
+        version = dataset_version(df)
+        with self._lock:
+            self._frames[version] = df
+            self._frames.move_to_end(version)
+            if pin:
+                self._pinned.add(version)
+            self._evict()
+        if self.backend is not None:
+            self.backend.save(version, df)
+        return version
+
+    def unpin(self, version):
+        """Versi boleh dibuang lagi oleh LRU (dipakai saat dataset utama diganti)"""
+        with self._lock:
+            self._pinned.discard(version)
+            self._evict()
+
+    def get(self, version):
+        if version is None:
+            return None
+        with self._lock:
+            df = self._frames.get(version)
+            if df is not None:
+                self._frames.move_to_end(version)
+                return df
+        if self.backend is None:
+            return None
+        df = self.backend.load(version)
+        if df is not None:
+            with self._lock:
+                self._frames[version] = df
+                self._evict()
+        return df
+
+    def _evict(self):
+        unpinned = [version for version in self._frames if version not in self._pinned]
+        while len(self._frames) > self.max_versions and unpinned:
+            del self._frames[unpinned.pop(0)]
+
+
+def create_registry():
+    """Registry sesuai konfigurasi environment DASHBOARD_DATASET_BACKEND (memory/disk/redis)"""
+    backend_name = os.environ.get('DASHBOARD_DATASET_BACKEND', 'memory')
+    if backend_name == 'disk':
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        directory = os.environ.get('DASHBOARD_DATASET_DIR', os.path.join(base_dir, '../.dataset_cache'))
+        backend = DiskBackend(directory)
+    elif backend_name == 'redis':
+        backend = RedisBackend(os.environ.get('DASHBOARD_REDIS_URL', 'redis://localhost:6379/0'))
+    else:
+        backend = None
+    return DatasetRegistry(backend, max_versions=int(os.environ.get('DASHBOARD_DATASET_VERSIONS', 8)))
+
+
+# ===============================
+# FILTER SPEC
+# ===============================
+
+def make_filter_spec(version, categories, price_type, rating_range, overlay=None):
+    """Payload kecil untuk filtered-data-store: hanya version id, key overlay dan parameter filter"""
+    return {
+        'version': version,
+        'overlay': overlay,
+        'categories': list(categories) if categories else [],
+        'price_type': price_type or 'all',
+        'rating_range': list(rating_range) if rating_range else None,
+    }
+
+
+# ===============================
+# OVERLAY KANDIDAT APLIKASI PER SESI
+# ===============================
+
+def next_overlay_key(previous_key, candidate):
+    """Key overlay setelah satu kandidat ditambahkan.
+
+    Hash berantai dari key sebelumnya dan kandidat baru, jadi biayanya tetap per
+    penambahan dan dua sesi dengan kandidat yang sama mendapat key cache yang sama.
+    """
+    digest = hashlib.sha1((previous_key or '').encode('utf-8'))
+    digest.update(json.dumps(candidate, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def next_candidate_id(candidate_count):
+    """fact_id kandidat dibuat negatif supaya tidak pernah bentrok dengan fact_id warehouse"""
+    return -(candidate_count + 1)
+
+
+def overlay_frame(candidates):
+    """DataFrame kandidat aplikasi satu sesi, None jika sesi belum menambah aplikasi"""
+    if not candidates:
+        return None
+    return apply_schema(pd.DataFrame(candidates))
@@ -1,73 +1,144 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime
-import mysql.connector
-from sqlalchemy import create_engine
+import json
 import os
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from dash import html, dcc, dash_table
 
+from schema import apply_schema, drop_unused_categories, records_to_frame
+from common.cube import CUBE_TABLE, SKETCH_TABLE, AggregateCube
+from reference import ReferenceIndex, as_reference_index
+from plots import histogram_bins, histogram_figure, reduce_scatter, scatter_figure
+from warehouse import raw_connection, warehouse_connection
+from common.snapshot import SNAPSHOT_QUERY, read_export_manifest, read_exported_table, read_snapshot
+
 def create_connection():
-    """Membuat koneksi ke database MySQL"""
+    """Membuat koneksi DB-API ke warehouse (MySQL atau SQLite, lihat DW_BACKEND)"""
     try:
-        return mysql.connector.connect(
-            host="localhost",
-            user="root",  
-            password="",
-            database="playstoredb",
-            port=3306
-        )
+        return raw_connection()
     except Exception as e:
         print(f"Error koneksi database: {e}")
         return None
 
+def fetch_latest_run_id():
+    """Run id ETL terakhir dari tabel etl_runs; None jika database tidak bisa dicek"""
+    try:
+        with warehouse_connection() as connection:
+            row = connection.exec_driver_sql(
+                "SELECT run_id FROM etl_runs ORDER BY finished_at DESC, run_id DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"Tidak bisa mengecek run ETL terakhir: {e}")
+        return None
+
+def fetch_latest_run_summary():
+    """
+    Run id dan ringkasan dataset (lihat compute_dataset_summary) yang ditulis ETL di etl_runs
+    Mengembalikan (None, None) jika database tidak bisa dicek; ringkasan None untuk run lama tanpa ringkasan
+    """
+    try:
+        with warehouse_connection() as connection:
+            row = connection.exec_driver_sql(
+                "SELECT run_id, summary FROM etl_runs ORDER BY finished_at DESC, run_id DESC LIMIT 1"
+            ).fetchone()
+    except Exception as e:
+        print(f"Tidak bisa membaca ringkasan run ETL terakhir: {e}")
+        return None, None
+    if row is None:
+        return None, None
+    return row[0], json.loads(row[1]) if row[1] else None
+
+def load_data_from_export():
+    """Bangun dataset dashboard dari export Arrow ETL (tables/*.arrow) dengan join di pandas"""
+    manifest = read_export_manifest()
+    frames = {
+        name: read_exported_table(name, manifest=manifest).to_pandas(date_as_object=True)
+        for name in ['fact_app_reviews', 'dim_app', 'dim_price', 'dim_contentRating', 'dim_device', 'dim_date']
+    }
+    # Nama kolom id di MySQL bisa huruf kecil/besar, samakan dulu
+    frames = {name: frame.rename(columns=str.lower) for name, frame in frames.items()}
+    df = frames['fact_app_reviews']
+    for name, key in [('dim_app', 'app_id'), ('dim_price', 'price_id'), ('dim_contentRating', 'contentrating_id'),
+                      ('dim_device', 'device_id'), ('dim_date', 'date_id')]:
+        df = df.merge(frames[name], on=key, how='inner')
+    columns = ['fact_id', 'app_name', 'category', 'genres', 'current_ver', 'price_value', 'price_type',
+               'content_rating', 'android_version', 'size_mb', 'release_date', 'release_month',
+               'release_year', 'rating', 'total_reviews', 'total_installs']
+    print(f"Data dimuat dari export Arrow (run {manifest.get('run_id')}, {len(df)} baris)")
+    return df.sort_values('fact_id')[columns].reset_index(drop=True)
+
 def load_data_from_db():
-    """Memuat data dari database MySQL"""
+    """Memuat data: snapshot Arrow dari ETL jika masih segar, selain itu JOIN ke MySQL"""
+    snapshot = read_snapshot()
+    if snapshot is not None:
+        snapshot_df, metadata = snapshot
+        latest_run = fetch_latest_run_id()
+        if latest_run is None or latest_run == metadata.get('run_id'):
+            print(f"Data dimuat dari snapshot (run {metadata.get('run_id')}, {len(snapshot_df)} baris)")
+            return apply_schema(snapshot_df)
+        print(f"Snapshot kedaluwarsa (run {metadata.get('run_id')}, terbaru {latest_run}), memakai JOIN")
+    
     try:
-        engine = create_engine("mysql+mysqlconnector://root:@localhost:3306/playstoredb")
-        query = """
-        SELECT 
-            f.fact_id,
-            a.app_name,
-            a.category,
-            a.genres,
-            a.current_ver,
-            p.price_value,
-            p.price_type,
-            c.content_rating,
-            d.android_version,
-            d.size_mb,
-            dt.release_date,
-            dt.release_month,
-            dt.release_year,
-            f.rating,
-            f.total_reviews,
-            f.total_installs
-        FROM fact_app_reviews f
-        JOIN dim_app a ON f.app_id = a.app_id
-        JOIN dim_price p ON f.price_id = p.price_id
-        JOIN dim_contentrating c ON f.contentrating_id = c.contentrating_id
-        JOIN dim_device d ON f.device_id = d.device_id
-        JOIN dim_date dt ON f.date_id = dt.date_id
-        """
-        df = pd.read_sql_query(query, engine)
-        engine.dispose()
-        return df
+        with warehouse_connection() as connection:
+            df = pd.read_sql_query(SNAPSHOT_QUERY, connection)
+        return apply_schema(df)
     except Exception as e:
         print(f"Error memuat data: {e}")
-        # Fallback ke CSV
+        # Snapshot lama masih lebih baik daripada tidak ada data
+        if snapshot is not None:
+            print("Memakai snapshot terakhir")
+            return apply_schema(snapshot[0])
+        # Fallback ke export Arrow (tabel dimensi + fact di-join di pandas)
         try:
-            base_dir = os.path.dirname(os.path.abspath(__file__))
-            csv_path = os.path.join(base_dir, "../tables/fact_app_reviews.csv")
-            if os.path.exists(csv_path):
-                return pd.read_csv(csv_path)
-        except:
-            pass
+            return apply_schema(load_data_from_export())
+        except Exception as export_error:
+            print(f"Export Arrow tidak bisa dipakai: {export_error}")
         return pd.DataFrame()
 
-def create_header(df):
+def load_cube_from_db():
+    """Memuat cube agregat hasil ETL; None jika tabel cube belum ada"""
+    try:
+        with warehouse_connection() as connection:
+            cells = pd.read_sql_query(f"SELECT * FROM {CUBE_TABLE}", connection)
+            sketches = pd.read_sql_query(f"SELECT * FROM {SKETCH_TABLE}", connection)
+        return AggregateCube(cells, sketches)
+    except Exception as e:
+        print(f"Cube agregat tidak tersedia: {e}")
+        return None
+
+def compute_dataset_summary(df):
+    """Ringkasan dataset untuk header dan filter sidebar, dihitung sekali per versi dataset"""
+    if df.empty:
+        return {'total_apps': 0, 'avg_rating': 0.0, 'total_installs': 0.0, 'category_count': 0,
+                'categories': [], 'rating_min': 0, 'rating_max': 5}
+    return {
+        'total_apps': len(df),
+        'avg_rating': float(df['rating'].mean()),
+        'total_installs': float(df['total_installs'].sum()),
+        'category_count': int(df['category'].nunique()),
+        'categories': sorted(df['category'].dropna().unique()),
+        'rating_min': float(df['rating'].min()),
+        'rating_max': float(df['rating'].max()),
+    }
+
+# id komponen angka di header, urutannya sama dengan format_header_metrics
+HEADER_METRIC_IDS = ['metric-total-apps', 'metric-avg-rating', 'metric-total-installs', 'metric-category-count']
+
+def format_header_metrics(summary):
+    """Teks angka header (total aplikasi, rating rata-rata, total install, jumlah kategori) dari ringkasan dataset"""
+    return [
+        f"{summary['total_apps']:,}",
+        f"{summary['avg_rating']:.2f}" if summary['total_apps'] else "0",
+        f"{summary['total_installs']/1e9:.1f}M" if summary['total_apps'] else "0",
+        f"{summary['category_count']}",
+    ]
+
+def create_header(summary):
+    total_apps, avg_rating, total_installs, category_count = format_header_metrics(summary)
     return html.Div([
         html.Div([
             html.H1([
@@ -83,7 +154,7 @@ def create_header(df):
                     html.I(className="fas fa-mobile-alt", style={'fontSize': '2rem', 'color': '#01875f'}),
                 ], className="metric-icon"),
                 html.Div([
-                    html.H3(f"{len(df):,}", className="metric-number"),
+                    html.H3(total_apps, id='metric-total-apps', className="metric-number"),
                     html.P("Total Aplikasi", className="metric-label")
                 ], className="metric-content")
             ], className="metric-card"),
@@ -93,7 +164,7 @@ def create_header(df):
                     html.I(className="fas fa-star", style={'fontSize': '2rem', 'color': '#ffa500'}),
                 ], className="metric-icon"),
                 html.Div([
-                    html.H3(f"{df['rating'].mean():.2f}" if not df.empty else "0", className="metric-number"),
+                    html.H3(avg_rating, id='metric-avg-rating', className="metric-number"),
                     html.P("Rating Rata-rata", className="metric-label")
                 ], className="metric-content")
             ], className="metric-card"),
@@ -103,7 +174,7 @@ def create_header(df):
                     html.I(className="fas fa-download", style={'fontSize': '2rem', 'color': '#4285f4'}),
                 ], className="metric-icon"),
                 html.Div([
-                    html.H3(f"{df['total_installs'].sum()/1e9:.1f}M" if not df.empty else "0", className="metric-number"),
+                    html.H3(total_installs, id='metric-total-installs', className="metric-number"),
                     html.P("Total Install", className="metric-label")
                 ], className="metric-content")
             ], className="metric-card"),
@@ -113,15 +184,15 @@ def create_header(df):
                     html.I(className="fas fa-tags", style={'fontSize': '2rem', 'color': '#ea4335'}),
                 ], className="metric-icon"),
                 html.Div([
-                    html.H3(f"{df['category'].nunique()}" if 'category' in df.columns else "0", className="metric-number"),
+                    html.H3(category_count, id='metric-category-count', className="metric-number"),
                     html.P("Kategori", className="metric-label")
                 ], className="metric-content")
             ], className="metric-card"),
         ], className="metrics-container"),
     ], className="main-header")
 
-def create_filters(df):
-    if df.empty:
+def create_filters(summary):
+    if not summary['total_apps']:
         return html.Div("Tidak ada data yang tersedia untuk filter")
         
     return html.Div([
@@ -133,8 +204,8 @@ def create_filters(df):
                 html.Label("Pilih Kategori:", className="filter-label"),
                 dcc.Dropdown(
                     id='category-filter',
-                    options=[{'label': cat, 'value': cat} for cat in sorted(df['category'].unique())],
-                    value=sorted(df['category'].unique())[:5],  # Default 5 kategori pertama
+                    options=[{'label': cat, 'value': cat} for cat in summary['categories']],
+                    value=summary['categories'][:5],  # Default 5 kategori pertama
                     multi=True,
                     className="custom-dropdown"
                 )
@@ -160,11 +231,10 @@ def create_filters(df):
                 html.Label("Range Rating:", className="filter-label"),
                 dcc.RangeSlider(
                     id='rating-range',
-                    min=df['rating'].min() if not df.empty else 0,
-                    max=df['rating'].max() if not df.empty else 5,
+                    min=summary['rating_min'],
+                    max=summary['rating_max'],
                     step=0.1,
-                    value=[df['rating'].min() if not df.empty else 0, 
-                           df['rating'].max() if not df.empty else 5],
+                    value=[summary['rating_min'], summary['rating_max']],
                     marks={i: f'{i}⭐' for i in range(1, 6)},
                     className="custom-slider"
                 )
@@ -172,7 +242,7 @@ def create_filters(df):
         ], className="filters-grid"),
     ], className="filters-section")
 
-def create_data_input(df):
+def create_data_input(summary):
     """Form Analisis Aplikasi dengan Visualisasi di Main Content"""
     return html.Div([
         html.H3("➕ Analisis Aplikasi Baru", className="section-title"),
@@ -188,7 +258,7 @@ def create_data_input(df):
                     html.Label("Kategori:", className="input-label"),
                     dcc.Dropdown(
                         id='input-category',
-                        options=[{'label': cat, 'value': cat} for cat in sorted(df['category'].unique())] if not df.empty else [],
+                        options=[{'label': cat, 'value': cat} for cat in summary['categories']],
                         placeholder='Pilih kategori...',
                         className="data-input"
                     ),
@@ -243,11 +313,15 @@ def create_data_input(df):
         ], className="main-container")
     ], className="input-section")
 def create_rating_comparison(new_app, existing_data):
-    df = pd.DataFrame(existing_data) if existing_data else pd.DataFrame()
+    reference = as_reference_index(existing_data)
+    category = reference.category(new_app['category'])
     
     # Hitung rata-rata
-    category_avg = df[df['category'] == new_app['category']]['rating'].mean() if not df.empty else 0
-    overall_avg = df['rating'].mean() if not df.empty else 0
+    if reference.empty:
+        category_avg = 0
+    else:
+        category_avg = category['rating_mean'] if category is not None else np.nan
+    overall_avg = reference.rating_mean
     
     fig = go.Figure()
     
@@ -270,196 +344,189 @@ def create_rating_comparison(new_app, existing_data):
     return fig
 
 
-def filter_data(categories, price_type, rating_range, stored_data):
-    if not stored_data:
-        return []
-    
-    dff = pd.DataFrame(stored_data)
+def filter_frame(df, categories, price_type, rating_range):
+    """Terapkan filter sidebar ke DataFrame dan kembalikan DataFrame hasil filter"""
+    if df is None or df.empty:
+        return pd.DataFrame()
     
-    # Terapkan filter
+    # Satu mask gabungan, baru di-copy sekali di akhir
+    mask = np.ones(len(df), dtype=bool)
     if categories:
-        dff = dff[dff['category'].isin(categories)]
+        mask &= df['category'].isin(categories).to_numpy()
     
-    if price_type != 'all':
-        dff = dff[dff['price_type'] == price_type]
+    if price_type and price_type != 'all':
+        mask &= (df['price_type'] == price_type).to_numpy()
     
     if rating_range:
-        dff = dff[(dff['rating'] >= rating_range[0]) & (dff['rating'] <= rating_range[1])]
+        mask &= ((df['rating'] >= rating_range[0]) & (df['rating'] <= rating_range[1])).to_numpy()
     
+    return drop_unused_categories(df[mask].copy())
+
+def filter_data(categories, price_type, rating_range, stored_data):
+    if stored_data is None or len(stored_data) == 0:
+        return []
+    
+    dff = filter_frame(records_to_frame(stored_data), categories, price_type, rating_range)
     return dff.to_dict('records')
 
-def predict_app_success(new_app_data, existing_data):
+def resolve_filter_spec(registry, filter_spec, fallback=None):
+    """Ambil DataFrame hasil filter untuk filter spec {version, categories, price_type, rating_range}.
+
+    Jika versi tidak dikenal registry (misalnya setelah restart), pakai DataFrame fallback.
+    """
+    if not filter_spec:
+        return pd.DataFrame()
+    df = registry.get(filter_spec.get('version'))
+    if df is None:
+        df = fallback
+    return filter_frame(df, filter_spec.get('categories'), filter_spec.get('price_type'),
+                        filter_spec.get('rating_range'))
+
+# Rekomendasi sebagai kode, teksnya dibentuk dari template di bawah
+RECOMMENDATION_TEMPLATES = {
+    'rating_below': ("Rating aplikasi ({rating:.1f}) di bawah rata-rata kategori ({cat_avg_rating:.1f}). "
+                     "Pertimbangkan untuk meningkatkan kualitas aplikasi."),
+    'rating_above': ("Rating aplikasi ({rating:.1f}) di atas rata-rata kategori ({cat_avg_rating:.1f}). "
+                     "Ini adalah indikator positif untuk kesuksesan."),
+    'installs_below': ("Perkiraan install ({total_installs:,}) di bawah median kategori ({cat_median_installs:,}). "
+                       "Pertimbangkan strategi pemasaran yang lebih agresif."),
+    'installs_above': ("Perkiraan install ({total_installs:,}) di atas median kategori ({cat_median_installs:,}). "
+                       "Ini menunjukkan potensi kesuksesan yang baik."),
+    'size_large': ("Ukuran aplikasi ({size_mb}MB) lebih besar dari median kategori ({median_size:.1f}MB). "
+                   "Ukuran yang lebih kecil biasanya lebih disukai pengguna."),
+}
+
+def _cube_reference_stats(rollup):
+    # Median dari sketch hanya dipakai jika tepat (kode rekomendasi membandingkan dengan median);
+    # selain itu None, dan statistik dihitung dari baris data
+    medians = {
+        'median_installs': rollup.quantile('total_installs', exact=True),
+        'median_size': rollup.quantile('size_mb', exact=True),
+        'cat_median_installs': rollup.quantile('total_installs', by='category', exact=True),
+        'cat_median_size': rollup.quantile('size_mb', by='category', exact=True),
+    }
+    if any(value is None for value in medians.values()):
+        return None
+    overall = rollup.stats()
+    category_stats = rollup.stats(by='category')
+    medians['cat_median_installs'] = medians['cat_median_installs'].reindex(category_stats.index)
+    return dict(medians, avg_rating=overall['rating_mean'], cat_avg_rating=category_stats['rating_mean'])
+
+def compute_reference_stats(existing_data, rollup=None):
+    """
+    Statistik referensi per kategori untuk skor kesuksesan, dihitung sekali untuk banyak kandidat
+    Mengembalikan dict berisi Series per kategori (rata-rata rating, median install,
+    median ukuran) dan nilai keseluruhan sebagai fallback; None jika tidak ada data
+    """
+    stats = _cube_reference_stats(rollup) if rollup is not None else None
+    if stats is None:
+        # existing_data boleh berupa ReferenceIndex yang sudah dibangun untuk versi dataset ini
+        reference = as_reference_index(existing_data)
+        if reference.empty:
+            return None
+        stats = reference.scoring_stats()
+    for key in ['cat_avg_rating', 'cat_median_installs', 'cat_median_size']:
+        # Index categorical -> object supaya bisa dicocokkan dengan kategori kandidat (string)
+        stats[key] = pd.Series(stats[key].to_numpy(dtype=float), index=stats[key].index.astype(object))
+    return stats
+
+def _category_lookup(series, categories, fallback):
+    # Kategori yang tidak ada di data referensi memakai nilai keseluruhan
+    present = categories.isin(series.index)
+    return np.where(present, series.reindex(categories).to_numpy(dtype=float), fallback)
+
+def score_apps(candidates, stats):
+    """
+    Skor kesuksesan (0-100) dan kode rekomendasi untuk banyak kandidat sekaligus (vektor NumPy)
+    candidates: DataFrame dengan kolom category, rating, total_installs, size_mb
+    """
+    categories = pd.Index(candidates['category'].astype(object))
+    cat_avg_rating = _category_lookup(stats['cat_avg_rating'], categories, stats['avg_rating'])
+    cat_median_installs = _category_lookup(stats['cat_median_installs'], categories, stats['median_installs'])
+    median_size = _category_lookup(stats['cat_median_size'], categories, stats['median_size'])
+
+    rating = candidates['rating'].to_numpy(dtype=float)
+    installs = candidates['total_installs'].to_numpy(dtype=float)
+    size = candidates['size_mb'].to_numpy(dtype=float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rating_score = rating / cat_avg_rating * 50
+        install_score = np.log10(installs + 1) / np.log10(cat_median_installs + 1) * 50
+    # Sama dengan min()/max() bawaan Python, termasuk perilakunya terhadap NaN
+    rating_score = np.where(rating_score < 100, rating_score, 100)
+    install_score = np.where(install_score < 50, install_score, 50)
+    success_score = rating_score + install_score
+    success_score = np.where(success_score > 0, success_score, 0)
+    success_score = np.where(success_score < 100, success_score, 100)
+
+    rating_codes = np.where(rating < cat_avg_rating, 'rating_below', 'rating_above')
+    install_codes = np.where(installs < cat_median_installs, 'installs_below', 'installs_above')
+    large = size > median_size * 1.5
+    codes = [
+        [rating_code, install_code, 'size_large'] if is_large else [rating_code, install_code]
+        for rating_code, install_code, is_large in zip(rating_codes.tolist(), install_codes.tolist(), large.tolist())
+    ]
+    return pd.DataFrame({
+        'success_score': success_score,
+        'recommendation_codes': codes,
+        'cat_avg_rating': cat_avg_rating,
+        'cat_median_installs': cat_median_installs,
+        'median_size': median_size,
+    }, index=candidates.index)
+
+def recommendation_texts(candidates, scored):
+    """Teks rekomendasi per kandidat dari kode hasil score_apps"""
+    texts = []
+    for app, reference in zip(candidates[['rating', 'total_installs', 'size_mb']].to_dict('records'),
+                              scored.to_dict('records')):
+        values = dict(app, **reference)
+        texts.append([RECOMMENDATION_TEMPLATES[code].format(**values) for code in reference['recommendation_codes']])
+    return texts
+
+def predict_app_success_batch(candidates, existing_data, rollup=None):
+    """
+    Skor banyak kandidat aplikasi (mis. dari upload CSV) dengan satu kali perhitungan statistik referensi
+    Mengembalikan DataFrame score_apps; tanpa data referensi semua skor 50 tanpa rekomendasi
+    """
+    stats = compute_reference_stats(existing_data, rollup)
+    if stats is None:
+        return pd.DataFrame({'success_score': 50.0, 'recommendation_codes': [[] for _ in range(len(candidates))]},
+                            index=candidates.index)
+    return score_apps(candidates, stats)
+
+# Kolom yang dibutuhkan score_apps dari setiap kandidat
+CANDIDATE_COLUMNS = ['category', 'rating', 'total_installs', 'size_mb']
+
+def score_candidates_csv(source, existing_data, rollup=None):
+    """
+    Skor kandidat aplikasi dari upload CSV (path atau file-like) berisi kolom CANDIDATE_COLUMNS
+    Mengembalikan isi CSV ditambah success_score, recommendation_codes dan recommendations (teks)
+    """
+    candidates = pd.read_csv(source)
+    missing = [column for column in CANDIDATE_COLUMNS if column not in candidates.columns]
+    if missing:
+        raise ValueError(f"Kolom CSV kandidat tidak lengkap: {', '.join(missing)}")
+    scored = predict_app_success_batch(candidates, existing_data, rollup)
+    return candidates.assign(success_score=scored['success_score'],
+                             recommendation_codes=scored['recommendation_codes'],
+                             recommendations=recommendation_texts(candidates, scored))
+
+def predict_app_success(new_app_data, existing_data, rollup=None):
     """
     Memprediksi kesuksesan aplikasi baru berdasarkan data yang ada
     Mengembalikan skor kesuksesan (0-100) dan rekomendasi
+    
+    rollup (CubeSelection tanpa filter) dipakai jika tersedia, sehingga statistik
+    kategori diambil dari cube agregat dan bukan dari baris data
     """
-    if not existing_data:
+    stats = compute_reference_stats(existing_data, rollup)
+    if stats is None:
         return 50, "Tidak ada data referensi yang cukup"
     
-    df = pd.DataFrame(existing_data)
-    
-    # Hitung parameter referensi dari data yang ada
-    avg_rating = df['rating'].mean()
-    median_installs = df['total_installs'].median()
-    category_stats = df.groupby('category').agg({
-        'rating': ['mean', 'std'],
-        'total_installs': ['median', 'std']
-    }).reset_index()
-    
-    # Dapatkan statistik kategori aplikasi baru
-    app_category = new_app_data['category']
-    category_mask = df['category'] == app_category
-    category_data = df[category_mask]
-    
-    if len(category_data) == 0:
-        # Jika kategori tidak ditemukan, gunakan rata-rata keseluruhan
-        cat_avg_rating = avg_rating
-        cat_median_installs = median_installs
-    else:
-        cat_avg_rating = category_data['rating'].mean()
-        cat_median_installs = category_data['total_installs'].median()
-    
-    # Hitung skor kesuksesan (0-100)
-    rating_score = min(100, (new_app_data['rating'] / cat_avg_rating) * 50)
-    install_score = min(50, (np.log10(new_app_data['total_installs'] + 1) / 
-                      np.log10(cat_median_installs + 1) * 50))
-    success_score = rating_score + install_score
-    
-    # Hasilkan rekomendasi
-    recommendations = []
-    
-    # Analisis rating
-    if new_app_data['rating'] < cat_avg_rating:
-        recommendations.append(
-            f"Rating aplikasi ({new_app_data['rating']:.1f}) di bawah rata-rata kategori ({cat_avg_rating:.1f}). "
-            "Pertimbangkan untuk meningkatkan kualitas aplikasi."
-        )
-    else:
-        recommendations.append(
-            f"Rating aplikasi ({new_app_data['rating']:.1f}) di atas rata-rata kategori ({cat_avg_rating:.1f}). "
-            "Ini adalah indikator positif untuk kesuksesan."
-        )
-    
-    # Analisis installs
-    if new_app_data['total_installs'] < cat_median_installs:
-        recommendations.append(
-            f"Perkiraan install ({new_app_data['total_installs']:,}) di bawah median kategori ({cat_median_installs:,}). "
-            "Pertimbangkan strategi pemasaran yang lebih agresif."
-        )
-    else:
-        recommendations.append(
-            f"Perkiraan install ({new_app_data['total_installs']:,}) di atas median kategori ({cat_median_installs:,}). "
-            "Ini menunjukkan potensi kesuksesan yang baik."
-        )
-    
-    # Analisis ukuran
-    size_stats = df.groupby('category')['size_mb'].median().reset_index()
-    median_size = size_stats[size_stats['category'] == app_category]['size_mb'].values[0] if not size_stats[size_stats['category'] == app_category].empty else df['size_mb'].median()
-    
-    if new_app_data['size_mb'] > median_size * 1.5:
-        recommendations.append(
-            f"Ukuran aplikasi ({new_app_data['size_mb']}MB) lebih besar dari median kategori ({median_size:.1f}MB). "
-            "Ukuran yang lebih kecil biasanya lebih disukai pengguna."
-        )
-    
-    return min(100, max(0, success_score)), recommendations
-
-def handle_add_app(n_clicks, app_name, category, rating, installs, size, current_data):
-    if n_clicks == 0:
-        return current_data, "", None
-    
-    if not all([app_name, category, rating, installs, size]):
-        return current_data, html.Div("❌ Harap isi semua field yang diperlukan", className="error-message"), None
-    
-    if not (1 <= rating <= 5):
-        return current_data, html.Div("❌ Rating harus antara 1 dan 5", className="error-message"), None
-    
-    if installs < 0:
-        return current_data, html.Div("❌ Jumlah install tidak boleh negatif", className="error-message"), None
-    
-    if size < 0:
-        return current_data, html.Div("❌ Ukuran tidak boleh negatif", className="error-message"), None
-    
-    # Buat entri aplikasi baru
-    new_app = {
-        'fact_id': len(current_data) + 1,
-        'app_name': app_name,
-        'category': category,
-        'genres': category,
-        'current_ver': '1.0',
-        'price_value': 0,
-        'price_type': 'Free',
-        'content_rating': 'Everyone',
-        'android_version': '5.0',
-        'size_mb': size,
-        'release_date': datetime.now().strftime('%Y-%m-%d'),
-        'release_month': datetime.now().strftime('%B'),
-        'release_year': datetime.now().year,
-        'rating': rating,
-        'total_reviews': max(1, installs // 10),
-        'total_installs': installs
-    }
-    
-    # Prediksi kesuksesan
-    success_score, recommendations = predict_app_success(new_app, current_data)
-    
-    # Buat visualisasi hasil analisis
-    analysis_result = html.Div([
-        html.H4(f"Analisis Potensi Kesuksesan: {app_name}", className="analysis-title"),
-        html.Div([
-            html.Div([
-                html.Div([
-                    html.Div([
-                        html.Div(style={
-                            'width': f'{success_score}%',
-                            'height': '100%',
-                            'backgroundColor': '#01875f',
-                            'borderRadius': '20px'
-                        })
-                    ], style={
-                        'width': '100%',
-                        'height': '30px',
-                        'backgroundColor': '#f0f0f0',
-                        'borderRadius': '20px',
-                        'overflow': 'hidden',
-                        'marginBottom': '10px'
-                    }),
-                    html.Div(f"Skor Kesuksesan: {success_score:.1f}/100", className="score-text"),
-                    html.Div([
-                        "0-40: Risiko Tinggi",
-                        html.Br(),
-                        "40-70: Potensi Sedang", 
-                        html.Br(),
-                        "70-100: Potensi Tinggi"
-                    ], className="score-legend")
-                ], className="score-container"),
-                
-                html.Div([
-                    html.H5("Rekomendasi:", className="recommendation-title"),
-                    html.Ul([html.Li(rec) for rec in recommendations], className="recommendation-list")
-                ], className="recommendation-container")
-            ], className="analysis-content"),
-            
-            html.Div([
-                html.H5("Detail Aplikasi:", className="detail-title"),
-                html.Table([
-                    html.Tr([html.Td("Nama Aplikasi:"), html.Td(app_name)]),
-                    html.Tr([html.Td("Kategori:"), html.Td(category)]),
-                    html.Tr([html.Td("Rating:"), html.Td(f"{rating:.1f}")]),
-                    html.Tr([html.Td("Perkiraan Install:"), html.Td(f"{installs:,}")]),
-                    html.Tr([html.Td("Ukuran:"), html.Td(f"{size} MB")])
-                ], className="detail-table")
-            ], className="detail-container")
-        ], className="analysis-grid")
-    ], className="analysis-section")
-    
-    updated_data = current_data + [new_app]
-    success_msg = html.Div([
-        html.I(className="fas fa-check-circle", style={'marginRight': '8px'}),
-        f"Berhasil menambahkan '{app_name}' ke dataset"
-    ], className="success-message")
-    
-    return updated_data, success_msg, analysis_result
+    # Satu kandidat = batch berisi satu baris, jadi hasilnya selalu sama dengan predict_app_success_batch
+    candidate = pd.DataFrame([{column: new_app_data[column] for column in CANDIDATE_COLUMNS}])
+    scored = score_apps(candidate, stats)
+    return scored['success_score'].iloc[0], recommendation_texts(candidate, scored)[0]
 
 # [Previous imports remain the same...]
 
@@ -471,12 +538,12 @@ def create_installs_comparison(new_app, existing_data):
     """
     Membuat bar chart perbandingan install (skala logaritmik)
     """
-    df = pd.DataFrame(existing_data) if existing_data else pd.DataFrame()
+    reference = as_reference_index(existing_data)
+    category = reference.category(new_app['category'])
     
     # Hitung statistik
-    category_mask = (df['category'] == new_app['category']) if not df.empty else []
-    category_median = df.loc[category_mask, 'total_installs'].median() if not df.empty and any(category_mask) else 0
-    overall_median = df['total_installs'].median() if not df.empty else 0
+    category_median = category['installs_median'] if category is not None else 0
+    overall_median = reference.installs_median
     
     # Format teks
     def format_installs(num):
@@ -517,31 +584,31 @@ def create_radar_analysis(new_app, existing_data):
     """
     Membuat radar chart untuk analisis 4 faktor utama
     """
-    df = pd.DataFrame(existing_data) if existing_data else pd.DataFrame()
-    category_mask = (df['category'] == new_app['category']) if not df.empty else []
+    reference = as_reference_index(existing_data)
+    category = reference.category(new_app['category'])
     
     # Normalisasi data (0-1)
-    max_installs = df['total_installs'].max() if not df.empty else 1
-    max_size = df['size_mb'].max() if not df.empty else 1
+    max_installs = reference.installs_max
+    max_size = reference.size_max
     
     # Hitung metrik
     metrics = {
         'Rating': (
             new_app['rating'] / 5,
-            df.loc[category_mask, 'rating'].mean() / 5 if any(category_mask) else 0
+            category['rating_mean'] / 5 if category is not None else 0
         ),
         'Installs': (
             min(1, new_app['total_installs'] / max_installs),
-            min(1, df.loc[category_mask, 'total_installs'].median() / max_installs) if any(category_mask) else 0
+            min(1, category['installs_median'] / max_installs) if category is not None else 0
         ),
         'Ukuran': (
             1 - (new_app['size_mb'] / max_size),
-            1 - (df.loc[category_mask, 'size_mb'].median() / max_size) if any(category_mask) else 0
+            1 - (category['size_median'] / max_size) if category is not None else 0
         ),
         'Kepuasan': (
             (new_app['rating'] / 5) * 0.7 + (min(1, new_app['total_installs'] / max_installs) * 0.3),
-            (df.loc[category_mask, 'rating'].mean() / 5 * 0.7 + 
-             min(1, df.loc[category_mask, 'total_installs'].median() / max_installs) * 0.3) if any(category_mask) else 0
+            (category['rating_mean'] / 5 * 0.7 + 
+             min(1, category['installs_median'] / max_installs) * 0.3) if category is not None else 0
         )
     }
     
@@ -596,17 +663,16 @@ def create_category_trend(new_app, existing_data):
     """
     Membuat line chart trend rating kategori per tahun
     """
-    df = pd.DataFrame(existing_data) if existing_data else pd.DataFrame()
+    reference = as_reference_index(existing_data)
     
-    if df.empty or 'release_year' not in df.columns:
+    if reference.empty or not reference.has_years:
         return go.Figure()
     
-    # Hitung trend
-    trend_data = df[df['category'] == new_app['category']]
-    if trend_data.empty:
+    # Trend per tahun sudah dihitung di reference index
+    if reference.category(new_app['category']) is None:
         return go.Figure()
     
-    trend_data = trend_data.groupby('release_year')['rating'].agg(['mean', 'count']).reset_index()
+    trend_data = reference.trend(new_app['category'])
     
     # Buat figure
     fig = go.Figure()
@@ -630,7 +696,7 @@ def create_category_trend(new_app, existing_data):
     ))
     
     fig.add_hline(
-        y=df['rating'].mean(),
+        y=reference.rating_mean,
         line={'dash': 'dash', 'color': '#ea4335', 'width': 2},
         annotation_text="Rata-rata Global",
         annotation_position="bottom right"
@@ -656,19 +722,17 @@ def create_comparison_table(new_app, existing_data):
     """
     Membuat tabel perbandingan metrik utama
     """
-    df = pd.DataFrame(existing_data) if existing_data else pd.DataFrame()
-    category_mask = (df['category'] == new_app['category']) if not df.empty else []
+    reference = as_reference_index(existing_data)
+    category = reference.category(new_app['category'])
     
     # Hitung statistik
-    is_category_exist = any(category_mask) if not df.empty else False
+    is_category_exist = category is not None
     
     category_stats = {
-        'rating_mean': df.loc[category_mask, 'rating'].mean() if is_category_exist else '-',
-        'installs_median': df.loc[category_mask, 'total_installs'].median() if is_category_exist else '-',
-        'size_median': df.loc[category_mask, 'size_mb'].median() if is_category_exist else '-',
-        'free_percentage': round(
-            df.loc[category_mask, 'price_type'].value_counts(normalize=True).get('Free', 0) * 100
-        ) if is_category_exist else '-'
+        'rating_mean': category['rating_mean'] if is_category_exist else '-',
+        'installs_median': category['installs_median'] if is_category_exist else '-',
+        'size_median': category['size_median'] if is_category_exist else '-',
+        'free_percentage': round(category['free_share'] * 100) if is_category_exist else '-'
     }
     
     # Format data
@@ -768,6 +832,54 @@ def get_installs_feedback(app_installs, category_median):
     else:
         return "⚠️ Perlu strategi marketing"
 
+def build_analysis_results(new_app, reference):
+    """Semua visualisasi analisis aplikasi baru, dibangun di server dari satu ReferenceIndex"""
+    return {
+        'rating_fig': create_rating_comparison(new_app, reference),
+        'installs_fig': create_installs_comparison(new_app, reference),
+        'radar_fig': create_radar_analysis(new_app, reference),
+        'trend_fig': create_category_trend(new_app, reference),
+        'comparison_table': create_comparison_table(new_app, reference)
+    }
+
+def render_analysis_content(app_name, analysis_results):
+    """Layout tab analisis dari hasil build_analysis_results"""
+    return html.Div([
+        html.H3(f"Analisis Aplikasi: {app_name}", className="analysis-header"),
+        
+        # Baris pertama visualisasi
+        html.Div([
+            html.Div([
+                dcc.Graph(figure=analysis_results['rating_fig'], className="analysis-graph"),
+                html.P("Perbandingan Rating", className="analysis-description")
+            ], className="analysis-card"),
+            
+            html.Div([
+                dcc.Graph(figure=analysis_results['installs_fig'], className="analysis-graph"),
+                html.P("Perbandingan Jumlah Install", className="analysis-description")
+            ], className="analysis-card"),
+        ], className="analysis-row"),
+        
+        # Baris kedua visualisasi
+        html.Div([
+            html.Div([
+                dcc.Graph(figure=analysis_results['radar_fig'], className="analysis-graph"),
+                html.P("Analisis Komprehensif", className="analysis-description")
+            ], className="analysis-card"),
+            
+            html.Div([
+                dcc.Graph(figure=analysis_results['trend_fig'], className="analysis-graph"),
+                html.P("Trend Kategori", className="analysis-description")
+            ], className="analysis-card"),
+        ], className="analysis-row"),
+        
+        # Tabel perbandingan
+        html.Div([
+            html.H4("Ringkasan Perbandingan", className="table-header"),
+            analysis_results['comparison_table']
+        ], className="analysis-table-container")
+    ], className="analysis-main-content")
+
 def _get_rating_feedback(app_rating, category_avg):
     if not isinstance(category_avg, float):
         return "Tidak ada data pembanding"
@@ -799,11 +911,10 @@ def _get_installs_feedback(app_installs, category_median):
 # [Rest of your existing functions remain unchanged...]
 
 def render_content(active_tab, filtered_data):
-    if not filtered_data:
+    dff = records_to_frame(filtered_data)
+    if dff.empty:
         return html.Div("Tidak ada data yang tersedia untuk filter yang dipilih", className="no-data-message")
     
-    dff = pd.DataFrame(filtered_data)
-    
     if active_tab == 'overview':
         return create_overview_content(dff)
     elif active_tab == 'success-factors':
@@ -811,14 +922,41 @@ def render_content(active_tab, filtered_data):
     elif active_tab == 'revenue-insights':
         return create_revenue_insights_content(dff)
 
-def create_overview_content(dff):
-    # Hitung target rating per kategori (rata-rata + 0.2 untuk menjadi kompetitif)
-    category_targets = dff.groupby('category')['rating'].mean().add(0.2).reset_index()
+# ===============================
+# AGREGAT PER TAB
+# ===============================
+# Setiap tab dipecah menjadi compute_*_aggregates (filter -> frame kecil yang
+# dibutuhkan grafik, bisa di-cache) dan render_*_content (membangun figure).
+
+def compute_overview_aggregates(dff, rollup=None):
+    """Agregat untuk tab Gambaran Pasar; dengan rollup seluruhnya dari cube (dff boleh None)"""
+    # Target rating per kategori = rata-rata + 0.2 untuk menjadi kompetitif
+    if rollup is not None:
+        category_stats = rollup.stats(by='category')
+        category_counts = category_stats['rows'].rename_axis('category').reset_index(name='count')
+        category_targets = category_stats['rating_mean'].add(0.2).reset_index()
+    else:
+        category_counts = dff['category'].value_counts(sort=False).reset_index()
+        category_targets = dff.groupby('category', observed=True)['rating'].mean().add(0.2).reset_index()
+    if rollup is not None and 'rating' in rollup.cube.sketch_metrics:
+        ratings = rollup.value_counts('rating')
+        rating_bins = histogram_bins(ratings.index, counts=ratings.to_numpy())
+    else:
+        # Cube dari ETL lama belum punya sketch rating
+        rating_bins = histogram_bins(dff['rating'])
+    category_counts.columns = ['category', 'count']
     category_targets.columns = ['Kategori', 'Target Rating']
     
+    return {
+        'category_counts': category_counts,
+        'category_targets': category_targets,
+        'rating_bins': rating_bins,
+    }
+
+def render_overview_content(aggregates):
     # Visualisasi distribusi kategori
     category_dist = px.pie(
-        dff, names='category', 
+        aggregates['category_counts'], names='category', values='count',
         title='<b>Distribusi Kategori Aplikasi</b><br><span style="font-size:14px">Persentase aplikasi per kategori</span>',
         hole=0.4,
         color_discrete_sequence=px.colors.sequential.Teal
@@ -828,7 +966,7 @@ def create_overview_content(dff):
     
     # Visualisasi target rating
     target_fig = px.bar(
-        category_targets.sort_values('Target Rating', ascending=False),
+        aggregates['category_targets'].sort_values('Target Rating', ascending=False),
         x='Kategori',
         y='Target Rating',
         title='<b>Target Rating per Kategori</b><br><span style="font-size:14px">Rating yang harus dicapai untuk bersaing</span>',
@@ -838,10 +976,12 @@ def create_overview_content(dff):
     target_fig.update_layout(template='plotly_white', height=400, xaxis_tickangle=45)
     
     # Visualisasi distribusi rating
-    rating_dist = px.histogram(
-        dff, x='rating', nbins=20,
+    # Histogram sudah di-bin di server, browser hanya menerima jumlah per bin
+    rating_dist = histogram_figure(
+        aggregates['rating_bins'],
         title='<b>Distribusi Rating Aplikasi</b><br><span style="font-size:14px">Sebagian besar aplikasi memiliki rating 4.0-4.5</span>',
-        color_discrete_sequence=['#01875f']
+        x_label='rating',
+        color='#01875f'
     )
     rating_dist.update_layout(template='plotly_white', height=400)
     
@@ -866,115 +1006,159 @@ def create_overview_content(dff):
         ], className="row-charts")
     ])
 
-def create_success_factors_content(dff):
-    try:
-        # Pastikan dff adalah DataFrame
-        if not isinstance(dff, pd.DataFrame):
-            dff = pd.DataFrame(dff)
-            
-        # Validasi kolom yang diperlukan
-        required_columns = ['rating', 'total_installs', 'total_reviews', 'app_name', 'category']
-        for col in required_columns:
-            if col not in dff.columns:
-                raise ValueError(f"Kolom '{col}' tidak ditemukan dalam data")
-        
-        # Hitung skor kesuksesan (kombinasi rating dan installs)
-        # Handle missing values jika ada
-        dff['total_installs'] = pd.to_numeric(dff['total_installs'], errors='coerce').fillna(0)
-        dff['rating'] = pd.to_numeric(dff['rating'], errors='coerce').fillna(0)
-        dff['total_reviews'] = pd.to_numeric(dff['total_reviews'], errors='coerce').fillna(0)
-        
-        # Hitung skor dengan penanganan jika total_installs = 0
-        dff['skor_kesuksesan'] = (dff['rating'] * 0.6) + (np.log10(dff['total_installs'].replace(0, 1)) * 0.4)
-        
-        # Visualisasi faktor kesuksesan
-        success_fig = px.scatter(
-            dff,
-            x='rating',
-            y='total_installs',
-            color='skor_kesuksesan',
-            size='total_reviews',
-            log_y=True,
-            title='<b>Faktor Kesuksesan Aplikasi</b><br><span style="font-size:14px">Aplikasi sukses memiliki rating tinggi dan banyak install</span>',
-            hover_data=['app_name', 'category'],
-            labels={'rating': 'Rating', 'total_installs': 'Total Install (log)'}
-        )
-        success_fig.update_layout(template='plotly_white', height=600)
-        
-        # 10 aplikasi teratas
-        top_apps = dff.nlargest(10, 'skor_kesuksesan')[['app_name', 'category', 'rating', 'total_installs']].copy()
-        top_apps['Installs'] = top_apps['total_installs'].apply(
-            lambda x: f"{x/1e6:.1f} Juta" if x >= 1e6 else f"{x/1e3:.0f} Ribu" if x >= 1e3 else f"{x:.0f}"
-        )
+def create_overview_content(dff):
+    return render_overview_content(compute_overview_aggregates(dff))
+
+def compute_success_aggregates(dff, rollup=None):
+    """Agregat untuk tab Faktor Kesuksesan (DataFrame input tidak diubah).
+
+    rollup tidak dipakai: scatter dan top 10 butuh baris individual.
+    """
+    # Pastikan dff adalah DataFrame
+    if not isinstance(dff, pd.DataFrame):
+        dff = records_to_frame(dff)
         
-        return html.Div([
-            html.Div([
-                html.Div([
-                    dcc.Graph(figure=success_fig),
-                    html.P("Analisis hubungan antara rating, jumlah install, dan ulasan.", className="chart-description")
-                ], className="chart-container"),
-            ], className="row-charts"),
-            
+    # Validasi kolom yang diperlukan
+    required_columns = ['rating', 'total_installs', 'total_reviews', 'app_name', 'category']
+    for col in required_columns:
+        if col not in dff.columns:
+            raise ValueError(f"Kolom '{col}' tidak ditemukan dalam data")
+    
+    # Hitung skor kesuksesan (kombinasi rating dan installs)
+    # Handle missing values jika ada
+    points = dff[required_columns].copy()
+    points['total_installs'] = pd.to_numeric(points['total_installs'], errors='coerce').fillna(0)
+    points['rating'] = pd.to_numeric(points['rating'], errors='coerce').fillna(0)
+    points['total_reviews'] = pd.to_numeric(points['total_reviews'], errors='coerce').fillna(0)
+    
+    # Hitung skor dengan penanganan jika total_installs = 0
+    points['skor_kesuksesan'] = (points['rating'] * 0.6) + (np.log10(points['total_installs'].replace(0, 1)) * 0.4)
+    
+    # 10 aplikasi teratas
+    top_apps = points.nlargest(10, 'skor_kesuksesan')[['app_name', 'category', 'rating', 'total_installs']].copy()
+    top_apps['Installs'] = top_apps['total_installs'].apply(
+        lambda x: f"{x/1e6:.1f} Juta" if x >= 1e6 else f"{x/1e3:.0f} Ribu" if x >= 1e3 else f"{x:.0f}"
+    )
+    
+    scatter = reduce_scatter(points, 'rating', 'total_installs', log_y=True)
+    return {'scatter': scatter, 'top_apps': top_apps}
+
+def render_success_factors_content(aggregates):
+    # Visualisasi faktor kesuksesan
+    # Jumlah titik besar -> Scattergl, sangat besar -> heatmap kepadatan dari server
+    success_fig = scatter_figure(
+        aggregates['scatter'],
+        x='rating',
+        y='total_installs',
+        log_y=True,
+        title='<b>Faktor Kesuksesan Aplikasi</b><br><span style="font-size:14px">Aplikasi sukses memiliki rating tinggi dan banyak install</span>',
+        labels={'rating': 'Rating', 'total_installs': 'Total Install (log)'},
+        color='skor_kesuksesan',
+        size='total_reviews',
+        hover_data=['app_name', 'category']
+    )
+    success_fig.update_layout(template='plotly_white', height=600)
+    
+    return html.Div([
+        html.Div([
             html.Div([
-                html.H4("10 Aplikasi Paling Sukses", className="table-title"),
-                dash_table.DataTable(
-                    data=top_apps.to_dict('records'),
-                    columns=[
-                        {"name": "Nama Aplikasi", "id": "app_name"},
-                        {"name": "Kategori", "id": "category"},
-                        {"name": "Rating", "id": "rating"},
-                        {"name": "Installs", "id": "Installs"}
-                    ],
-                    style_table={'overflowX': 'auto'},
-                    style_cell={'textAlign': 'left', 'padding': '10px'},
-                    style_header={
-                        'backgroundColor': '#01875f',
-                        'color': 'white',
-                        'fontWeight': 'bold'
-                    }
-                ),
-                html.P("Pelajari aplikasi top untuk memahami pola kesuksesan.", className="chart-description")
-            ], className="table-container")
-        ])
+                dcc.Graph(figure=success_fig),
+                html.P("Analisis hubungan antara rating, jumlah install, dan ulasan.", className="chart-description")
+            ], className="chart-container"),
+        ], className="row-charts"),
         
+        html.Div([
+            html.H4("10 Aplikasi Paling Sukses", className="table-title"),
+            dash_table.DataTable(
+                data=aggregates['top_apps'].to_dict('records'),
+                columns=[
+                    {"name": "Nama Aplikasi", "id": "app_name"},
+                    {"name": "Kategori", "id": "category"},
+                    {"name": "Rating", "id": "rating"},
+                    {"name": "Installs", "id": "Installs"}
+                ],
+                style_table={'overflowX': 'auto'},
+                style_cell={'textAlign': 'left', 'padding': '10px'},
+                style_header={
+                    'backgroundColor': '#01875f',
+                    'color': 'white',
+                    'fontWeight': 'bold'
+                }
+            ),
+            html.P("Pelajari aplikasi top untuk memahami pola kesuksesan.", className="chart-description")
+        ], className="table-container")
+    ])
+
+def create_success_factors_content(dff):
+    try:
+        return render_success_factors_content(compute_success_aggregates(dff))
     except Exception as e:
         return html.Div([
             html.I(className="fas fa-exclamation-triangle", style={'color': '#ea4335'}),
             f" Error dalam membuat konten faktor kesuksesan: {str(e)}"
         ], className="error-message")
-    
-def create_revenue_insights_content(dff):
+
+def compute_revenue_aggregates(dff, rollup=None):
+    """Agregat untuk tab Monetisasi (perbandingan per tipe harga dari cube jika rollup tersedia).
+
+    Dengan rollup, dff cukup berisi baris aplikasi berbayar (yang digambar di scatter), atau None.
+    """
     # Fokus pada aplikasi berbayar
-    paid_apps = dff[dff['price_type'] == 'Paid']
+    if dff is None:
+        dff = pd.DataFrame(columns=['price_type', 'price_value', 'total_installs', 'rating'])
+    paid_apps = dff.loc[dff['price_type'] == 'Paid', ['price_value', 'total_installs', 'rating']]
     
     if len(paid_apps) == 0:
+        if rollup is not None:
+            price_type_counts = rollup.stats(by='price_type')['rows'].rename_axis('price_type').reset_index()
+        else:
+            price_type_counts = dff['price_type'].value_counts(sort=False).reset_index()
+        price_type_counts.columns = ['price_type', 'count']
+        return {'paid_apps': None, 'price_type_counts': price_type_counts}
+    
+    # Perbandingan performa gratis vs berbayar
+    if rollup is not None:
+        # Median dari sketch cube (nilai di bucket log berisi beberapa nilai: error relatif <= 1%)
+        comparison = pd.DataFrame({
+            'rating': rollup.stats(by='price_type')['rating_mean'],
+            'total_installs': rollup.quantile('total_installs', by='price_type'),
+            'total_reviews': rollup.quantile('total_reviews', by='price_type'),
+        }).rename_axis('price_type').reset_index()
+    else:
+        comparison = dff.groupby('price_type', observed=True).agg({
+            'rating': 'mean',
+            'total_installs': 'median',
+            'total_reviews': 'median'
+        }).reset_index()
+    
+    scatter = reduce_scatter(paid_apps.copy(), 'price_value', 'total_installs', log_y=True)
+    return {'paid_apps': scatter, 'comparison': comparison}
+
+def render_revenue_insights_content(aggregates):
+    paid_apps = aggregates['paid_apps']
+    
+    if paid_apps is None:
         return html.Div([
             html.Div("Tidak ada aplikasi berbayar dalam data yang difilter", className="no-data-message"),
             html.Div([
-                dcc.Graph(figure=px.histogram(dff, x='price_type', title='Distribusi Tipe Harga')),
+                dcc.Graph(figure=px.bar(aggregates['price_type_counts'], x='price_type', y='count', title='Distribusi Tipe Harga')),
                 html.P("Sebagian besar aplikasi gratis - pertimbangkan model pendapatan lain.", className="chart-description")
             ], className="chart-container")
         ])
     
     # Analisis sensitivitas harga
-    price_fig = px.scatter(
+    price_fig = scatter_figure(
         paid_apps,
         x='price_value',
         y='total_installs',
-        color='rating',
         log_y=True,
         title='<b>Sensitivitas Harga</b><br><span style="font-size:14px">Aplikasi dengan harga lebih tinggi perlu rating lebih baik</span>',
-        labels={'price_value': 'Harga ($)', 'total_installs': 'Install (log)'}
+        labels={'price_value': 'Harga ($)', 'total_installs': 'Install (log)'},
+        color='rating'
     )
     price_fig.update_layout(template='plotly_white', height=500)
     
-    # Perbandingan performa gratis vs berbayar
-    comparison = dff.groupby('price_type').agg({
-        'rating': 'mean',
-        'total_installs': 'median',
-        'total_reviews': 'median'
-    }).reset_index()
-    
+    comparison = aggregates['comparison']
     comp_fig = make_subplots(rows=1, cols=3, subplot_titles=('Rating Rata-rata', 'Median Install', 'Median Ulasan'))
     
     metrics = ['rating', 'total_installs', 'total_reviews']
@@ -1010,4 +1194,39 @@ def create_revenue_insights_content(dff):
                 html.P("Perbedaan performa antara aplikasi gratis dan berbayar.", className="chart-description")
             ], className="chart-container"),
         ], className="row-charts")
-    ])
\ No newline at end of file
+    ])
+
+def create_revenue_insights_content(dff):
+    return render_revenue_insights_content(compute_revenue_aggregates(dff))
+
+# Pasangan (compute, render) per tab, dipakai app.py untuk cache agregat
+TAB_AGGREGATES = {
+    'overview': (compute_overview_aggregates, render_overview_content),
+    'success-factors': (compute_success_aggregates, render_success_factors_content),
+    'revenue-insights': (compute_revenue_aggregates, render_revenue_insights_content),
+}
+
+def compute_tab_aggregates(active_tab, filter_spec, get_dataset, get_filtered, rollup=None, engine=None):
+    """Agregat satu tab untuk filter spec; None jika tidak ada data yang lolos filter.
+    
+    Dengan query engine (DuckDB) filter + agregat dijalankan sebagai query di atas
+    dataset, tanpa membuat DataFrame hasil filter. Tanpa engine dipakai pandas,
+    dibantu cube agregat (rollup) jika filter sejajar dengan cube: Gambaran Pasar
+    tidak membaca baris sama sekali dan Monetisasi hanya membaca baris berbayar.
+    get_filtered(filter_spec) mengembalikan DataFrame hasil filter.
+    """
+    if engine is not None:
+        return engine.tab_aggregates(active_tab, filter_spec.get('version'), get_dataset(), filter_spec)
+    
+    compute, _ = TAB_AGGREGATES[active_tab]
+    if rollup is not None:
+        if rollup.rows == 0:
+            return None
+        if active_tab == 'overview' and 'rating' in rollup.cube.sketch_metrics:
+            return compute(None, rollup=rollup)
+        if active_tab == 'revenue-insights':
+            has_paid = (filter_spec.get('price_type') or 'all') in ('all', 'Paid')
+            paid = get_filtered(dict(filter_spec, price_type='Paid')) if has_paid else None
+            return compute(paid, rollup=rollup)
+    dff = get_filtered(filter_spec)
+    return None if dff.empty else compute(dff, rollup=rollup)
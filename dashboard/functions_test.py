@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+
+import pandas as pd
+
+# common/ (konfigurasi warehouse, cube dan snapshot bersama ETL) ada di root repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import functions
+
+# Format dcc.Store (list of dict), kategori jadi categorical seperti di dashboard
+EXISTING_DATA = pd.DataFrame({
+    'category': ['GAME', 'GAME', 'GAME', 'TOOLS', 'TOOLS', 'FAMILY'],
+    'rating': [4.5, 3.9, 4.2, 3.1, 4.0, 4.4],
+    'total_installs': [1000000, 50000, 500000, 10000, 100000, 5000],
+    'size_mb': [80.0, 25.0, 40.0, 3.5, 8.0, 15.0],
+    'price_type': ['Free', 'Free', 'Paid', 'Free', 'Free', 'Paid'],
+}).to_dict('records')
+
+
+def test_batch_scoring_matches_single_app():
+    """predict_app_success_batch harus memberi skor dan rekomendasi yang sama dengan predict_app_success"""
+    candidates = pd.DataFrame({
+        # Kategori yang tidak ada di data referensi memakai statistik keseluruhan
+        'category': ['GAME', 'TOOLS', 'WEATHER', 'GAME', 'FAMILY', 'DATING'],
+        'rating': [4.8, 2.5, 4.0, 3.0, 4.4, 1.0],
+        'total_installs': [10000000, 100, 50000, 0, 5000, 1000000000],
+        'size_mb': [20.0, 90.0, 30.0, 200.0, 15.0, 5.0],
+    }, index=[10, 11, 12, 13, 14, 15])
+
+    batch = functions.predict_app_success_batch(candidates, EXISTING_DATA)
+    batch_texts = functions.recommendation_texts(candidates, batch)
+    assert list(batch.index) == list(candidates.index)
+
+    for position, (_, app) in enumerate(candidates.iterrows()):
+        score, texts = functions.predict_app_success(app.to_dict(), EXISTING_DATA)
+        assert batch['success_score'].iloc[position] == score
+        assert batch_texts[position] == texts
+    # Kandidat mencakup semua jenis rekomendasi
+    codes = {code for app_codes in batch['recommendation_codes'] for code in app_codes}
+    assert codes == {'rating_below', 'rating_above', 'installs_below', 'installs_above', 'size_large'}
+
+
+def test_score_candidates_csv():
+    """Upload CSV kandidat diskor sama dengan predict_app_success_batch, kolom lain ikut dikembalikan"""
+    upload = io.StringIO("app_name,category,rating,total_installs,size_mb\n"
+                         "Alpha,GAME,4.8,10000000,20.0\n"
+                         "Beta,WEATHER,4.0,50000,30.0\n")
+    result = functions.score_candidates_csv(upload, EXISTING_DATA)
+    upload.seek(0)
+    candidates = pd.read_csv(upload)
+    batch = functions.predict_app_success_batch(candidates, EXISTING_DATA)
+
+    assert list(result['app_name']) == ['Alpha', 'Beta']
+    assert list(result['success_score']) == list(batch['success_score'])
+    assert list(result['recommendation_codes']) == list(batch['recommendation_codes'])
+    assert list(result['recommendations']) == functions.recommendation_texts(candidates, batch)
+
+    try:
+        functions.score_candidates_csv(io.StringIO("category,rating\nGAME,4.0\n"), EXISTING_DATA)
+    except ValueError as e:
+        assert 'total_installs' in str(e)
+    else:
+        raise AssertionError("CSV tanpa kolom wajib harus ditolak")
@@ -0,0 +1,146 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Di atas batas ini scatter digambar dengan WebGL (Scattergl), bukan SVG
+WEBGL_THRESHOLD = int(os.environ.get('DASHBOARD_WEBGL_THRESHOLD', 1000))
+# Di atas batas ini titik tidak dikirim ke browser, diganti grid kepadatan 2D hasil binning di server
+MAX_SCATTER_POINTS = int(os.environ.get('DASHBOARD_MAX_SCATTER_POINTS', 20000))
+DENSITY_BINS = int(os.environ.get('DASHBOARD_DENSITY_BINS', 60))
+HISTOGRAM_BINS = 20
+
+
+# ===============================
+# BINNING (DIPAKAI PANDAS DAN DUCKDB)
+# ===============================
+
+def bin_edges(low, high, nbins):
+    """Batas bin sama lebar dari low sampai high (rentang nol dilebarkan menjadi 1)"""
+    low = float(low)
+    high = float(high)
+    if not high > low:
+        high = low + 1.0
+    return np.linspace(low, high, nbins + 1)
+
+
+def bin_index(values, edges):
+    """Nomor bin tiap nilai; nilai di batas atas masuk ke bin terakhir"""
+    nbins = len(edges) - 1
+    width = (edges[-1] - edges[0]) / nbins
+    index = np.floor((np.asarray(values, dtype=float) - edges[0]) / width)
+    return np.clip(index, 0, nbins - 1).astype(int)
+
+
+def histogram_frame(edges, index, counts):
+    """Frame (bin_start, bin_end, count) untuk semua bin, bin tanpa data bernilai 0"""
+    full = np.zeros(max(len(edges) - 1, 0), dtype=int)
+    np.add.at(full, np.asarray(index, dtype=int), np.asarray(counts, dtype=int))
+    return pd.DataFrame({'bin_start': edges[:-1], 'bin_end': edges[1:], 'count': full})
+
+
+def histogram_bins(values, nbins=HISTOGRAM_BINS, counts=None):
+    """Histogram yang sudah di-bin di server; hanya jumlah per bin yang dikirim ke browser.
+
+    counts (opsional) adalah jumlah baris per nilai, mis. dari CubeSelection.value_counts.
+    """
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    counts = np.ones(len(values), dtype=int) if counts is None else np.asarray(counts, dtype=int)
+    valid = ~np.isnan(values) & (counts > 0)
+    values = values[valid]
+    if len(values) == 0:
+        return histogram_frame(np.array([]), [], [])
+    edges = bin_edges(values.min(), values.max(), nbins)
+    return histogram_frame(edges, bin_index(values, edges), counts[valid])
+
+
+def scatter_values(values, log=False):
+    """Nilai sumbu untuk binning 2D; sumbu log memakai log10 dan membuang nilai <= 0 (seperti plotly)"""
+    values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float)
+    if log:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(values > 0, np.log10(values), np.nan)
+    return values
+
+
+def grid_frame(x_index, y_index, counts, x_edges, y_edges):
+    """Sel grid kepadatan yang berisi data: titik tengah x, y dan jumlah titik"""
+    x_index = np.asarray(x_index, dtype=int)
+    y_index = np.asarray(y_index, dtype=int)
+    return pd.DataFrame({
+        'x': (x_edges[x_index] + x_edges[x_index + 1]) / 2,
+        'y': (y_edges[y_index] + y_edges[y_index + 1]) / 2,
+        'count': np.asarray(counts, dtype=int),
+    })
+
+
+def density_grid(x_values, y_values, nbins=DENSITY_BINS):
+    """Binning 2D titik scatter menjadi grid kepadatan (hanya sel yang terisi)"""
+    valid = ~(np.isnan(x_values) | np.isnan(y_values))
+    x_values = x_values[valid]
+    y_values = y_values[valid]
+    if len(x_values) == 0:
+        return pd.DataFrame(columns=['x', 'y', 'count'])
+    x_edges = bin_edges(x_values.min(), x_values.max(), nbins)
+    y_edges = bin_edges(y_values.min(), y_values.max(), nbins)
+    cells = pd.DataFrame({'x': bin_index(x_values, x_edges), 'y': bin_index(y_values, y_edges)})
+    counts = cells.value_counts(sort=False).reset_index(name='count')
+    return grid_frame(counts['x'], counts['y'], counts['count'], x_edges, y_edges)
+
+
+def reduce_scatter(points, x, y, log_y=False):
+    """Data scatter untuk dikirim ke browser.
+
+    Sampai MAX_SCATTER_POINTS baris titik dikirim apa adanya; di atasnya diganti
+    grid kepadatan 2D, sehingga ukuran payload tidak lagi ikut jumlah baris.
+    """
+    total = len(points)
+    if total <= MAX_SCATTER_POINTS:
+        return {'points': points, 'density': None, 'total': total}
+    density = density_grid(scatter_values(points[x]), scatter_values(points[y], log=log_y))
+    return {'points': None, 'density': density, 'total': total}
+
+
+# ===============================
+# FIGURE
+# ===============================
+
+def histogram_figure(bins, title, x_label, color):
+    """Bar chart dari histogram yang sudah di-bin di server"""
+    fig = go.Figure(go.Bar(
+        x=(bins['bin_start'] + bins['bin_end']) / 2,
+        y=bins['count'],
+        width=bins['bin_end'] - bins['bin_start'],
+        marker_color=color,
+        customdata=np.stack([bins['bin_start'], bins['bin_end']], axis=-1) if len(bins) else None,
+        hovertemplate='%{customdata[0]:.2f} - %{customdata[1]:.2f}<br>Jumlah: %{y}<extra></extra>',
+    ))
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title='count', bargap=0)
+    return fig
+
+
+def scatter_figure(reduced, x, y, title, labels, log_y=False, **scatter_kwargs):
+    """Scatter biasa, Scattergl untuk data besar, atau heatmap kepadatan untuk data sangat besar"""
+    if reduced['density'] is None:
+        points = reduced['points']
+        render_mode = 'webgl' if len(points) > WEBGL_THRESHOLD else 'svg'
+        return px.scatter(points, x=x, y=y, log_y=log_y, title=title, labels=labels,
+                          render_mode=render_mode, **scatter_kwargs)
+
+    grid = reduced['density']
+    fig = go.Figure(go.Heatmap(
+        x=grid['x'], y=grid['y'], z=grid['count'],
+        colorscale='Teal', colorbar={'title': 'Jumlah aplikasi'},
+        hovertemplate='Jumlah aplikasi: %{z}<extra></extra>',
+    ))
+    fig.update_layout(
+        title=f"{title}<br><span style=\"font-size:12px\">Kepadatan {reduced['total']:,} aplikasi</span>",
+        xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y),
+    )
+    if log_y and len(grid):
+        # Sumbu y berisi log10, label tick ditulis sebagai nilai aslinya
+        ticks = np.arange(np.floor(grid['y'].min()), np.ceil(grid['y'].max()) + 1)
+        fig.update_yaxes(tickvals=ticks, ticktext=[f"{10 ** tick:,.0f}" for tick in ticks])
+    return fig
@@ -0,0 +1,212 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:  # engine opsional, tanpa duckdb agregat dihitung dengan pandas
+    duckdb = None
+
+from plots import HISTOGRAM_BINS, MAX_SCATTER_POINTS, DENSITY_BINS, bin_edges, grid_frame, histogram_frame
+
+# Nomor bin dalam SQL, semantik sama dengan plots.bin_index (nilai di batas atas masuk bin terakhir)
+BIN_SQL = "LEAST(GREATEST(FLOOR(({value} - ${prefix}_low) / ${prefix}_width), 0), ${prefix}_last)"
+
+# Filter sidebar dalam SQL, semantik sama dengan filter_frame (batas rating inklusif)
+FILTER_SQL = """
+    (NOT $filter_categories OR list_contains($categories, CAST(category AS VARCHAR)))
+    AND ($price_type = 'all' OR CAST(price_type AS VARCHAR) = $price_type)
+    AND (NOT $filter_rating OR (rating >= $rating_low AND rating <= $rating_high))
+"""
+
+
+def _bin_params(prefix, edges):
+    nbins = len(edges) - 1
+    return {
+        f'{prefix}_low': float(edges[0]),
+        f'{prefix}_width': float((edges[-1] - edges[0]) / nbins),
+        f'{prefix}_last': nbins - 1,
+    }
+
+
+def _filter_params(filter_spec):
+    categories = list(filter_spec.get('categories') or [])
+    rating_range = filter_spec.get('rating_range')
+    return {
+        'filter_categories': bool(categories),
+        'categories': categories,
+        'price_type': filter_spec.get('price_type') or 'all',
+        'filter_rating': bool(rating_range),
+        'rating_low': float(rating_range[0]) if rating_range else 0.0,
+        'rating_high': float(rating_range[1]) if rating_range else 0.0,
+    }
+
+
+class DuckDBQueryEngine:
+    """Filter + agregat per tab sebagai query DuckDB di atas dataset yang sudah ada di memori.
+
+    DataFrame per versi di-register sebagai view (tanpa copy); hasil query hanya
+    frame kecil yang dibutuhkan grafik, dengan bentuk yang sama seperti compute_*_aggregates.
+    """
+
+    def __init__(self, max_views=8):
+        self.connection = duckdb.connect()
+        self.max_views = max_views
+        self._views = OrderedDict()  # version -> nama view
+        self._lock = threading.Lock()
+
+    def _view(self, version, df):
+        view = self._views.get(version)
+        if view is None:
+            view = f"dataset_{len(self._views)}_{version}"
+            self.connection.register(view, df)
+            self._views[version] = view
+            while len(self._views) > self.max_views:
+                _, old_view = self._views.popitem(last=False)
+                self.connection.unregister(old_view)
+        self._views.move_to_end(version)
+        return view
+
+    def _query(self, sql, params):
+        return self.connection.execute(sql, params).df()
+
+    def _histogram(self, view, params, column):
+        """Histogram kolom untuk baris yang lolos filter, di-bin di DuckDB (bentuk sama dengan histogram_bins)"""
+        where = f"{FILTER_SQL} AND {column} IS NOT NULL"
+        low, high = self.connection.execute(f"SELECT MIN({column}), MAX({column}) FROM {view} WHERE {where}",
+                                            params).fetchone()
+        if low is None:
+            return histogram_frame(bin_edges(0, 1, HISTOGRAM_BINS), [], [])
+        edges = bin_edges(low, high, HISTOGRAM_BINS)
+        counts = self._query(f"""
+            SELECT {BIN_SQL.format(value=column, prefix='bin')} AS bin, COUNT(*) AS count
+            FROM {view} WHERE {where} GROUP BY 1
+        """, dict(params, **_bin_params('bin', edges)))
+        return histogram_frame(edges, counts['bin'], counts['count'])
+
+    def _scatter(self, points_sql, params, total, x, y):
+        """Titik scatter, atau grid kepadatan 2D (sumbu y log) jika total melebihi MAX_SCATTER_POINTS"""
+        if total <= MAX_SCATTER_POINTS:
+            return {'points': self._query(points_sql, params), 'density': None, 'total': total}
+        cells = f"""
+            SELECT x, y FROM (
+                SELECT TRY_CAST({x} AS DOUBLE) AS x,
+                    CASE WHEN {y} > 0 THEN LOG10({y}) END AS y
+                FROM ({points_sql})
+            ) WHERE x IS NOT NULL AND y IS NOT NULL
+        """
+        x_low, x_high, y_low, y_high = self.connection.execute(
+            f"SELECT MIN(x), MAX(x), MIN(y), MAX(y) FROM ({cells})", params).fetchone()
+        if x_low is None:
+            return {'points': None, 'density': pd.DataFrame(columns=['x', 'y', 'count']), 'total': total}
+        x_edges = bin_edges(x_low, x_high, DENSITY_BINS)
+        y_edges = bin_edges(y_low, y_high, DENSITY_BINS)
+        counts = self._query(f"""
+            SELECT {BIN_SQL.format(value='x', prefix='x')} AS x_bin,
+                {BIN_SQL.format(value='y', prefix='y')} AS y_bin,
+                COUNT(*) AS count
+            FROM ({cells}) GROUP BY 1, 2
+        """, dict(params, **_bin_params('x', x_edges), **_bin_params('y', y_edges)))
+        density = grid_frame(counts['x_bin'], counts['y_bin'], counts['count'], x_edges, y_edges)
+        return {'points': None, 'density': density, 'total': total}
+
+    def tab_aggregates(self, active_tab, version, df, filter_spec):
+        """Agregat tab untuk filter spec; None jika tidak ada baris yang lolos filter"""
+        params = _filter_params(filter_spec)
+        with self._lock:
+            view = self._view(version, df)
+            count = self.connection.execute(f"SELECT COUNT(*) FROM {view} WHERE {FILTER_SQL}", params).fetchone()[0]
+            if count == 0:
+                return None
+            if active_tab == 'overview':
+                return self._overview(view, params)
+            if active_tab == 'success-factors':
+                return self._success_factors(view, params, count)
+            if active_tab == 'revenue-insights':
+                return self._revenue(view, params)
+        raise ValueError(f"Tab tidak dikenali: {active_tab}")
+
+    def _overview(self, view, params):
+        categories = self._query(f"""
+            SELECT CAST(category AS VARCHAR) AS category, COUNT(*) AS count, AVG(rating) + 0.2 AS target
+            FROM {view} WHERE {FILTER_SQL} AND category IS NOT NULL
+            GROUP BY 1 ORDER BY 1
+        """, params)
+        category_targets = categories[['category', 'target']].copy()
+        category_targets.columns = ['Kategori', 'Target Rating']
+        return {
+            'category_counts': categories[['category', 'count']],
+            'category_targets': category_targets,
+            'rating_bins': self._histogram(view, params, 'rating'),
+        }
+
+    def _success_factors(self, view, params, count):
+        # Skor dan missing value ditangani seperti compute_success_aggregates
+        points_cte = f"""
+            WITH points AS (
+                SELECT
+                    COALESCE(TRY_CAST(rating AS DOUBLE), 0) AS rating,
+                    COALESCE(TRY_CAST(total_installs AS DOUBLE), 0) AS total_installs,
+                    COALESCE(TRY_CAST(total_reviews AS DOUBLE), 0) AS total_reviews,
+                    app_name,
+                    CAST(category AS VARCHAR) AS category,
+                    fact_id
+                FROM {view} WHERE {FILTER_SQL}
+            ), scored AS (
+                SELECT *, rating * 0.6 + LOG10(CASE WHEN total_installs = 0 THEN 1 ELSE total_installs END) * 0.4
+                    AS skor_kesuksesan
+                FROM points
+            )
+        """
+        scatter = self._scatter(f"""
+            {points_cte}
+            SELECT rating, total_installs, total_reviews, app_name, category, skor_kesuksesan FROM scored
+        """, params, count, 'rating', 'total_installs')
+        top_apps = self._query(f"""
+            {points_cte}
+            SELECT app_name, category, rating, total_installs,
+                CASE
+                    WHEN total_installs >= 1e6 THEN printf('%.1f Juta', total_installs / 1e6)
+                    WHEN total_installs >= 1e3 THEN printf('%.0f Ribu', total_installs / 1e3)
+                    ELSE printf('%.0f', total_installs)
+                END AS Installs
+            FROM scored ORDER BY skor_kesuksesan DESC, fact_id LIMIT 10
+        """, params)
+        return {'scatter': scatter, 'top_apps': top_apps}
+
+    def _revenue(self, view, params):
+        paid_sql = f"""
+            SELECT price_value, total_installs, rating
+            FROM {view} WHERE {FILTER_SQL} AND CAST(price_type AS VARCHAR) = 'Paid'
+        """
+        paid_count = self.connection.execute(f"SELECT COUNT(*) FROM ({paid_sql})", params).fetchone()[0]
+        if paid_count == 0:
+            price_type_counts = self._query(f"""
+                SELECT CAST(price_type AS VARCHAR) AS price_type, COUNT(*) AS count
+                FROM {view} WHERE {FILTER_SQL} AND price_type IS NOT NULL
+                GROUP BY 1 ORDER BY 1
+            """, params)
+            return {'paid_apps': None, 'price_type_counts': price_type_counts}
+        comparison = self._query(f"""
+            SELECT
+                CAST(price_type AS VARCHAR) AS price_type,
+                AVG(rating) AS rating,
+                MEDIAN(total_installs) AS total_installs,
+                MEDIAN(total_reviews) AS total_reviews
+            FROM {view} WHERE {FILTER_SQL} AND price_type IS NOT NULL
+            GROUP BY 1 ORDER BY 1
+        """, params)
+        paid_apps = self._scatter(paid_sql, params, paid_count, 'price_value', 'total_installs')
+        return {'paid_apps': paid_apps, 'comparison': comparison}
+
+
+def create_query_engine():
+    """DuckDBQueryEngine jika DASHBOARD_QUERY_ENGINE=duckdb dan paket duckdb terinstall, selain itu None"""
+    if os.environ.get('DASHBOARD_QUERY_ENGINE', 'pandas') != 'duckdb':
+        return None
+    if duckdb is None:
+        print("Paket 'duckdb' belum terinstall, agregat dihitung dengan pandas")
+        return None
+    return DuckDBQueryEngine(max_views=int(os.environ.get('DASHBOARD_DATASET_VERSIONS', 8)))
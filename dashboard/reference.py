@@ -0,0 +1,78 @@
+import pandas as pd
+
+from schema import records_to_frame
+
+
+class ReferenceIndex:
+    """Statistik referensi satu versi dataset untuk analisis aplikasi baru.
+
+    Dibangun sekali per versi (satu groupby per kategori dan per kategori × tahun),
+    lalu dipakai bersama oleh grafik perbandingan, radar, trend, tabel perbandingan
+    dan skor kesuksesan, sehingga satu klik tidak lagi men-scan dataset berkali-kali.
+    """
+
+    def __init__(self, df):
+        self.empty = df.empty
+        self.has_years = 'release_year' in df.columns
+        self.by_category = pd.DataFrame(columns=['rating_mean', 'installs_median', 'size_median', 'free_share'])
+        self.trends = {}
+        if self.empty:
+            self.rating_mean = self.installs_median = self.size_median = 0
+            self.installs_max = self.size_max = 1
+            return
+
+        self.rating_mean = df['rating'].mean()
+        self.installs_median = df['total_installs'].median()
+        self.size_median = df['size_mb'].median()
+        self.installs_max = df['total_installs'].max()
+        self.size_max = df['size_mb'].max()
+
+        by_category = df.groupby('category', observed=True)
+        stats = pd.DataFrame({
+            'rating_mean': by_category['rating'].mean(),
+            'installs_median': by_category['total_installs'].median(),
+            'size_median': by_category['size_mb'].median(),
+        })
+        if 'price_type' in df.columns:
+            # Porsi aplikasi gratis di antara baris yang tipe harganya diketahui
+            free = (df['price_type'] == 'Free').groupby(df['category'], observed=True).sum()
+            priced = df['price_type'].notna().groupby(df['category'], observed=True).sum()
+            stats['free_share'] = (free / priced.where(priced > 0)).fillna(0)
+        else:
+            stats['free_share'] = 0.0
+        # Index categorical -> object supaya bisa dicari dengan nama kategori (string)
+        stats.index = stats.index.astype(object)
+        self.by_category = stats
+
+        if self.has_years:
+            trends = df.groupby(['category', 'release_year'], observed=True)['rating'].agg(['mean', 'count'])
+            for category, trend in trends.groupby(level=0, observed=True):
+                self.trends[category] = trend.droplevel(0).reset_index()
+
+    def category(self, name):
+        """Baris statistik kategori (rating_mean, installs_median, size_median, free_share) atau None"""
+        if name not in self.by_category.index:
+            return None
+        return self.by_category.loc[name]
+
+    def trend(self, name):
+        """Rating rata-rata dan jumlah aplikasi per tahun rilis untuk satu kategori"""
+        return self.trends.get(name, pd.DataFrame(columns=['release_year', 'mean', 'count']))
+
+    def scoring_stats(self):
+        """Statistik dalam bentuk yang dipakai score_apps"""
+        return {
+            'avg_rating': self.rating_mean,
+            'median_installs': self.installs_median,
+            'median_size': self.size_median,
+            'cat_avg_rating': self.by_category['rating_mean'],
+            'cat_median_installs': self.by_category['installs_median'],
+            'cat_median_size': self.by_category['size_median'],
+        }
+
+
+def as_reference_index(existing_data):
+    """ReferenceIndex apa adanya, atau dibangun dari DataFrame / data dcc.Store"""
+    if isinstance(existing_data, ReferenceIndex):
+        return existing_data
+    return ReferenceIndex(records_to_frame(existing_data))
@@ -0,0 +1,40 @@
+import pandas as pd
+
+# Kolom dengan kardinalitas kecil (7 content rating, ~33 kategori, dst.)
+# disimpan sebagai categorical supaya hemat memori dan groupby lebih cepat
+CATEGORICAL_COLUMNS = [
+    'category',
+    'genres',
+    'content_rating',
+    'price_type',
+    'android_version',
+    'release_month',
+]
+
+
+def apply_schema(df):
+    """Konversi kolom berkardinalitas kecil ke categorical (in-place, juga dikembalikan)"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def records_to_frame(records):
+    """Bangun DataFrame dari data dcc.Store (list of dict) lengkap dengan tipe categorical.
+
+    DataFrame yang sudah jadi (misalnya dari dataset registry) dikembalikan apa adanya.
+    """
+    if records is None:
+        return pd.DataFrame()
+    if isinstance(records, pd.DataFrame):
+        return records
+    return apply_schema(pd.DataFrame(records))
+
+
+def drop_unused_categories(df):
+    """Buang kategori yang tidak muncul lagi setelah filter, supaya grafik tidak menampilkan kategori kosong"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+# URL, kredensial DW_* dan pengaturan pool DW_POOL_* sama dengan ETL (common/warehouse.py)
+from common.warehouse import create_warehouse_engine
+
+# Checkout yang menunggu lebih lama dari ini dicetak sebagai peringatan (detik)
+SLOW_CHECKOUT_SECONDS = float(os.environ.get('DW_POOL_SLOW_CHECKOUT', 0.5))
+
+
+class CheckoutStats:
+    """Statistik waktu tunggu checkout koneksi dari pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if wait > SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+        if wait > SLOW_CHECKOUT_SECONDS:
+            print(f"Checkout koneksi warehouse lambat: {wait:.2f}s menunggu pool")
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'slow_checkouts': self.slow_checkouts,
+                'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+            }
+
+
+checkout_stats = CheckoutStats()
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Engine bersama untuk seluruh proses (dibuat sekali, dibuat ulang setelah fork worker)"""
+    global _engine, _engine_pid
+    with _engine_lock:
+        if _engine is not None and _engine_pid != os.getpid():
+            # Koneksi milik proses induk tidak boleh dipakai bersama, tinggalkan tanpa menutupnya
+            _engine.dispose(close=False)
+            _engine = None
+        if _engine is None:
+            _engine = create_warehouse_engine()
+            _engine_pid = os.getpid()
+        return _engine
+
+
+def _timed_checkout(checkout):
+    start = time.perf_counter()
+    try:
+        connection = checkout()
+    except PoolTimeoutError:
+        checkout_stats.record_timeout()
+        raise
+    checkout_stats.record(time.perf_counter() - start)
+    return connection
+
+
+@contextmanager
+def warehouse_connection():
+    """Koneksi SQLAlchemy dari pool bersama, dikembalikan ke pool setelah blok selesai"""
+    connection = _timed_checkout(get_engine().connect)
+    try:
+        yield connection
+    finally:
+        connection.close()
+
+
+def raw_connection():
+    """Koneksi DB-API dari pool bersama; close() mengembalikannya ke pool"""
+    return _timed_checkout(get_engine().raw_connection)
+
+
+def pool_stats():
+    stats = checkout_stats.as_dict()
+    pool = get_engine().pool
+    for name in ['size', 'checkedin', 'checkedout', 'overflow']:
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return stats
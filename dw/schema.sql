@@ -1,4 +1,5 @@
 -- Tabel dimensi
+-- Index natural key, foreign key dan covering index dibuat oleh etl/migrations.py
 CREATE TABLE dim_app (
     app_id SERIAL PRIMARY KEY,
     app_name TEXT,
@@ -41,5 +42,53 @@ CREATE TABLE fact_app_reviews (
     contentRating_id INT REFERENCES dim_contentRating(contentRating_id),
     rating FLOAT,
     total_reviews INT,
-    total_installs INT
+    total_installs INT,
+    source_key VARCHAR(64)
+);
+
+-- Fingerprint baris sumber untuk load incremental
+CREATE TABLE etl_load_state (
+    source_key VARCHAR(64) PRIMARY KEY,
+    row_hash VARCHAR(64) NOT NULL,
+    loaded_at DATETIME
+);
+
+-- Marker setiap run ETL yang selesai (dibandingkan dengan run id di snapshot dashboard)
+-- summary: ringkasan dataset (JSON) untuk header dan filter dashboard
+CREATE TABLE etl_runs (
+    run_id VARCHAR(32) PRIMARY KEY,
+    started_at DATETIME,
+    finished_at DATETIME,
+    fact_rows INT,
+    inserted_rows INT,
+    updated_rows INT,
+    summary TEXT
+);
+
+-- Cube agregat (kategori x tipe harga x content rating x bucket rating 0.1)
+CREATE TABLE agg_app_cube (
+    cell_id INT PRIMARY KEY,
+    category VARCHAR(100),
+    price_type VARCHAR(20),
+    content_rating VARCHAR(50),
+    rating_bucket FLOAT,
+    row_count INT,
+    rating_min FLOAT,
+    rating_max FLOAT,
+    rating_count INT, rating_sum DOUBLE, rating_sumsq DOUBLE,
+    total_installs_count INT, total_installs_sum DOUBLE, total_installs_sumsq DOUBLE,
+    total_reviews_count INT, total_reviews_sum DOUBLE, total_reviews_sumsq DOUBLE,
+    size_mb_count INT, size_mb_sum DOUBLE, size_mb_sumsq DOUBLE,
+    built_at DATETIME
+);
+
+-- Sketch kuantil per sel cube (bucket log 1% / rating 0.01, jumlah bucket per sel terbatas; lihat etl/cube.py)
+CREATE TABLE agg_app_cube_sketch (
+    cell_id INT,
+    metric VARCHAR(32),
+    bucket INT,
+    value_count INT,
+    value_min DOUBLE,
+    value_max DOUBLE,
+    PRIMARY KEY (cell_id, metric, bucket)
 );
@@ -0,0 +1,181 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from common.cube import CUBE_DIMENSIONS, CUBE_METRICS, CUBE_TABLE, SKETCH_TABLE
+from common.snapshot import SNAPSHOT_JOINS
+
+SKETCH_METRICS = ['rating', 'total_installs', 'total_reviews', 'size_mb']
+
+# Lebar bucket rating sama dengan step slider rating di dashboard
+RATING_BUCKET_WIDTH = 0.1
+
+# Sketch kuantil berbasis bucket dengan jumlah bucket terbatas per sel: metrik non-negatif memakai
+# bucket logaritmik (error relatif nilai kuantil <= 1%), rating bucket linear 0.01 (rating selalu 1-5).
+# Jumlah bucket per sel dibatasi rentang nilainya (install 1..1e9 paling banyak ~1040 bucket, rating
+# paling banyak 10 per sel karena grain cube sudah per 0.1), bukan jumlah baris fact. Bucket yang hanya
+# berisi satu nilai (tingkatan install, rating 1 desimal) memberi nilai tepat.
+# Trade-off: selama sel rata-rata hanya berisi sedikit baris (data contoh: ~6 baris per sel) tabel sketch
+# bisa lebih besar dari fact table; ukurannya berhenti tumbuh begitu sel makin penuh.
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+ZERO_BUCKET = -1000000  # nilai <= 0 dikumpulkan di satu bucket paling bawah
+RATING_SKETCH_WIDTH = 0.01
+
+# Join yang sama dengan query dashboard (SNAPSHOT_JOINS), supaya roll-up cube = agregat dari baris fact yang dilihat dashboard
+CUBE_SOURCE_QUERY = f"""
+    SELECT
+        a.category,
+        p.price_type,
+        c.content_rating,
+        f.rating,
+        f.total_installs,
+        f.total_reviews,
+        d.size_mb
+    {SNAPSHOT_JOINS}
+"""
+
+CUBE_COLUMNS = (
+    ['cell_id'] + CUBE_DIMENSIONS + ['row_count', 'rating_min', 'rating_max']
+    + [f"{metric}_{stat}" for metric in CUBE_METRICS for stat in ('count', 'sum', 'sumsq')]
+)
+SKETCH_COLUMNS = ['cell_id', 'metric', 'bucket', 'value_count', 'value_min', 'value_max']
+
+
+def sketch_buckets(values, metric=None):
+    """Index bucket untuk setiap nilai: linear untuk rating, logaritmik untuk metrik lain (nilai <= 0 -> ZERO_BUCKET)"""
+    values = np.asarray(values, dtype=float)
+    if metric == 'rating':
+        return np.floor(values / RATING_SKETCH_WIDTH + 1e-9).astype(np.int64)
+    buckets = np.full(len(values), ZERO_BUCKET, dtype=np.int64)
+    positive = values > 0
+    buckets[positive] = np.ceil(np.log(values[positive]) / np.log(SKETCH_GAMMA)).astype(np.int64)
+    return buckets
+
+
+def compute_cube(facts):
+    """Hitung sel cube (count, sum, sum of squares) dan sketch kuantil dari baris fact.
+
+    Mengembalikan (cells, sketches). Sel yang mengandung NULL pada dimensi tetap
+    disimpan supaya total cube sama dengan jumlah baris fact.
+    """
+    facts = facts.copy()
+    for metric in CUBE_METRICS:
+        facts[metric] = pd.to_numeric(facts[metric], errors='coerce')
+    facts['rating_bucket'] = (np.floor(facts['rating'] / RATING_BUCKET_WIDTH + 1e-9) * RATING_BUCKET_WIDTH).round(1)
+
+    for metric in CUBE_METRICS:
+        facts[f"{metric}_sq"] = facts[metric] ** 2
+
+    grouped = facts.groupby(CUBE_DIMENSIONS, dropna=False, sort=True)
+    cells = grouped.size().rename('row_count').to_frame()
+    cells['rating_min'] = grouped['rating'].min()
+    cells['rating_max'] = grouped['rating'].max()
+    for metric in CUBE_METRICS:
+        cells[f"{metric}_count"] = grouped[metric].count()
+        cells[f"{metric}_sum"] = grouped[metric].sum()
+        cells[f"{metric}_sumsq"] = grouped[f"{metric}_sq"].sum()
+    cells = cells.reset_index()
+    cells.insert(0, 'cell_id', np.arange(1, len(cells) + 1))
+
+    # cell_id untuk setiap baris fact, lewat nomor grup yang urutannya sama dengan cells
+    facts['cell_id'] = grouped.ngroup().to_numpy() + 1
+
+    sketches = []
+    for metric in SKETCH_METRICS:
+        values = facts[['cell_id', metric]].dropna()
+        values['bucket'] = sketch_buckets(values[metric], metric)
+        sketch = values.groupby(['cell_id', 'bucket'])[metric].agg(['count', 'min', 'max']).reset_index()
+        sketch.columns = ['cell_id', 'bucket', 'value_count', 'value_min', 'value_max']
+        sketch.insert(1, 'metric', metric)
+        sketches.append(sketch)
+    sketches = pd.concat(sketches, ignore_index=True)[SKETCH_COLUMNS]
+
+    return cells[CUBE_COLUMNS], sketches
+
+
+def ensure_cube_tables(conn):
+    metric_columns = ',\n'.join(
+        f"                {metric}_count INT, {metric}_sum DOUBLE, {metric}_sumsq DOUBLE"
+        for metric in CUBE_METRICS
+    )
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {CUBE_TABLE} (
+                cell_id INT PRIMARY KEY,
+                category VARCHAR(100),
+                price_type VARCHAR(20),
+                content_rating VARCHAR(50),
+                rating_bucket FLOAT,
+                row_count INT,
+                rating_min FLOAT,
+                rating_max FLOAT,
+{metric_columns},
+                built_at DATETIME
+            )
+        """)
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SKETCH_TABLE} (
+                cell_id INT,
+                metric VARCHAR(32),
+                bucket INT,
+                value_count INT,
+                value_min DOUBLE,
+                value_max DOUBLE,
+                PRIMARY KEY (cell_id, metric, bucket)
+            )
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def _to_rows(df):
+    """Baris tuple dengan NaN -> None dan tipe numpy -> tipe Python"""
+    return [
+        tuple(None if pd.isna(value) else value.item() if hasattr(value, 'item') else value for value in row)
+        for row in df.itertuples(index=False, name=None)
+    ]
+
+
+def save_cube(conn, cells, sketches, batch_size=1000):
+    """Ganti isi tabel cube dalam satu transaksi"""
+    built_at = datetime.now()
+    cell_rows = [row + (built_at,) for row in _to_rows(cells)]
+    sketch_rows = _to_rows(sketches)
+    cell_query = (f"INSERT INTO {CUBE_TABLE} ({', '.join(CUBE_COLUMNS)}, built_at) "
+                  f"VALUES ({', '.join(['%s'] * (len(CUBE_COLUMNS) + 1))})")
+    sketch_query = (f"INSERT INTO {SKETCH_TABLE} ({', '.join(SKETCH_COLUMNS)}) "
+                    f"VALUES ({', '.join(['%s'] * len(SKETCH_COLUMNS))})")
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DELETE FROM {SKETCH_TABLE}")
+        cur.execute(f"DELETE FROM {CUBE_TABLE}")
+        for start in range(0, len(cell_rows), batch_size):
+            cur.executemany(cell_query, cell_rows[start:start + batch_size])
+        for start in range(0, len(sketch_rows), batch_size):
+            cur.executemany(sketch_query, sketch_rows[start:start + batch_size])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def build_cube(conn, batch_size=1000):
+    """Materialisasi cube agregat dari isi fact table saat ini"""
+    ensure_cube_tables(conn)
+    cur = conn.cursor()
+    try:
+        cur.execute(CUBE_SOURCE_QUERY)
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    facts = pd.DataFrame(rows, columns=['category', 'price_type', 'content_rating'] + CUBE_METRICS)
+    cells, sketches = compute_cube(facts)
+    save_cube(conn, cells, sketches, batch_size=batch_size)
+    print(f"Aggregate cube: {len(cells)} cells, {len(sketches)} sketch buckets from {len(facts)} fact rows")
+    return cells, sketches
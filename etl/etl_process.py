@@ -1,349 +1,278 @@
+import argparse
 import pandas as pd
-import mysql.connector
 from datetime import datetime
 import os
+import sys
+
+# common/ (konfigurasi warehouse, cube dan snapshot bersama dashboard) ada di root repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from incremental import (add_row_fingerprints, count_facts, delete_removed_rows, ensure_load_state,
+                         fetch_load_state, new_run_id, record_run, reset_load_state, save_load_state,
+                         split_changes)
+from cube import build_cube
+from export import export_tables
+from extract import compute_mean_rating, read_source_chunks
+from key_resolution import (DIMENSION_KEYS, check_legacy_fact_links, fetch_fact_links, fetch_key_map,
+                            find_mislinked_facts, find_missing_facts, legacy_device_links,
+                            print_mislink_report, resolve_dimension_keys)
+from migrations import apply_migrations
+from loader import bulk_upsert_dimension, load_facts, update_facts
+from snapshot import compute_dataset_summary, write_snapshot
+from transform import build_dimensions, clean_chunks
+from common.warehouse import create_warehouse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Backend warehouse: MySQL (default) atau SQLite embedded, lewat DW_BACKEND
+WAREHOUSE = create_warehouse()
+
+# Ukuran batch dan mode load fact table ('executemany' atau 'load_data')
+FACT_BATCH_SIZE = int(os.environ.get('ETL_FACT_BATCH_SIZE', WAREHOUSE.fact_batch_size))
+FACT_LOAD_MODE = os.environ.get('ETL_FACT_LOAD_MODE', 'executemany')
+if FACT_LOAD_MODE == 'load_data' and not WAREHOUSE.supports_load_data:
+    print(f"LOAD DATA is not available on {WAREHOUSE.name}, using executemany")
+    FACT_LOAD_MODE = 'executemany'
 
 def create_connection():
-    """Create new MySQL database connection"""
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",              
-        password="",  
-        database="playstoredb",    
-        port=3306                 
+    """Create new warehouse database connection"""
+    return WAREHOUSE.connect(allow_local_infile=(FACT_LOAD_MODE == 'load_data'))
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="ETL Google Play Store ke data warehouse",
+        epilog="Load incremental mengenali baris sumber dari nama app + urutan kemunculannya di CSV. "
+               "Menghapus atau menyisipkan baris di tengah menggeser nomor kemunculan baris app yang sama "
+               "sesudahnya, sehingga baris itu ikut di-update; hasil akhirnya tetap sama dengan --full-refresh.",
     )
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="hapus semua fact lalu load ulang, bukan hanya baris baru/berubah")
+    parser.add_argument('--chunk-size', type=int, default=int(os.environ.get('ETL_CHUNK_SIZE', 50000)),
+                        help="jumlah baris CSV yang dibaca dan diproses per chunk")
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('ETL_WORKERS', 1)),
+                        help="jumlah proses untuk cleaning chunk secara paralel (1 = serial)")
+    parser.add_argument('--export-format', choices=['arrow', 'csv', 'none'],
+                        default=os.environ.get('ETL_EXPORT_FORMAT', 'arrow'),
+                        help="format export tabel ke folder tables/ (arrow = Arrow IPC + manifest)")
+    return parser.parse_args()
+
+def validate_legacy_facts(conn, csv_path, args, mean_rating):
+    """Report facts of a warehouse loaded before source_key existed that link to the wrong device.
+
+    Such facts cannot be matched row by row, so the whole source is resolved
+    against the stored dimensions first; the full refresh that follows reloads them.
+    """
+    key_maps = {table: fetch_key_map(conn, table) for table in DIMENSION_KEYS}
+    expected_links = []
+    for _, df in clean_chunks(read_source_chunks(csv_path, args.chunk_size), mean_rating, workers=args.workers):
+        resolved, _ = resolve_dimension_keys(conn, df, key_maps)
+        expected_links.append(legacy_device_links(resolved))
+    if not expected_links:
+        return
+    mislinked_counts, checked, unmatched = check_legacy_fact_links(
+        conn, pd.concat(expected_links).drop_duplicates()
+    )
+    print_mislink_report(mislinked_counts, checked)
+    if unmatched:
+        print(f"- without a matching source row: {unmatched}")
+    print("Existing facts are reloaded with the current key resolution")
 
-def get_id_safe(conn, table, column, value):
-    """Safely get ID with individual transaction - FIXED untuk sesuai database schema"""
-    cur = conn.cursor()
+# === MAIN ETL PROCESS ===
+def run_etl(args):
+    """Run extract, transform and load for the whole source CSV; returns the run id, or None on failure"""
+    run_id = None
     try:
-        # FIXED: Sesuaikan dengan nama kolom ID di database Anda
-        id_column_map = {
-            'dim_app': 'app_id',
-            'dim_price': 'price_id', 
-            'dim_contentRating': 'contentRating_id',
-            'dim_device': 'device_id',
-            'dim_date': 'date_id'
-        }
-        id_column = id_column_map.get(table, 'id')
-        
-        cur.execute(f"SELECT {id_column} FROM {table} WHERE {column} = %s", (value,))
-        result = cur.fetchone()
-        return result[0] if result else None
-    except Exception as e:
-        conn.rollback()
-        print(f"Error getting ID from {table} for value '{value}': {e}")
-        return None
-    finally:
+        csv_path = os.path.join(BASE_DIR, "../data/app-playstore.csv")
+
+        started_at = datetime.now()
+        run_id = new_run_id()
+        print(f"ETL run {run_id} (warehouse: {WAREHOUSE.name})")
+
+        conn = create_connection()
+        WAREHOUSE.ensure_schema(conn)
+        successful_loads = 0
+        inserted_records = 0
+        updated_records = 0
+        skipped_loads = 0
+        original_records = 0
+        cleaned_records = 0
+
+        # Incremental: hanya baris baru/berubah yang di-load, berdasarkan fingerprint baris sumber
+        ensure_load_state(conn)
+        # Index natural key/foreign key (idempoten, hanya index yang belum ada yang dibuat)
+        apply_migrations(conn, WAREHOUSE)
+
+        # Rating kosong diisi rata-rata seluruh file, jadi dihitung dulu sebelum chunk pertama
+        print(f"Computing mean rating (chunk size {args.chunk_size})...")
+        mean_rating = compute_mean_rating(csv_path, args.chunk_size)
+        print(f"Mean rating: {mean_rating:.3f}")
+
+        if args.full_refresh:
+            print("Full refresh: removing existing facts and load state...")
+            reset_load_state(conn)
+        else:
+            if fetch_load_state(conn).empty and count_facts(conn) > 0:
+                # Fact lama tanpa fingerprint tidak bisa dicocokkan per baris: link dimensinya dicek
+                # dulu terhadap sumber (laporan mis-link), lalu semuanya di-load ulang
+                print("No load state found for existing facts, validating their links before a full refresh...")
+                validate_legacy_facts(conn, csv_path, args, mean_rating)
+                reset_load_state(conn)
+        load_state = fetch_load_state(conn)
+        # Validasi link fact yang tidak berubah, per chunk (hanya source_key chunk itu yang di-query)
+        mislinked_counts = {}
+        checked_links = 0
+        missing_facts = 0
+
+        key_maps = {}
+        app_occurrences = {}
+        # source_key yang ada di sumber run ini; fact dengan key lain sudah hilang dari sumber
+        seen_keys = set()
+
+        # === 1. EXTRACT dari CSV (streaming per chunk) ===
+        chunks = read_source_chunks(csv_path, args.chunk_size)
+
+        # === 2. TRANSFORM & CLEAN DATA ===
+        # Dengan --workers > 1 chunk dibersihkan paralel, hasil tetap keluar sesuai urutan
+        if args.workers > 1:
+            print(f"Cleaning chunks with {args.workers} worker processes...")
+        cleaned_chunks = clean_chunks(chunks, mean_rating, workers=args.workers)
+
+        for chunk_num, (rows_read, df) in enumerate(cleaned_chunks, start=1):
+            original_records += rows_read
+            cleaned_records += len(df)
+            print(f"\nChunk {chunk_num}: {rows_read} rows read, {len(df)} rows after cleaning")
+
+            if chunk_num == 1:
+                # Show sample of cleaned data
+                print("Sample cleaned data:")
+                sample_cols = ['App', 'Category', 'Price', 'Type', 'Size', 'Rating', 'Android Ver']
+                print(df[sample_cols].head())
+
+            # === 3. LOAD DIMENSIONS ===
+            # Hanya member baru yang di-insert, key map lengkap dipakai untuk fact table
+            for table, members in build_dimensions(df).items():
+                key_maps[table] = bulk_upsert_dimension(
+                    conn, table, members, DIMENSION_KEYS[table][1], existing=key_maps.get(table)
+                )
+
+            # === 4. LOAD FACT TABLE ===
+            df = add_row_fingerprints(df, app_occurrences)
+            seen_keys.update(df['source_key'])
+            new_df, changed_df, unchanged_df = split_changes(df, load_state)
+            print(f"Changes: {len(new_df)} new, {len(changed_df)} changed, {len(unchanged_df)} unchanged")
+
+            # Resolve semua dimension ID sekaligus (tanpa query tambahan, key map sudah ada)
+            new_facts, unresolved_new = resolve_dimension_keys(conn, new_df, key_maps)
+            changed_facts, unresolved_changed = resolve_dimension_keys(conn, changed_df, key_maps)
+            unresolved_df = pd.concat([unresolved_new, unresolved_changed])
+            for _, row in unresolved_df.iterrows():
+                print(f"Missing IDs for app '{row['App']}': {row['missing_dims']}")
+            skipped_loads += len(unresolved_df)
+
+            # Fact lama bisa terhubung ke member dimensi yang salah (mis. device sebelum key komposit);
+            # baris sumbernya tidak berubah, jadi diperbaiki lewat update biasa
+            unchanged_facts, _ = resolve_dimension_keys(conn, unchanged_df, key_maps)
+            fact_links = fetch_fact_links(conn, unchanged_facts['source_key'])
+            mislinked = find_mislinked_facts(unchanged_facts, fact_links)
+            checked_links += len(unchanged_facts)
+            # Fingerprint tersimpan tapi fact-nya tidak ada (mis. load lama yang gagal): insert ulang
+            restored_facts = find_missing_facts(unchanged_facts, fact_links)
+            missing_facts += len(restored_facts)
+            if len(mislinked):
+                mislinked_counts['total'] = mislinked_counts.get('total', 0) + len(mislinked)
+                for dims in mislinked['mislinked_dims']:
+                    for label in dims.split(', '):
+                        mislinked_counts[label] = mislinked_counts.get(label, 0) + 1
+                changed_facts = pd.concat([changed_facts, mislinked.drop(columns='mislinked_dims')])
+
+            # Bulk insert: satu transaksi per batch, bukan commit per baris
+            loaded_keys, failed = load_facts(conn, pd.concat([new_facts, restored_facts]),
+                                             batch_size=FACT_BATCH_SIZE, mode=FACT_LOAD_MODE)
+            loaded = len(loaded_keys)
+            successful_loads += loaded
+            skipped_loads += failed
+
+            updated_keys, failed = update_facts(conn, changed_facts, batch_size=FACT_BATCH_SIZE)
+            updated = len(updated_keys)
+            successful_loads += updated
+            skipped_loads += failed
+            inserted_records += loaded
+            updated_records += updated
+            print(f"Fact rows inserted: {loaded}, updated: {updated}")
+
+            # Fingerprint hanya untuk baris yang benar-benar tertulis; baris gagal dicoba lagi di run berikutnya
+            # (fact yang diinsert ulang sudah punya baris state, jadi ikut di-update)
+            save_load_state(conn, new_facts[new_facts['source_key'].isin(loaded_keys)],
+                            pd.concat([changed_facts[changed_facts['source_key'].isin(updated_keys)],
+                                       restored_facts[restored_facts['source_key'].isin(loaded_keys)]]),
+                            batch_size=FACT_BATCH_SIZE)
+
+        if checked_links:
+            print_mislink_report(mislinked_counts, checked_links, missing=missing_facts)
+
+        # Baris yang dihapus dari sumber: fact dan fingerprint-nya ikut dihapus
+        removed_keys = load_state.loc[~load_state['source_key'].isin(seen_keys), 'source_key']
+        if len(removed_keys) and cleaned_records == 0:
+            print("⚠️  Source produced no rows, keeping existing facts")
+        elif len(removed_keys):
+            deleted = delete_removed_rows(conn, removed_keys)
+            print(f"\nFact rows deleted (no longer in source): {deleted}")
+
+        # === 5. AGGREGATE CUBE ===
+        # Dibangun ulang dari seluruh fact table, bukan hanya baris yang berubah di run ini
+        print("\nBuilding aggregate cube...")
+        build_cube(conn, batch_size=FACT_BATCH_SIZE)
+
+        # === 6. SNAPSHOT UNTUK DASHBOARD ===
+        # Tabel lebar hasil join; run marker ditulis sesudahnya supaya dashboard bisa cek snapshot masih segar
         try:
-            cur.fetchall()  # Tambahkan ini agar hasil SELECT dibersihkan
-        except:
-            pass
-        cur.close()
-
-def insert_dimension_safe(conn, table, columns, values):
-    """Safely insert to dimension table"""
-    cur = conn.cursor()
-    try:
-        placeholders = ', '.join(['%s'] * len(values))
-        column_names = ', '.join(columns)
-        query = f"INSERT IGNORE INTO {table} ({column_names}) VALUES ({placeholders})"
-        cur.execute(query, values)
-        conn.commit()
-        return True
-    except Exception as e:
-        conn.rollback()
-        print(f"Error inserting to {table}: {e}")
-        return False
-    finally:
-        cur.close()
+            write_snapshot(conn, run_id)
+        except Exception as e:
+            print(f"❌ Failed to write snapshot: {e}")
+        # Ringkasan dataset ikut disimpan di run marker; dashboard membangun layout dari sini tanpa memuat data
+        record_run(conn, run_id, started_at, inserted_records, updated_records,
+                   summary=compute_dataset_summary(conn))
 
-# === MAIN ETL PROCESS ===
-try:
-    # === 1. EXTRACT dari CSV ===
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    csv_path = os.path.join(BASE_DIR, "../data/app-playstore.csv")
-    df = pd.read_csv(csv_path)
-    df.columns = df.columns.str.strip() 
-
-    print("Kolom yang tersedia:", df.columns.tolist())
-    print(f"Total records sebelum cleaning: {len(df)}")
-
-    # === 2. TRANSFORM & CLEAN DATA ===
-    print("Starting data transformation and cleaning...")
-
-    # HAPUS baris yang mengandung "Varies with device" di kolom Size
-    print("Removing rows with 'Varies with device' in Size column...")
-    initial_count = len(df)
-    df = df[df['Size'] != 'Varies with device'].copy()
-    df = df[df['Android Ver'] != 'Varies with device'].copy()
-    print(f"Removed {initial_count - len(df)} rows with 'Varies with device'")
-
-    # HAPUS baris yang mengandung "Unknown" di kolom Category atau Genres
-    print("Removing rows with 'Unknown' values...")
-    initial_count = len(df)
-    df = df[df['Category'] != 'Unknown'].copy()
-    df = df[df['Genres'] != 'Unknown'].copy()
-    print(f"Removed {initial_count - len(df)} rows with 'Unknown' values")
-
-    # HAPUS baris dengan nilai NaN di kolom penting
-    print("Removing rows with critical missing values...")
-    initial_count = len(df)
-    df = df.dropna(subset=['App', 'Category', 'Genres']).copy()
-    print(f"Removed {initial_count - len(df)} rows with critical missing values")
-
-    df['App'] = df['App'].astype(str).str.encode('ascii', errors='ignore').str.decode('ascii')  # buang emoji/simbol aneh
-    df['App'] = df['App'].str.replace(r'[^\w\s\-&]', '', regex=True)  # buang simbol aneh tapi tetap pertahankan huruf, angka, spasi, &, -
-    df['App'] = df['App'].str.strip()  # buang spasi depan-belakang
-
-    for col in ['Category', 'Genres', 'Content Rating']:
-        df[col] = df[col].astype(str).str.strip()
-        df[col] = df[col].str.title()  # konsisten kapitalisasi (misal 'Everyone' bukan 'everyone')
-
-
-    # Clean kolom Size (sekarang tidak ada 'Varies with device')
-    print("Cleaning Size column...")
-    df['Size'] = df['Size'].astype(str).str.replace('M', '', regex=False).str.replace('k', '', regex=False).str.replace('+', '', regex=False)
-    df['Size'] = pd.to_numeric(df['Size'], errors='coerce').fillna(0)
-   
-
-    # Clean kolom Price
-    print("Cleaning Price column...")
-    df['Price'] = df['Price'].astype(str).str.replace('$', '', regex=False)
-    df['Price'] = pd.to_numeric(df['Price'], errors='coerce').fillna(0)
-
-    # Buat kolom Type berdasarkan Price
-    df['Type'] = df['Price'].apply(lambda x: 'Free' if x == 0 else 'Paid')
-
-    # Clean kolom Installs
-    print("Cleaning Installs column...")
-    df['Installs'] = df['Installs'].astype(str).str.replace(',', '', regex=False).str.replace('+', '', regex=False)
-    df['Installs'] = pd.to_numeric(df['Installs'], errors='coerce').fillna(0)
-
-    # Clean Rating dan Reviews
-    print("Cleaning Rating and Reviews...")
-    df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
-    mean_rating = df['Rating'].mean()
-    df['Rating'] = df['Rating'].fillna(mean_rating)
-    df['Reviews'] = pd.to_numeric(df['Reviews'], errors='coerce').fillna(0)
-
-    # Fill missing values dengan nilai default yang masuk akal
-    df['Content Rating'] = df['Content Rating'].fillna('Everyone')
-    df['Current Ver'] = df['Current Ver'].fillna('1.0')
-    df['Android Ver'] = df['Android Ver'].fillna('4.0 and up')
-    df['Android Ver'] = df['Android Ver'].astype(str).str.strip()
-    df['Android Ver'] = df['Android Ver'].str.replace('and up', '', regex=False).str.strip()  # buang "and up"
-
-    # Process dates
-    print("Processing date columns...")
-    df['Released'] = pd.to_datetime(df['Released'], errors='coerce')
-    default_date = pd.Timestamp('2018-01-01')
-    df['release_date'] = df['Released'].fillna(default_date)
-    df['release_month'] = df['release_date'].dt.strftime('%B')
-    df['release_year'] = df['release_date'].dt.year
-
-    string_cols = df.select_dtypes(include='object').columns
-    for col in string_cols:
-        if col == 'Content Rating':  # Skip Content Rating agar tanda + tidak dihilangkan
-            continue
-        df[col] = df[col].astype(str)
-        df[col] = df[col].str.encode('ascii', errors='ignore').str.decode('ascii')
-        df[col] = df[col].str.replace(r'[^\w\s.\-@&]', '', regex=True)
-        df[col] = df[col].str.strip()
-
-    print(f"Final record count after all cleaning: {len(df)}")
-    print("Data transformation completed!")
-    
-    # Show sample of cleaned data
-    print("\nSample cleaned data:")
-    sample_cols = ['App', 'Category', 'Price', 'Type', 'Size', 'Rating', 'Android Ver']
-    print(df[sample_cols].head())
-
-
-    # === 3. CREATE DIMENSIONS ===
-    print("\nCreating dimension dataframes...")
-    dim_app = df.groupby('App', as_index=False).agg({
-    'Category': 'first',
-    'Genres': 'first',
-    'Current Ver': 'first'
-})
-    dim_price = df[['Price', 'Type']].drop_duplicates().reset_index(drop=True)
-    dim_content = df[['Content Rating']].drop_duplicates().reset_index(drop=True)
-    dim_device = df[['Android Ver', 'Size']].drop_duplicates().reset_index(drop=True)
-    dim_date = df[['release_date', 'release_month', 'release_year']].drop_duplicates().reset_index(drop=True)
-
-    print(f"Dimension sizes:")
-    print(f"- App: {len(dim_app)}")
-    print(f"- Price: {len(dim_price)}")
-    print(f"- Content: {len(dim_content)}")
-    print(f"- Device: {len(dim_device)}")
-    print(f"- Date: {len(dim_date)}")
-
-    # === 4. LOAD DIMENSIONS ===
-    print("\nLoading dimension tables...")
-    conn = create_connection()
-
-    # Load dim_app
-    print("Loading dim_app...")
-    app_success = 0
-    for _, row in dim_app.iterrows():
-        if insert_dimension_safe(conn, 'dim_app', 
-                                ['app_name', 'category', 'genres', 'current_ver'],
-                                [str(row['App']), str(row['Category']), str(row['Genres']), str(row['Current Ver'])]):
-            app_success += 1
-    print(f"dim_app: {app_success}/{len(dim_app)} inserted")
-
-    # Load dim_price
-    print("Loading dim_price...")
-    price_success = 0
-    for _, row in dim_price.iterrows():
-        if insert_dimension_safe(conn, 'dim_price',
-                                ['price_value', 'price_type'],
-                                [float(row['Price']), str(row['Type'])]):
-            price_success += 1
-    print(f"dim_price: {price_success}/{len(dim_price)} inserted")
-
-    # Load dim_contentRating
-    print("Loading dim_contentRating...")
-    content_success = 0
-    for _, row in dim_content.iterrows():
-        if insert_dimension_safe(conn, 'dim_contentRating',
-                                ['content_rating'],
-                                [str(row['Content Rating'])]):
-            content_success += 1
-    print(f"dim_contentRating: {content_success}/{len(dim_content)} inserted")
-
-    # Load dim_device
-    print("Loading dim_device...")
-    device_success = 0
-    for _, row in dim_device.iterrows():
-        if insert_dimension_safe(conn, 'dim_device',
-                                ['android_version', 'size_mb'],
-                                [str(row['Android Ver']), float(row['Size'])]):
-            device_success += 1
-    print(f"dim_device: {device_success}/{len(dim_device)} inserted")
-
-    # Load dim_date
-    print("Loading dim_date...")
-    date_success = 0
-    for _, row in dim_date.iterrows():
-        if insert_dimension_safe(conn, 'dim_date',
-                                ['release_date', 'release_month', 'release_year'],
-                                [row['release_date'], str(row['release_month']), int(row['release_year'])]):
-            date_success += 1
-    print(f"dim_date: {date_success}/{len(dim_date)} inserted")
-
-    # === 5. LOAD FACT TABLE ===
-    print("\nLoading fact table...")
-    successful_loads = 0
-    skipped_loads = 0
-
-    # Process in smaller batches untuk performa yang lebih baik
-    batch_size = 100
-    total_batches = (len(df) + batch_size - 1) // batch_size
-
-    for batch_num in range(total_batches):
-        start_idx = batch_num * batch_size
-        end_idx = min(start_idx + batch_size, len(df))
-        batch_df = df.iloc[start_idx:end_idx]
-        
-        print(f"Processing batch {batch_num + 1}/{total_batches} (rows {start_idx+1}-{end_idx})")
-        
-        for _, row in batch_df.iterrows():
-            try:
-                # Get IDs for each dimension
-                app_id = get_id_safe(conn, 'dim_app', 'app_name', str(row['App']))
-                price_id = get_id_safe(conn, 'dim_price', 'price_value', float(row['Price']))
-                content_id = get_id_safe(conn, 'dim_contentRating', 'content_rating', str(row['Content Rating']))
-                device_id = get_id_safe(conn, 'dim_device', 'android_version', str(row['Android Ver']))
-                date_id = get_id_safe(conn, 'dim_date', 'release_date', row['release_date'])
-
-                # Check if all IDs are found
-                if None in [app_id, price_id, content_id, device_id, date_id]:
-                    missing_ids = []
-                    if app_id is None: missing_ids.append("app")
-                    if price_id is None: missing_ids.append("price") 
-                    if content_id is None: missing_ids.append("content")
-                    if device_id is None: missing_ids.append("device")
-                    if date_id is None: missing_ids.append("date")
-                    
-                    print(f"Missing IDs for app '{row['App']}': {', '.join(missing_ids)}")
-                    skipped_loads += 1
-                    continue
-
-                # Insert fact record
-                cur = conn.cursor()
-                try:
-                    cur.execute("""
-                        INSERT INTO fact_app_reviews (
-                            app_id, device_id, date_id,
-                            price_id, contentRating_id,
-                            rating, total_reviews, total_installs
-                        )
-                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                        app_id, device_id, date_id,
-                        price_id, content_id,
-                        float(row['Rating']), int(row['Reviews']), int(row['Installs'])
-                    ))
-                    conn.commit()
-                    successful_loads += 1
-                except Exception as e:
-                    conn.rollback()
-                    print(f"Error inserting fact for app '{row['App']}': {e}")
-                    skipped_loads += 1
-                finally:
-                    cur.close()
-                    
-            except Exception as e:
-                print(f"Error processing app '{row['App']}': {e}")
-                skipped_loads += 1
-
-        # Progress update setiap 20 batch
-        if (batch_num + 1) % 20 == 0:
-            print(f"Progress: {batch_num + 1}/{total_batches} batches completed")
-
-
-    conn.close()
-
-    print(f"\n🎉 ETL Process Completed Successfully!")
-    print(f"📊 Successfully loaded: {successful_loads} records")
-    print(f"⚠️  Skipped records: {skipped_loads} records")
-    if (successful_loads + skipped_loads) > 0:
-        success_rate = successful_loads/(successful_loads+skipped_loads)*100
-        print(f"📈 Success rate: {success_rate:.1f}%")
-    else:
-        print("📈 No records processed")
+        conn.close()
+
+        print(f"\nDimension sizes:")
+        for table, key_map in key_maps.items():
+            print(f"- {table}: {len(key_map)}")
+
+        print(f"\n🎉 ETL Process Completed Successfully!")
+        print(f"📊 Successfully loaded: {successful_loads} records")
+        print(f"⚠️  Skipped records: {skipped_loads} records")
+        if (successful_loads + skipped_loads) > 0:
+            success_rate = successful_loads/(successful_loads+skipped_loads)*100
+            print(f"📈 Success rate: {success_rate:.1f}%")
+        else:
+            print("📈 No records processed")
     
-    print(f"\n📋 Data Summary:")
-    print(f"- Original records: {len(pd.read_csv(csv_path))}")
-    print(f"- After cleaning: {len(df)}")
-    print(f"- Successfully loaded to fact table: {successful_loads}")
+        print(f"\n📋 Data Summary:")
+        print(f"- Original records: {original_records}")
+        print(f"- After cleaning: {cleaned_records}")
+        print(f"- Successfully loaded to fact table: {successful_loads}")
+        print(f"⏱️  Duration: {(datetime.now() - started_at).total_seconds():.1f}s on {WAREHOUSE.name}")
+        print(f"🔌 Connection pool: {WAREHOUSE.pool_summary()}")
 
-except Exception as e:
-    print(f"❌ Fatal error during ETL process: {e}")
-    import traceback
-    traceback.print_exc()
+    except Exception as e:
+        print(f"❌ Fatal error during ETL process: {e}")
+        import traceback
+        traceback.print_exc()
+        run_id = None
 
-print("\n🏁 ETL process finished.")
+    print("\n🏁 ETL process finished.")
+    return run_id
 
-def export_table_to_csv(table_name, filename):
-    try:
+if __name__ == '__main__':
+    args = parse_args()
+    run_id = run_etl(args)
+
+    # Export tabel warehouse (Arrow IPC + manifest, atau CSV)
+    if run_id is not None and args.export_format != 'none':
         conn = create_connection()
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-        conn.close()
-        export_dir = os.path.join(BASE_DIR, "../tables")
-        os.makedirs(export_dir, exist_ok=True)
-        export_path = os.path.join(export_dir, filename)
-        df.to_csv(export_path, index=False)
-        print(f"✅ Exported {table_name} to {filename}")
-    except Exception as e:
-        print(f"❌ Failed to export {table_name}: {e}")
-
-# Panggil fungsi ekspor
-export_table_to_csv("dim_app", "dim_app.csv")
-export_table_to_csv("dim_price", "dim_price.csv")
-export_table_to_csv("dim_contentRating", "dim_contentRating.csv")
-export_table_to_csv("dim_device", "dim_device.csv")
-export_table_to_csv("dim_date", "dim_date.csv")
-export_table_to_csv("fact_app_reviews", "fact_app_reviews.csv")
\ No newline at end of file
+        try:
+            export_tables(conn, run_id, fmt=args.export_format)
+        finally:
+            conn.close()
+    WAREHOUSE.dispose()
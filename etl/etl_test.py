@@ -1,14 +1,102 @@
-import mysql.connector
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+# common/ (konfigurasi warehouse, cube dan snapshot bersama dashboard) ada di root repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.warehouse import SQLiteConnection, create_warehouse
+from extract import compute_mean_rating, read_source_chunks
+from incremental import LOAD_STATE_TABLE, add_row_fingerprints, delete_removed_rows, split_changes
+from loader import FACT_COLUMNS, load_facts
+from transform import clean_chunks
 
 try:
-    conn = mysql.connector.connect(
-        host="localhost",
-        user="root",                  
-        password="",  
-        database="playstoredb",       
-        port=3306
-    )
-    print("✅ Koneksi sukses ke MySQL!")
+    warehouse = create_warehouse()
+    conn = warehouse.connect()
+    print(f"✅ Koneksi sukses ke warehouse ({warehouse.name})!")
     conn.close()
-except mysql.connector.Error as e:
-    print("❌ Gagal konek ke MySQL:", e)
+    warehouse.dispose()
+except Exception as e:
+    print("❌ Gagal konek ke warehouse:", e)
+
+
+def test_parallel_transform_matches_serial():
+    """Cleaning paralel (process pool) harus sama persis dengan cleaning serial"""
+    csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../data/app-playstore.csv")
+    chunk_size = 1000
+    mean_rating = compute_mean_rating(csv_path, chunk_size)
+
+    serial = [df for _, df in clean_chunks(read_source_chunks(csv_path, chunk_size), mean_rating, workers=1)]
+    parallel = [df for _, df in clean_chunks(read_source_chunks(csv_path, chunk_size), mean_rating, workers=4)]
+
+    assert len(serial) == len(parallel)
+    pd.testing.assert_frame_equal(pd.concat(serial), pd.concat(parallel))
+
+
+def _source_rows(apps, ratings):
+    return pd.DataFrame({
+        'App': apps, 'Category': 'GAME', 'Genres': 'Action', 'Current Ver': '1.0',
+        'Price': 0.0, 'Type': 'Free', 'Content Rating': 'Everyone',
+        'Android Ver': '4.1', 'Size': 19.0, 'release_date': pd.Timestamp('2018-08-03'),
+        'Rating': ratings, 'Reviews': 10, 'Installs': 1000,
+    })
+
+
+def test_fingerprints_and_split_changes():
+    """source_key stabil lintas chunk, dan split_changes memisahkan baris baru/berubah/tetap"""
+    apps = ['A', 'B', 'A', 'C']
+    whole = add_row_fingerprints(_source_rows(apps, [4.0, 3.5, 4.1, 5.0]), {})
+    # App yang sama di chunk berikutnya tetap mendapat nomor kemunculan lanjutan
+    occurrences = {}
+    chunked = pd.concat([
+        add_row_fingerprints(_source_rows(apps[:2], [4.0, 3.5]), occurrences),
+        add_row_fingerprints(_source_rows(apps[2:], [4.1, 5.0]), occurrences),
+    ])
+    assert list(chunked['source_key']) == list(whole['source_key'])
+    assert list(chunked['row_hash']) == list(whole['row_hash'])
+    assert whole['source_key'].is_unique
+
+    # State: A#0 tersimpan sama, B berubah, A#1 dan C belum pernah di-load
+    state = pd.DataFrame({
+        'source_key': whole['source_key'].iloc[:2],
+        'stored_hash': [whole['row_hash'].iloc[0], 'old-hash'],
+    })
+    new_df, changed_df, unchanged_df = split_changes(whole, state)
+    assert list(new_df.index) == [2, 3]
+    assert list(changed_df.index) == [1]
+    assert list(unchanged_df.index) == [0]
+
+
+def test_load_facts_returns_only_written_keys():
+    """Baris yang gagal di fallback per baris tidak boleh dilaporkan sebagai tertulis"""
+    raw = sqlite3.connect(':memory:')
+    raw.execute(f"CREATE TABLE fact_app_reviews (fact_id INTEGER PRIMARY KEY, {', '.join(FACT_COLUMNS)})")
+    raw.execute("CREATE UNIQUE INDEX ux_fact_source_key ON fact_app_reviews (source_key)")
+    conn = SQLiteConnection(raw)
+    facts = pd.DataFrame({
+        'app_id': 1, 'device_id': 1, 'date_id': 1, 'price_id': 1, 'contentRating_id': 1,
+        'Rating': 4.0, 'Reviews': 10, 'Installs': 1000,
+        'source_key': ['k1', 'k2', 'k1', 'k3'], 'App': 'A',
+    })
+    # Batch pertama gagal karena source_key dobel, fallback per baris melewati baris ketiga
+    loaded_keys, skipped = load_facts(conn, facts, batch_size=4)
+    assert loaded_keys == ['k1', 'k2', 'k3']
+    assert skipped == 1
+    assert raw.execute("SELECT COUNT(*) FROM fact_app_reviews").fetchone()[0] == 3
+
+
+def test_delete_removed_rows():
+    """Fact dan fingerprint baris yang hilang dari sumber ikut dihapus, baris lain tetap"""
+    raw = sqlite3.connect(':memory:')
+    raw.execute(f"CREATE TABLE fact_app_reviews (fact_id INTEGER PRIMARY KEY, {', '.join(FACT_COLUMNS)})")
+    raw.execute(f"CREATE TABLE {LOAD_STATE_TABLE} (source_key PRIMARY KEY, row_hash, loaded_at)")
+    for key in ['k1', 'k2', 'k3']:
+        raw.execute("INSERT INTO fact_app_reviews (source_key) VALUES (?)", (key,))
+        raw.execute(f"INSERT INTO {LOAD_STATE_TABLE} VALUES (?, 'h', NULL)", (key,))
+    conn = SQLiteConnection(raw)
+    assert delete_removed_rows(conn, ['k1', 'k3'], batch_size=1) == 2
+    assert raw.execute("SELECT source_key FROM fact_app_reviews").fetchall() == [('k2',)]
+    assert raw.execute(f"SELECT source_key FROM {LOAD_STATE_TABLE}").fetchall() == [('k2',)]
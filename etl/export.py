@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from common.snapshot import EXPORT_DIR, MANIFEST_NAME
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # tanpa pyarrow hanya export CSV yang tersedia
+    pa = None
+
+EXPORT_TABLES = ['dim_app', 'dim_price', 'dim_contentRating', 'dim_device', 'dim_date', 'fact_app_reviews']
+
+# Kolom teks dengan rasio nilai unik di bawah ini disimpan dictionary-encoded
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def fetch_table(conn, table_name):
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT * FROM {table_name}")
+        rows = cur.fetchall()
+        columns = [column[0] for column in cur.description]
+    finally:
+        cur.close()
+    return pd.DataFrame(rows, columns=columns)
+
+
+def to_arrow_table(df):
+    """DataFrame -> Arrow table; kolom teks berkardinalitas kecil di-dictionary-encode"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(table.schema):
+        if not pa.types.is_string(field.type) or table.num_rows == 0:
+            continue
+        column = table.column(i)
+        distinct = len(column.unique())
+        if distinct <= DICTIONARY_MAX_RATIO * table.num_rows:
+            table = table.set_column(i, field.name, column.dictionary_encode())
+    return table
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_arrow(table, path):
+    def write(tmp_path):
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    _write_atomic(path, write)
+
+
+def export_tables(conn, run_id, export_dir=EXPORT_DIR, tables=EXPORT_TABLES, fmt='arrow'):
+    """Export tabel warehouse ke export_dir plus manifest.json (jumlah baris, checksum, run id ETL).
+
+    fmt='arrow' menulis file Arrow IPC tanpa kompresi (bisa di-memory-map oleh
+    pembaca), fmt='csv' menulis CSV seperti export lama.
+    """
+    if fmt == 'arrow' and pa is None:
+        print("⚠️  pyarrow not installed, falling back to CSV export")
+        fmt = 'csv'
+
+    os.makedirs(export_dir, exist_ok=True)
+    manifest = {
+        'run_id': run_id,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'format': fmt,
+        'tables': {},
+    }
+    for table_name in tables:
+        try:
+            df = fetch_table(conn, table_name)
+            filename = f"{table_name}.{fmt}"
+            path = os.path.join(export_dir, filename)
+            if fmt == 'arrow':
+                write_arrow(to_arrow_table(df), path)
+            else:
+                _write_atomic(path, lambda tmp_path: df.to_csv(tmp_path, index=False))
+            manifest['tables'][table_name] = {
+                'file': filename,
+                'rows': len(df),
+                'columns': list(df.columns),
+                'sha256': file_checksum(path),
+            }
+            print(f"✅ Exported {table_name} to {filename} ({len(df)} rows)")
+        except Exception as e:
+            print(f"❌ Failed to export {table_name}: {e}")
+
+    manifest_path = os.path.join(export_dir, MANIFEST_NAME)
+
+    def write_manifest(tmp_path):
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    _write_atomic(manifest_path, write_manifest)
+    print(f"✅ Manifest written: {manifest_path}")
+    return manifest
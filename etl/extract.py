@@ -0,0 +1,31 @@
+import pandas as pd
+
+from transform import clean_ratings, filter_rows
+
+# Kolom yang dibutuhkan filter_rows + Rating, untuk pass pertama yang ringan
+MEAN_RATING_COLUMNS = ['App', 'Category', 'Genres', 'Size', 'Android Ver', 'Rating']
+
+
+def read_source_chunks(csv_path, chunk_size, usecols=None):
+    """Stream the source CSV as DataFrames of at most chunk_size rows"""
+    if usecols is not None:
+        wanted = set(usecols)
+        usecols = lambda column: column.strip() in wanted
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, usecols=usecols):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def compute_mean_rating(csv_path, chunk_size):
+    """Mean rating of all rows that survive cleaning, computed in one streaming pass.
+
+    Missing ratings are filled with the mean of the whole source, so it has to
+    be known before the first chunk is cleaned.
+    """
+    total = 0.0
+    count = 0
+    for chunk in read_source_chunks(csv_path, chunk_size, usecols=MEAN_RATING_COLUMNS):
+        ratings = clean_ratings(filter_rows(chunk))
+        total += ratings.sum()
+        count += ratings.count()
+    return total / count if count else float('nan')
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime
+
+import pandas as pd
+
+LOAD_STATE_TABLE = 'etl_load_state'
+RUN_LOG_TABLE = 'etl_runs'
+
+# Kolom hasil cleaning yang masuk ke warehouse; perubahan di salah satunya = fact berubah
+HASH_COLUMNS = [
+    'App', 'Category', 'Genres', 'Current Ver',
+    'Price', 'Type', 'Content Rating',
+    'Android Ver', 'Size', 'release_date',
+    'Rating', 'Reviews', 'Installs'
+]
+
+
+def _sha1(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def add_row_fingerprints(df, app_occurrences=None):
+    """Add source_key (stable row identity) and row_hash (content fingerprint) columns.
+
+    source_key is the app name plus its occurrence number in the snapshot,
+    because the Play Store export contains the same app more than once.
+    When the source is processed in chunks, pass the same app_occurrences
+    dict for every chunk so the numbering continues across chunks.
+    """
+    df = df.copy()
+    apps = df['App'].astype(str)
+    occurrence = df.groupby(apps).cumcount()
+    if app_occurrences is not None:
+        occurrence = occurrence + apps.map(app_occurrences).fillna(0).astype(int)
+        for app, count in apps.value_counts().items():
+            app_occurrences[app] = app_occurrences.get(app, 0) + count
+    df['source_key'] = [_sha1(f"{app}\x1f{n}") for app, n in zip(apps, occurrence.astype(str))]
+    values = df[HASH_COLUMNS].copy()
+    # Float dibulatkan supaya selisih pembulatan (mis. rata-rata rating per chunk) tidak dianggap perubahan
+    float_cols = values.select_dtypes(include='float').columns
+    values[float_cols] = values[float_cols].round(6)
+    values = values.astype(str)
+    df['row_hash'] = [_sha1('\x1f'.join(row)) for row in values.itertuples(index=False, name=None)]
+    return df
+
+
+def ensure_load_state(conn):
+    """Create the load-state and run-log tables and the fact source_key and run summary columns if they are missing"""
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {LOAD_STATE_TABLE} (
+                source_key VARCHAR(64) PRIMARY KEY,
+                row_hash VARCHAR(64) NOT NULL,
+                loaded_at DATETIME
+            )
+        """)
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {RUN_LOG_TABLE} (
+                run_id VARCHAR(32) PRIMARY KEY,
+                started_at DATETIME,
+                finished_at DATETIME,
+                fact_rows INT,
+                inserted_rows INT,
+                updated_rows INT,
+                summary TEXT
+            )
+        """)
+        try:
+            cur.execute("SELECT source_key FROM fact_app_reviews LIMIT 1")
+            cur.fetchall()
+        except Exception:
+            # Warehouse lama belum punya kolom source_key
+            cur.execute("ALTER TABLE fact_app_reviews ADD COLUMN source_key VARCHAR(64)")
+        try:
+            cur.execute(f"SELECT summary FROM {RUN_LOG_TABLE} LIMIT 1")
+            cur.fetchall()
+        except Exception:
+            # Run log lama belum menyimpan ringkasan dataset
+            cur.execute(f"ALTER TABLE {RUN_LOG_TABLE} ADD COLUMN summary TEXT")
+        conn.commit()
+    finally:
+        cur.close()
+
+
+def fetch_load_state(conn):
+    """Fetch the stored source_key -> row_hash map"""
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT source_key, row_hash FROM {LOAD_STATE_TABLE}")
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    return pd.DataFrame(rows, columns=['source_key', 'stored_hash'])
+
+
+def count_facts(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COUNT(*) FROM fact_app_reviews")
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+
+
+def reset_load_state(conn):
+    """Full refresh: remove all facts and the stored fingerprints"""
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM fact_app_reviews")
+        cur.execute(f"DELETE FROM {LOAD_STATE_TABLE}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def delete_removed_rows(conn, source_keys, batch_size=1000):
+    """Delete the facts and stored fingerprints of source rows that are no longer in the source.
+
+    Returns the number of deleted fact rows; each batch is one transaction.
+    """
+    source_keys = list(source_keys)
+    deleted = 0
+    for start_idx in range(0, len(source_keys), batch_size):
+        batch_keys = source_keys[start_idx:start_idx + batch_size]
+        placeholders = ', '.join(['%s'] * len(batch_keys))
+        cur = conn.cursor()
+        try:
+            cur.execute(f"DELETE FROM fact_app_reviews WHERE source_key IN ({placeholders})", batch_keys)
+            deleted += max(cur.rowcount, 0)
+            cur.execute(f"DELETE FROM {LOAD_STATE_TABLE} WHERE source_key IN ({placeholders})", batch_keys)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Error deleting removed rows: {e}")
+        finally:
+            cur.close()
+    return deleted
+
+
+def split_changes(df, state):
+    """Split fingerprinted rows into (new, changed, unchanged) against the stored state"""
+    merged = df.merge(state, how='left', on='source_key')
+    merged.index = df.index
+    is_new = merged['stored_hash'].isna()
+    is_changed = ~is_new & (merged['stored_hash'] != merged['row_hash'])
+    return df[is_new], df[is_changed], df[~is_new & ~is_changed]
+
+
+def save_load_state(conn, new_df, changed_df, batch_size=1000):
+    """Store fingerprints of the rows that were just inserted or updated.
+
+    Pass only rows the loader reports as written; a row without a stored
+    fingerprint is treated as new on the next run and retried.
+    """
+    loaded_at = datetime.now().replace(microsecond=0)
+    insert_rows = [(key, row_hash, loaded_at) for key, row_hash in zip(new_df['source_key'], new_df['row_hash'])]
+    update_rows = [(row_hash, loaded_at, key) for key, row_hash in zip(changed_df['source_key'], changed_df['row_hash'])]
+
+    statements = [
+        (f"INSERT INTO {LOAD_STATE_TABLE} (source_key, row_hash, loaded_at) VALUES (%s, %s, %s)", insert_rows),
+        (f"UPDATE {LOAD_STATE_TABLE} SET row_hash = %s, loaded_at = %s WHERE source_key = %s", update_rows),
+    ]
+    for query, rows in statements:
+        for start_idx in range(0, len(rows), batch_size):
+            cur = conn.cursor()
+            try:
+                cur.executemany(query, rows[start_idx:start_idx + batch_size])
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"Error saving load state: {e}")
+            finally:
+                cur.close()
+
+
+def new_run_id():
+    """Run id: timestamp plus random suffix, so ids sort by start time"""
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def record_run(conn, run_id, started_at, inserted_rows, updated_rows, summary=None):
+    """Write the run marker; readers compare it with the run id stored in ETL outputs.
+
+    summary (dict, stored as JSON) lets the dashboard build its layout without loading the dataset.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            f"INSERT INTO {RUN_LOG_TABLE} "
+            "(run_id, started_at, finished_at, fact_rows, inserted_rows, updated_rows, summary) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            (run_id, started_at.replace(microsecond=0), datetime.now().replace(microsecond=0),
+             count_facts(conn), inserted_rows, updated_rows,
+             json.dumps(summary) if summary is not None else None)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
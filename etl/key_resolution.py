@@ -0,0 +1,220 @@
+import pandas as pd
+
+# Konfigurasi natural key per dimensi:
+# table -> (kolom surrogate key, kolom natural key di DB, kolom sumber di DataFrame, label)
+# Natural key boleh lebih dari satu kolom (dim_device: versi Android + ukuran)
+DIMENSION_KEYS = {
+    'dim_app': ('app_id', ['app_name'], ['App'], 'app'),
+    'dim_price': ('price_id', ['price_value'], ['Price'], 'price'),
+    'dim_contentRating': ('contentRating_id', ['content_rating'], ['Content Rating'], 'content'),
+    'dim_device': ('device_id', ['android_version', 'size_mb'], ['Android Ver', 'Size'], 'device'),
+    'dim_date': ('date_id', ['release_date'], ['release_date'], 'date'),
+}
+
+
+# Kolom natural key yang perlu normalisasi khusus sebelum dibandingkan
+FLOAT_KEY_COLUMNS = ['price_value', 'size_mb']
+DATE_KEY_COLUMNS = ['release_date']
+
+
+def normalize_column(column, values):
+    """Normalize natural key values so DB values and DataFrame values compare equal"""
+    values = pd.Series(values)
+    if column in FLOAT_KEY_COLUMNS:
+        # FLOAT di MySQL tidak presisi, bandingkan sampai 2 desimal
+        return pd.to_numeric(values, errors='coerce').round(2)
+    if column in DATE_KEY_COLUMNS:
+        return pd.to_datetime(values, errors='coerce').dt.normalize()
+    return values.astype(str)
+
+
+def hash_natural_key(key_columns, frame, source_columns=None):
+    """Hash (uint64) of the normalized natural key tuple of every row, in one vectorized pass.
+
+    frame holds the key values under source_columns (defaults to the DB key
+    column names); the same tuple hashes to the same value on both sides.
+    """
+    source_columns = source_columns or key_columns
+    normalized = pd.DataFrame({
+        column: normalize_column(column, frame[source]).values
+        for column, source in zip(key_columns, source_columns)
+    }, index=frame.index)
+    return pd.util.hash_pandas_object(normalized, index=False)
+
+
+def fetch_key_map(conn, table, key_columns=None):
+    """Fetch the natural key -> surrogate key map of one dimension in a single query"""
+    id_column, default_key_columns, _, _ = DIMENSION_KEYS[table]
+    key_columns = list(key_columns or default_key_columns)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT {id_column}, {', '.join(key_columns)} FROM {table} ORDER BY {id_column}")
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    key_map = pd.DataFrame(rows, columns=[id_column] + key_columns)
+    for column in key_columns:
+        key_map[column] = normalize_column(column, key_map[column]).values
+    # Sama seperti SELECT ... fetchone(): kalau natural key dobel, pakai ID terkecil
+    return key_map.drop_duplicates(subset=key_columns, keep='first').reset_index(drop=True)
+
+
+def resolve_dimension_keys(conn, df, key_maps=None):
+    """Resolve all dimension IDs for the fact rows with one query per dimension.
+
+    Returns (resolved, unresolved): resolved has the *_id columns added,
+    unresolved holds rows with at least one missing ID plus a 'missing_dims' column.
+    """
+    result = df.copy()
+    missing = pd.DataFrame(index=result.index)
+
+    for table, (id_column, key_columns, source_columns, label) in DIMENSION_KEYS.items():
+        key_map = key_maps[table] if key_maps and table in key_maps else fetch_key_map(conn, table)
+        key_map = key_map.sort_values(id_column).drop_duplicates(subset=key_columns, keep='first')
+        # Lookup lewat hash tuple natural key, bukan merge per kolom
+        lookup = pd.Series(key_map[id_column].values, index=hash_natural_key(key_columns, key_map).values)
+        source_hashes = hash_natural_key(key_columns, result, source_columns)
+        ids = pd.Series(source_hashes.map(lookup).values, index=result.index)
+        result[id_column] = ids.astype('Int64')
+        missing[label] = ids.isna()
+
+    has_missing = missing.any(axis=1)
+    unresolved = result[has_missing].copy()
+    unresolved['missing_dims'] = [
+        ', '.join(missing.columns[flags]) for flags in missing[has_missing].to_numpy()
+    ]
+    resolved = result[~has_missing].copy()
+    for id_column, _, _, _ in DIMENSION_KEYS.values():
+        resolved[id_column] = resolved[id_column].astype('int64')
+
+    return resolved, unresolved
+
+
+# ===============================
+# VALIDASI: fact yang terhubung ke member dimensi yang salah
+# ===============================
+
+def fetch_fact_links(conn, source_keys, batch_size=1000):
+    """Stored dimension IDs of the fact rows with the given source_keys, indexed by source_key.
+
+    Queried per batch of keys (WHERE source_key IN ...), so memory follows the
+    chunk being validated instead of the size of the fact table.
+    """
+    id_columns = [id_column for id_column, _, _, _ in DIMENSION_KEYS.values()]
+    source_keys = list(source_keys)
+    rows = []
+    for start_idx in range(0, len(source_keys), batch_size):
+        batch_keys = source_keys[start_idx:start_idx + batch_size]
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                f"SELECT source_key, {', '.join(id_columns)} FROM fact_app_reviews "
+                f"WHERE source_key IN ({', '.join(['%s'] * len(batch_keys))})",
+                batch_keys
+            )
+            rows.extend(cur.fetchall())
+        finally:
+            cur.close()
+    return pd.DataFrame(rows, columns=['source_key'] + id_columns).set_index('source_key')
+
+
+def find_mislinked_facts(resolved, fact_links):
+    """Rows of resolved whose stored fact points at other dimension members than the natural keys resolve to.
+
+    Returns the mis-linked rows with a 'mislinked_dims' column (labels of the
+    dimensions that differ). Warehouses loaded before dim_device had a
+    composite key link most facts to the wrong device this way. Rows without
+    a stored fact are not mis-linked; find them with find_missing_facts.
+    """
+    if resolved.empty or fact_links.empty:
+        return resolved.iloc[0:0].assign(mislinked_dims=pd.Series(dtype=object))
+    stored = fact_links.reindex(resolved['source_key'].values)
+    mismatch = pd.DataFrame(index=resolved.index)
+    for id_column, _, _, label in DIMENSION_KEYS.values():
+        stored_ids = stored[id_column].to_numpy()
+        # Fact yang belum ada di warehouse bukan mis-link
+        mismatch[label] = (~pd.isna(stored_ids)) & (stored_ids != resolved[id_column].to_numpy())
+    is_mislinked = mismatch.any(axis=1)
+    mislinked = resolved[is_mislinked].copy()
+    mislinked['mislinked_dims'] = [
+        ', '.join(mismatch.columns[flags]) for flags in mismatch[is_mislinked].to_numpy()
+    ]
+    return mislinked
+
+
+def find_missing_facts(resolved, fact_links):
+    """Rows of resolved that have a stored fingerprint but no fact row in the warehouse"""
+    return resolved[~resolved['source_key'].isin(fact_links.index)]
+
+
+# ===============================
+# VALIDASI WAREHOUSE LAMA: fact tanpa source_key
+# ===============================
+
+# Fact lama dicocokkan dengan baris sumber lewat ID yang selalu di-resolve benar plus versi Android
+# member device yang tersimpan; resolusi lama mencari device_id hanya dari versi Android
+LEGACY_MATCH_COLUMNS = ['app_id', 'price_id', 'date_id', 'contentRating_id', 'android_version']
+
+LEGACY_LINK_QUERY = """
+    SELECT f.fact_id, f.app_id, f.price_id, f.date_id, f.contentRating_id, d.android_version, f.device_id
+    FROM fact_app_reviews f
+    JOIN dim_device d ON f.device_id = d.device_id
+    WHERE f.fact_id > %s
+    ORDER BY f.fact_id
+    LIMIT {limit}
+"""
+
+
+def legacy_device_links(resolved):
+    """Distinct (LEGACY_MATCH_COLUMNS, device_id) pairs that resolved source rows link to"""
+    links = resolved[['app_id', 'price_id', 'date_id', 'contentRating_id', 'device_id']].copy()
+    links['android_version'] = normalize_column('android_version', resolved['Android Ver']).values
+    return links[LEGACY_MATCH_COLUMNS + ['device_id']].drop_duplicates()
+
+
+def check_legacy_fact_links(conn, expected_links, batch_size=10000):
+    """Compare stored facts of a warehouse loaded before source_key existed with legacy_device_links.
+
+    A fact whose match columns belong to a source row but whose device_id is
+    none of the devices that row resolves to is mis-linked. Facts are read in
+    fact_id pages of batch_size. Returns (mislinked_counts, checked, unmatched),
+    where unmatched facts have no source row with the same match columns.
+    """
+    expected_keys = expected_links[LEGACY_MATCH_COLUMNS].drop_duplicates()
+    columns = ['fact_id'] + LEGACY_MATCH_COLUMNS + ['device_id']
+    mislinked = checked = unmatched = 0
+    last_fact_id = 0
+    while True:
+        cur = conn.cursor()
+        try:
+            cur.execute(LEGACY_LINK_QUERY.format(limit=int(batch_size)), (last_fact_id,))
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+        if not rows:
+            break
+        facts = pd.DataFrame(rows, columns=columns)
+        last_fact_id = int(facts['fact_id'].iloc[-1])
+        facts['android_version'] = normalize_column('android_version', facts['android_version']).values
+
+        matched = facts.merge(expected_keys, how='left', on=LEGACY_MATCH_COLUMNS, indicator=True)['_merge'] == 'both'
+        linked = facts.merge(expected_links, how='left', on=LEGACY_MATCH_COLUMNS + ['device_id'],
+                             indicator=True)['_merge'] == 'both'
+        checked += len(facts)
+        unmatched += int((~matched).sum())
+        mislinked += int((matched & ~linked).sum())
+
+    counts = {'total': mislinked, 'device': mislinked} if mislinked else {}
+    return counts, checked, unmatched
+
+
+def print_mislink_report(mislinked_counts, total_checked, missing=0):
+    """Print how many checked facts were linked to the wrong member, per dimension"""
+    total = mislinked_counts.get('total', 0)
+    print(f"\n🔎 Fact link validation: {total}/{total_checked} facts linked to the wrong dimension member")
+    if missing:
+        print(f"- missing from fact table (re-inserted): {missing}")
+    for label, count in mislinked_counts.items():
+        if label != 'total':
+            print(f"- {label}: {count}")
@@ -0,0 +1,250 @@
+import csv
+import os
+import tempfile
+
+import pandas as pd
+
+from key_resolution import fetch_key_map, normalize_column
+
+FACT_COLUMNS = [
+    'app_id', 'device_id', 'date_id',
+    'price_id', 'contentRating_id',
+    'rating', 'total_reviews', 'total_installs',
+    'source_key'
+]
+
+# Kolom DataFrame hasil transform -> kolom fact_app_reviews
+FACT_SOURCE_COLUMNS = {
+    'Rating': 'rating',
+    'Reviews': 'total_reviews',
+    'Installs': 'total_installs',
+}
+
+INSERT_FACT_QUERY = f"""
+    INSERT INTO fact_app_reviews ({', '.join(FACT_COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(FACT_COLUMNS))})
+"""
+
+UPDATE_FACT_QUERY = f"""
+    UPDATE fact_app_reviews
+    SET {', '.join(f'{column} = %s' for column in FACT_COLUMNS[:-1])}
+    WHERE source_key = %s
+"""
+
+
+def bulk_upsert_dimension(conn, table, df, natural_key, batch_size=1000, existing=None):
+    """Insert only the dimension members that are not in the table yet.
+
+    df uses the DB column names of the dimension; natural_key is a column
+    name or a list of column names. existing is a key map returned by an
+    earlier call (skips the initial SELECT). Returns the full natural key -> ID
+    map of the table after the insert.
+    """
+    key_columns = [natural_key] if isinstance(natural_key, str) else list(natural_key)
+
+    if existing is None:
+        existing = fetch_key_map(conn, table, key_columns)
+
+    # Diff di pandas: anti-join baris baru terhadap key yang sudah ada
+    incoming = df.copy()
+    incoming_keys = pd.DataFrame({
+        column: normalize_column(column, incoming[column]).values for column in key_columns
+    }, index=incoming.index)
+    incoming_keys = incoming_keys.drop_duplicates(keep='first')
+    merged = incoming_keys.merge(existing[key_columns], how='left', on=key_columns, indicator=True)
+    is_new = (merged['_merge'] == 'left_only').to_numpy()
+    new_members = incoming.loc[incoming_keys.index[is_new]]
+
+    if new_members.empty:
+        return existing
+
+    columns = list(new_members.columns)
+    query = f"INSERT IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    rows = list(zip(*(new_members[column].tolist() for column in columns)))
+
+    inserted = 0
+    for start_idx in range(0, len(rows), batch_size):
+        batch_rows = rows[start_idx:start_idx + batch_size]
+        cur = conn.cursor()
+        try:
+            cur.executemany(query, batch_rows)
+            conn.commit()
+            inserted += len(batch_rows)
+        except Exception as e:
+            conn.rollback()
+            print(f"Error inserting batch to {table}: {e}")
+        finally:
+            cur.close()
+
+    print(f"{table}: {inserted}/{len(new_members)} new members inserted ({len(existing)} existing)")
+    key_map = fetch_key_map(conn, table, key_columns)
+
+    # Setiap key yang berbeda menurut pandas harus punya baris sendiri; INSERT IGNORE diam-diam
+    # membuang key yang dianggap sama oleh index (mis. collation case-insensitive)
+    new_keys = incoming_keys[is_new]
+    stored = new_keys.merge(key_map[key_columns], how='left', on=key_columns, indicator=True)
+    lost = stored[stored['_merge'] == 'left_only']
+    if len(lost):
+        example = tuple(lost.iloc[0][key_columns])
+        print(f"⚠️  {table}: {len(lost)} distinct natural keys were not stored (e.g. {example}); "
+              "check that the key columns compare case-sensitively (etl/migrations.py)")
+    return key_map
+
+
+def build_fact_rows(fact_df):
+    """Convert resolved fact rows into a list of plain Python tuples in FACT_COLUMNS order"""
+    facts = fact_df.rename(columns=FACT_SOURCE_COLUMNS)
+    columns = [
+        facts['app_id'].astype('int64'), facts['device_id'].astype('int64'), facts['date_id'].astype('int64'),
+        facts['price_id'].astype('int64'), facts['contentRating_id'].astype('int64'),
+        facts['rating'].astype(float), facts['total_reviews'].astype('int64'), facts['total_installs'].astype('int64'),
+        facts['source_key'].astype(str),
+    ]
+    # tolist() mengubah tipe numpy ke tipe Python agar bisa dikirim ke connector
+    return list(zip(*(col.tolist() for col in columns)))
+
+
+def insert_fact_batch(conn, rows):
+    """Insert one batch with executemany (sent as a single multi-row INSERT)"""
+    cur = conn.cursor()
+    try:
+        cur.executemany(INSERT_FACT_QUERY, rows)
+    finally:
+        cur.close()
+
+
+def load_data_value(value):
+    """CSV field for LOAD DATA: None/NaN is written as \\N (NULL); an empty field would load as 0"""
+    if value is None or (isinstance(value, float) and value != value):
+        return '\\N'
+    return value
+
+
+def load_data_batch(conn, rows):
+    """Insert one batch with LOAD DATA LOCAL INFILE from a temporary CSV file.
+
+    LOAD DATA LOCAL turns duplicate-key and conversion errors into warnings and
+    skips or alters those rows, so the batch fails (ValueError) when MySQL
+    reports fewer affected rows than were sent or any warning; load_facts then
+    rolls it back and retries row by row.
+    """
+    tmp = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False)
+    try:
+        with tmp:
+            csv.writer(tmp, lineterminator='\n').writerows(
+                [load_data_value(value) for value in row] for row in rows
+            )
+        path = tmp.name.replace('\\', '/')
+        cur = conn.cursor()
+        try:
+            cur.execute(f"""
+                LOAD DATA LOCAL INFILE '{path}'
+                INTO TABLE fact_app_reviews
+                FIELDS TERMINATED BY ','
+                LINES TERMINATED BY '\\n'
+                ({', '.join(FACT_COLUMNS)})
+            """)
+            loaded = cur.rowcount
+            cur.execute("SHOW WARNINGS")
+            warnings = cur.fetchall()
+        finally:
+            cur.close()
+    finally:
+        os.remove(tmp.name)
+    if loaded != len(rows) or warnings:
+        example = f", e.g. {warnings[0]}" if warnings else ""
+        raise ValueError(f"LOAD DATA stored {loaded}/{len(rows)} rows with {len(warnings)} warnings{example}")
+
+
+def insert_rows_individually(conn, rows, app_names):
+    """Fallback for a failed batch: insert row by row, skip bad rows, commit once.
+
+    Returns (loaded_keys, skipped): the source_keys of the rows that were committed.
+    """
+    loaded_keys = []
+    skipped = 0
+    cur = conn.cursor()
+    try:
+        for row, app_name in zip(rows, app_names):
+            try:
+                cur.execute(INSERT_FACT_QUERY, row)
+                loaded_keys.append(row[-1])
+            except Exception as e:
+                print(f"Error inserting fact for app '{app_name}': {e}")
+                skipped += 1
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error committing fallback batch: {e}")
+        return [], len(rows)
+    finally:
+        cur.close()
+    return loaded_keys, skipped
+
+
+def load_facts(conn, fact_df, batch_size=1000, mode='executemany'):
+    """Bulk load resolved fact rows, one transaction per batch.
+
+    mode is 'executemany' or 'load_data' (LOAD DATA LOCAL INFILE, needs a
+    connection with allow_local_infile=True). Returns (loaded_keys, skipped):
+    the source_keys of the rows that were committed, and the number of skipped rows.
+    """
+    if mode not in ('executemany', 'load_data'):
+        raise ValueError(f"Unknown fact load mode: {mode}")
+
+    rows = build_fact_rows(fact_df)
+    app_names = fact_df['App'].tolist() if 'App' in fact_df.columns else [None] * len(rows)
+    batch_loader = load_data_batch if mode == 'load_data' else insert_fact_batch
+
+    loaded_keys = []
+    skipped = 0
+    total_batches = (len(rows) + batch_size - 1) // batch_size
+
+    for batch_num in range(total_batches):
+        start_idx = batch_num * batch_size
+        end_idx = min(start_idx + batch_size, len(rows))
+        batch_rows = rows[start_idx:end_idx]
+
+        try:
+            batch_loader(conn, batch_rows)
+            conn.commit()
+            loaded_keys.extend(row[-1] for row in batch_rows)
+        except Exception as e:
+            conn.rollback()
+            print(f"Batch {batch_num + 1}/{total_batches} failed ({e}), retrying row by row...")
+            batch_loaded, batch_skipped = insert_rows_individually(
+                conn, batch_rows, app_names[start_idx:end_idx]
+            )
+            loaded_keys.extend(batch_loaded)
+            skipped += batch_skipped
+
+        # Progress update setiap 10 batch
+        if (batch_num + 1) % 10 == 0 or batch_num + 1 == total_batches:
+            print(f"Progress: {batch_num + 1}/{total_batches} batches completed ({len(loaded_keys)} rows loaded)")
+
+    return loaded_keys, skipped
+
+
+def update_facts(conn, fact_df, batch_size=1000):
+    """Update changed fact rows in place, matched on source_key.
+
+    Returns (updated_keys, skipped): the source_keys of the batches that were committed.
+    """
+    # source_key ada di posisi terakhir, cocok dengan urutan placeholder UPDATE_FACT_QUERY
+    rows = build_fact_rows(fact_df)
+    updated_keys = []
+    skipped = 0
+    for start_idx in range(0, len(rows), batch_size):
+        batch_rows = rows[start_idx:start_idx + batch_size]
+        cur = conn.cursor()
+        try:
+            cur.executemany(UPDATE_FACT_QUERY, batch_rows)
+            conn.commit()
+            updated_keys.extend(row[-1] for row in batch_rows)
+        except Exception as e:
+            conn.rollback()
+            print(f"Error updating fact batch: {e}")
+            skipped += len(batch_rows)
+        finally:
+            cur.close()
+    return updated_keys, skipped
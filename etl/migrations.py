@@ -0,0 +1,283 @@
+import os
+import re
+import sys
+from collections import namedtuple
+
+# Dijalankan langsung (python etl/migrations.py): common/ ada di root repo
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from common.warehouse import SCHEMA_PATH, create_warehouse
+from key_resolution import DIMENSION_KEYS
+
+IndexSpec = namedtuple('IndexSpec', ['name', 'table', 'columns', 'unique'])
+
+# Index yang tidak bisa diturunkan dari schema.sql: source_key unik per baris sumber (load incremental)
+# dan covering index berisi semua kolom fact yang dibaca query dashboard, sehingga JOIN cukup membaca index
+EXTRA_INDEXES = [
+    IndexSpec('ux_fact_source_key', 'fact_app_reviews', ['source_key'], True),
+    IndexSpec('idx_fact_dashboard_cover', 'fact_app_reviews',
+              ['app_id', 'price_id', 'contentRating_id', 'device_id', 'date_id',
+               'rating', 'total_reviews', 'total_installs'], False),
+]
+
+# Natural key dibandingkan case-sensitive di pandas ('AK-47 Sounds' != 'AK-47 sounds'). Collation
+# default MySQL (utf8mb4_0900_ai_ci) menganggap keduanya sama, sehingga UNIQUE index + INSERT IGNORE
+# diam-diam membuang ejaan kedua; kolom TEXT natural key karena itu memakai collation biner.
+# SQLite membandingkan TEXT secara biner secara default.
+KEY_COLLATION = 'utf8mb4_bin'
+
+# Panjang prefix index MySQL untuk kolom TEXT (kolom lain memakai DEFAULT_PREFIX_LENGTH)
+TEXT_PREFIX_LENGTHS = {'android_version': 32, 'content_rating': 64}
+DEFAULT_PREFIX_LENGTH = 191
+
+# Query yang dibandingkan query plan-nya sebelum dan sesudah migrasi
+PLAN_QUERIES = {
+    'app key lookup': "SELECT app_id FROM dim_app WHERE app_name = 'Instagram'",
+    'device key lookup': "SELECT device_id FROM dim_device WHERE android_version = '4.1' AND size_mb = 19",
+    'date key lookup': "SELECT date_id FROM dim_date WHERE release_date = '2018-08-03'",
+    'incremental update lookup': "SELECT fact_id FROM fact_app_reviews WHERE source_key = 'x'",
+    'dashboard join': """
+        SELECT f.fact_id, a.app_name, a.category, p.price_type, c.content_rating, d.size_mb,
+               dt.release_year, f.rating, f.total_reviews, f.total_installs
+        FROM fact_app_reviews f
+        JOIN dim_app a ON f.app_id = a.app_id
+        JOIN dim_price p ON f.price_id = p.price_id
+        JOIN dim_contentRating c ON f.contentRating_id = c.contentRating_id
+        JOIN dim_device d ON f.device_id = d.device_id
+        JOIN dim_date dt ON f.date_id = dt.date_id
+    """,
+}
+
+
+def read_schema_tables(path=SCHEMA_PATH):
+    """Isi CREATE TABLE dari schema.sql: [(table, body)]"""
+    with open(path) as f:
+        schema = f.read()
+    return re.findall(r'CREATE TABLE (\w+) \((.*?)\n\);', schema, flags=re.S)
+
+
+def parse_schema_columns(path=SCHEMA_PATH):
+    """Tipe kolom per tabel dari schema.sql: {table: {column: TYPE}}"""
+    tables = {}
+    for table, body in read_schema_tables(path):
+        columns = {}
+        for column, column_type in re.findall(r'^\s*(\w+)\s+([A-Z]+)', body, flags=re.M):
+            if column.upper() not in ('PRIMARY', 'UNIQUE', 'KEY', 'INDEX', 'FOREIGN'):
+                columns[column] = column_type
+        tables[table] = columns
+    return tables
+
+
+def parse_foreign_keys(path=SCHEMA_PATH):
+    """Kolom dengan klausa REFERENCES di schema.sql: [(table, column)]"""
+    return [(table, column)
+            for table, body in read_schema_tables(path)
+            for column in re.findall(r'^\s*(\w+)\s+\w+\s+REFERENCES\b', body, flags=re.M)]
+
+
+def build_indexes(path=SCHEMA_PATH):
+    """Index warehouse: natural key dimensi dari DIMENSION_KEYS (UNIQUE, supaya INSERT IGNORE
+    benar-benar mengabaikan duplikat), satu index per foreign key di schema.sql untuk JOIN dashboard
+    dan update incremental, lalu EXTRA_INDEXES."""
+    natural_keys = [IndexSpec(f"ux_{table.lower()}_key", table, list(key_columns), True)
+                    for table, (_, key_columns, _, _) in DIMENSION_KEYS.items()]
+    foreign_keys = [IndexSpec(f"idx_{table}_{column.lower()}", table, [column], False)
+                    for table, column in parse_foreign_keys(path)]
+    return natural_keys + foreign_keys + EXTRA_INDEXES
+
+
+INDEXES = build_indexes()
+
+
+def index_columns_sql(spec, warehouse, column_types):
+    """Daftar kolom index; di MySQL kolom TEXT butuh panjang prefix"""
+    parts = []
+    for column in spec.columns:
+        if warehouse.name == 'mysql' and column_types.get(spec.table, {}).get(column) == 'TEXT':
+            parts.append(f"{column}({TEXT_PREFIX_LENGTHS.get(column, DEFAULT_PREFIX_LENGTH)})")
+        else:
+            parts.append(column)
+    return ', '.join(parts)
+
+
+def text_key_columns(spec, column_types):
+    return [column for column in spec.columns if column_types.get(spec.table, {}).get(column) == 'TEXT']
+
+
+def ensure_case_sensitive_keys(conn, warehouse, column_types):
+    """Ubah kolom TEXT natural key di MySQL ke KEY_COLLATION (idempoten).
+
+    Mengembalikan set (table, column) yang sudah pasti case-sensitive; kolom yang
+    collation-nya tidak bisa dibaca atau diubah tidak termasuk.
+    """
+    columns = {
+        (spec.table, column)
+        for spec in INDEXES if spec.unique
+        for column in text_key_columns(spec, column_types)
+    }
+    if warehouse.name != 'mysql':
+        return columns
+
+    case_sensitive = set()
+    for table, column in sorted(columns):
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                "SELECT COLLATION_NAME FROM information_schema.COLUMNS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+                (table, column)
+            )
+            row = cur.fetchone()
+            if row is not None and row[0] != KEY_COLLATION:
+                cur.execute(f"ALTER TABLE {table} MODIFY {column} TEXT CHARACTER SET utf8mb4 COLLATE {KEY_COLLATION}")
+                conn.commit()
+                print(f"✅ {table}.{column}: collation {row[0]} -> {KEY_COLLATION}")
+            if row is not None:
+                case_sensitive.add((table, column))
+        except Exception as e:
+            conn.rollback()
+            print(f"⚠️  Could not make {table}.{column} case-sensitive: {e}")
+        finally:
+            cur.close()
+    return case_sensitive
+
+
+def same_column_indexes(spec, existing):
+    """Index yang sudah ada dengan daftar kolom sama dengan spec, apa pun namanya: {name: unique}"""
+    columns = [column.lower() for column in spec.columns]
+    return {name: unique for name, (index_columns, unique) in existing.items()
+            if [column.lower() for column in index_columns] == columns}
+
+
+def index_exists(spec, existing):
+    """Spec terpenuhi oleh index dengan kolom sama; natural key UNIQUE hanya oleh index unique,
+    kecuali index non-unique yang dibuat migrasi sebelumnya dengan nama spec (natural key dobel)"""
+    return any(unique or not spec.unique or name == spec.name
+               for name, unique in same_column_indexes(spec, existing).items())
+
+
+def drop_index(conn, warehouse, name, table):
+    statement = f"DROP INDEX {name} ON {table}" if warehouse.name == 'mysql' else f"DROP INDEX {name}"
+    cur = conn.cursor()
+    try:
+        cur.execute(statement)
+        conn.commit()
+        print(f"🧹 Dropped index {name} on {table}")
+    except Exception as e:
+        conn.rollback()
+        print(f"⚠️  Could not drop index {name} on {table}: {e}")
+    finally:
+        cur.close()
+
+
+def count_duplicate_keys(conn, spec):
+    columns = ', '.join(spec.columns)
+    not_null = ' AND '.join(f"{column} IS NOT NULL" for column in spec.columns)
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+            SELECT COUNT(*) FROM (
+                SELECT {columns} FROM {spec.table} WHERE {not_null}
+                GROUP BY {columns} HAVING COUNT(*) > 1
+            ) duplicates
+        """)
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+
+
+def query_plans(conn, warehouse):
+    plans = {}
+    for label, query in PLAN_QUERIES.items():
+        try:
+            plans[label] = warehouse.explain(conn, query)
+        except Exception as e:
+            plans[label] = [f"(explain failed: {e})"]
+    return plans
+
+
+def print_plan_report(before, after):
+    print("\n📋 Query plan report (before -> after):")
+    for label in PLAN_QUERIES:
+        print(f"\n[{label}]")
+        for line in before.get(label, []):
+            print(f"  before: {line}")
+        for line in after.get(label, []):
+            print(f"  after:  {line}")
+
+
+def apply_migrations(conn, warehouse, report=True):
+    """Buat index yang belum ada (idempoten) dan cetak query plan sebelum/sesudah.
+
+    Kolom TEXT natural key di MySQL dibuat case-sensitive dulu (KEY_COLLATION). Natural
+    key yang ternyata sudah dobel di warehouse lama, atau yang collation-nya tidak bisa
+    diubah, tidak dibuat UNIQUE; untuk tabel itu dibuat index biasa.
+    Index yang sudah ada dikenali dari daftar kolomnya, bukan namanya, sehingga index dengan
+    nama lama (warehouse SQLite lama: idx_app_name, idx_fact_app, ...) tidak dibuat dobel.
+    Mengembalikan daftar nama index yang dibuat.
+    """
+    column_types = parse_schema_columns()
+    # Dijalankan setiap run: warehouse lama bisa sudah punya UNIQUE index dengan collation case-insensitive
+    case_sensitive = ensure_case_sensitive_keys(conn, warehouse, column_types)
+    try:
+        existing = {table: warehouse.existing_indexes(conn, table) for table in {spec.table for spec in INDEXES}}
+    except Exception as e:
+        # Index hanya mempercepat query; ETL tetap jalan tanpa migrasi
+        print(f"⚠️  Could not read warehouse indexes, skipping migrations: {e}")
+        return []
+    missing = [spec for spec in INDEXES if not index_exists(spec, existing[spec.table])]
+    if not missing:
+        print("Warehouse indexes are up to date")
+        return []
+
+    before = query_plans(conn, warehouse) if report else {}
+    created = []
+    for spec in missing:
+        unique = spec.unique
+        if unique and any((spec.table, column) not in case_sensitive
+                          for column in text_key_columns(spec, column_types)):
+            # Tanpa collation biner UNIQUE index akan menggabungkan key yang hanya beda huruf besar/kecil
+            print(f"⚠️  {spec.table}: natural key is not case-sensitive, index {spec.name} will be non-unique")
+            unique = False
+        if unique:
+            duplicates = count_duplicate_keys(conn, spec)
+            if duplicates:
+                print(f"⚠️  {spec.table}: {duplicates} duplicate natural keys, index {spec.name} will be non-unique")
+                unique = False
+        superseded = [name for name, index_unique in same_column_indexes(spec, existing[spec.table]).items()
+                      if not index_unique]
+        if not unique and superseded:
+            # Index non-unique dengan kolom yang sama sudah ada (mis. idx_app_name dari warehouse SQLite lama)
+            print(f"Keeping existing non-unique index {superseded[0]} on {spec.table} instead of creating {spec.name}")
+            continue
+        statement = (f"CREATE {'UNIQUE ' if unique else ''}INDEX {spec.name} "
+                     f"ON {spec.table} ({index_columns_sql(spec, warehouse, column_types)})")
+        cur = conn.cursor()
+        try:
+            cur.execute(statement)
+            conn.commit()
+            created.append(spec.name)
+            print(f"✅ Created {'unique ' if unique else ''}index {spec.name} on {spec.table}")
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Failed to create index {spec.name}: {e}")
+            continue
+        finally:
+            cur.close()
+        # Index non-unique lama pada kolom yang sama tidak lagi berguna setelah UNIQUE index ada
+        for name in superseded:
+            drop_index(conn, warehouse, name, spec.table)
+
+    if report and created:
+        print_plan_report(before, query_plans(conn, warehouse))
+    return created
+
+
+if __name__ == '__main__':
+    warehouse = create_warehouse()
+    conn = warehouse.connect()
+    try:
+        warehouse.ensure_schema(conn)
+        apply_migrations(conn, warehouse)
+    finally:
+        conn.close()
@@ -0,0 +1,122 @@
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+# Whitespace ASCII yang dikenali \s (versi unicode) dan str.strip()
+_ASCII_SPACE = r'\t\n\x0b\x0c\r\x1c-\x1f '
+
+# Satu regex = ASCII folding + buang simbol: semua karakter non-ASCII otomatis tidak lolos
+APP_SYMBOLS = re.compile(rf'[^A-Za-z0-9_{_ASCII_SPACE}\-&]')
+TEXT_SYMBOLS = re.compile(rf'[^A-Za-z0-9_{_ASCII_SPACE}.\-@&]')
+
+# Karakter yang dibuang dari kolom angka, pakai str.translate (satu pass per nilai)
+SIZE_CHARS = str.maketrans('', '', 'Mk+')
+PRICE_CHARS = str.maketrans('', '', '$')
+INSTALLS_CHARS = str.maketrans('', '', ',+')
+
+
+def map_unique(series, func):
+    """Apply func to each distinct value once and broadcast the result back.
+
+    Values are passed through str() first, like Series.astype(str).
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    normalized = np.array([func(str(value)) for value in uniques], dtype=object)
+    return pd.Series(normalized[codes], index=series.index, dtype=object)
+
+
+def normalize_app_name(value):
+    return APP_SYMBOLS.sub('', value).strip()
+
+
+def normalize_text(value):
+    return TEXT_SYMBOLS.sub('', value).strip()
+
+
+def title_case(value):
+    return value.strip().title()
+
+
+def normalize_title(value):
+    return normalize_text(title_case(value))
+
+
+def normalize_android_version(value):
+    return normalize_text(value.strip().replace('and up', '').strip())
+
+
+def strip_size(value):
+    return value.translate(SIZE_CHARS)
+
+
+def strip_price(value):
+    return value.translate(PRICE_CHARS)
+
+
+def strip_installs(value):
+    return value.translate(INSTALLS_CHARS)
+
+
+# === BENCHMARK: chain lama vs normalizer satu pass ===
+
+def _chained(df):
+    """The previous multi-pass .str chain, kept only as the benchmark baseline"""
+    out = {}
+    app = df['App'].astype(str).str.encode('ascii', errors='ignore').str.decode('ascii')
+    app = app.str.replace(r'[^\w\s\-&]', '', regex=True).str.strip()
+    out['App'] = app.str.encode('ascii', errors='ignore').str.decode('ascii').str.replace(r'[^\w\s.\-@&]', '', regex=True).str.strip()
+    for col in ['Category', 'Genres']:
+        values = df[col].astype(str).str.strip().str.title()
+        values = values.str.encode('ascii', errors='ignore').str.decode('ascii')
+        out[col] = values.str.replace(r'[^\w\s.\-@&]', '', regex=True).str.strip()
+    out['Size'] = df['Size'].astype(str).str.replace('M', '', regex=False).str.replace('k', '', regex=False).str.replace('+', '', regex=False)
+    out['Price'] = df['Price'].astype(str).str.replace('$', '', regex=False)
+    out['Installs'] = df['Installs'].astype(str).str.replace(',', '', regex=False).str.replace('+', '', regex=False)
+    version = df['Android Ver'].astype(str).str.strip().str.replace('and up', '', regex=False).str.strip()
+    version = version.str.encode('ascii', errors='ignore').str.decode('ascii')
+    out['Android Ver'] = version.str.replace(r'[^\w\s.\-@&]', '', regex=True).str.strip()
+    return pd.DataFrame(out)
+
+
+def _single_pass(df):
+    return pd.DataFrame({
+        'App': map_unique(df['App'], normalize_app_name),
+        'Category': map_unique(df['Category'], normalize_title),
+        'Genres': map_unique(df['Genres'], normalize_title),
+        'Size': map_unique(df['Size'], strip_size),
+        'Price': map_unique(df['Price'], strip_price),
+        'Installs': map_unique(df['Installs'], strip_installs),
+        'Android Ver': map_unique(df['Android Ver'], normalize_android_version),
+    })
+
+
+def benchmark(csv_path, copies=10, rounds=3):
+    """Time the old chain against the single-pass normalizer on copies x the source CSV"""
+    df = pd.read_csv(csv_path)
+    df.columns = df.columns.str.strip()
+    df = pd.concat([df] * copies, ignore_index=True)
+
+    pd.testing.assert_frame_equal(_chained(df), _single_pass(df))
+
+    timings = {}
+    for name, func in [('chain lama', _chained), ('single pass', _single_pass)]:
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func(df)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+        print(f"{name:<12} {best:.3f}s ({len(df)} rows)")
+    print(f"Speedup: {timings['chain lama'] / timings['single pass']:.1f}x")
+    return timings
+
+
+if __name__ == '__main__':
+    import os
+    import sys
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    benchmark(os.path.join(base_dir, "../data/app-playstore.csv"), copies=copies)
@@ -0,0 +1,106 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from common.snapshot import SNAPSHOT_JOINS, SNAPSHOT_PATH, SNAPSHOT_QUERY, SNAPSHOT_SCHEMA_VERSION
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+except ImportError:  # snapshot opsional, dashboard fallback ke JOIN
+    pa = None
+
+
+def _snapshot_schema():
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('fact_id', pa.int64()),
+        ('app_name', pa.string()),
+        ('category', dictionary),
+        ('genres', dictionary),
+        ('current_ver', pa.string()),
+        ('price_value', pa.float64()),
+        ('price_type', dictionary),
+        ('content_rating', dictionary),
+        ('android_version', dictionary),
+        ('size_mb', pa.float64()),
+        ('release_date', pa.date32()),
+        ('release_month', dictionary),
+        ('release_year', pa.int64()),
+        ('rating', pa.float64()),
+        ('total_reviews', pa.int64()),
+        ('total_installs', pa.int64()),
+    ])
+
+
+def write_snapshot(conn, run_id, path=SNAPSHOT_PATH):
+    """Tulis tabel fact yang sudah di-join sebagai file Arrow IPC (tanpa kompresi, bisa di-memory-map).
+
+    Metadata schema berisi versi schema, run id ETL dan jumlah baris. File ditulis
+    ke file sementara lalu di-rename, jadi pembaca tidak pernah melihat file setengah jadi.
+    """
+    if pa is None:
+        print("⚠️  pyarrow not installed, skipping snapshot")
+        return None
+
+    cur = conn.cursor()
+    try:
+        cur.execute(SNAPSHOT_QUERY)
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+
+    schema = _snapshot_schema()
+    df = pd.DataFrame(rows, columns=schema.names)
+    df['release_date'] = pd.to_datetime(df['release_date'], errors='coerce').dt.date
+    for field in schema:
+        if pa.types.is_floating(field.type):
+            df[field.name] = pd.to_numeric(df[field.name], errors='coerce')
+
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    table = table.replace_schema_metadata({
+        'schema_version': str(SNAPSHOT_SCHEMA_VERSION),
+        'run_id': run_id,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'row_count': str(table.num_rows),
+    })
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    print(f"✅ Snapshot written: {table.num_rows} rows -> {path}")
+    return path
+
+
+def compute_dataset_summary(conn):
+    """Dataset summary for the dashboard header and filters, computed with SQL over the snapshot join.
+
+    Same keys and values as compute_dataset_summary in dashboard/functions.py,
+    so the dashboard can build its layout from the run log instead of the rows.
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT COUNT(*), AVG(f.rating), SUM(f.total_installs), MIN(f.rating), MAX(f.rating) "
+                    f"{SNAPSHOT_JOINS}")
+        total_apps, avg_rating, total_installs, rating_min, rating_max = cur.fetchone()
+        cur.execute(f"SELECT DISTINCT a.category {SNAPSHOT_JOINS}")
+        categories = sorted(row[0] for row in cur.fetchall() if row[0] is not None)
+    finally:
+        cur.close()
+
+    if not total_apps:
+        return {'total_apps': 0, 'avg_rating': 0.0, 'total_installs': 0.0, 'category_count': 0,
+                'categories': [], 'rating_min': 0, 'rating_max': 5}
+    return {
+        'total_apps': int(total_apps),
+        'avg_rating': float(avg_rating),
+        'total_installs': float(total_installs),
+        'category_count': len(categories),
+        'categories': categories,
+        'rating_min': float(rating_min),
+        'rating_max': float(rating_max),
+    }
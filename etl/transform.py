@@ -0,0 +1,143 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from normalize import (map_unique, normalize_android_version, normalize_app_name, normalize_text,
+                       normalize_title, strip_installs, strip_price, strip_size, title_case)
+
+# Kolom yang sudah dinormalisasi penuh sebelum loop string terakhir
+NORMALIZED_COLUMNS = ['App', 'Category', 'Genres', 'Content Rating', 'Android Ver']
+
+# Kolom berkardinalitas kecil, dibawa sebagai categorical setelah cleaning
+CATEGORICAL_COLUMNS = ['Category', 'Genres', 'Content Rating', 'Type', 'Android Ver', 'release_month']
+
+
+def filter_rows(df):
+    """Drop rows the warehouse cannot use ('Varies with device', 'Unknown', missing keys)"""
+    # HAPUS baris yang mengandung "Varies with device" di kolom Size
+    df = df[df['Size'] != 'Varies with device']
+    df = df[df['Android Ver'] != 'Varies with device']
+
+    # HAPUS baris yang mengandung "Unknown" di kolom Category atau Genres
+    df = df[df['Category'] != 'Unknown']
+    df = df[df['Genres'] != 'Unknown']
+
+    # HAPUS baris dengan nilai NaN di kolom penting
+    return df.dropna(subset=['App', 'Category', 'Genres']).copy()
+
+
+def clean_ratings(df):
+    return pd.to_numeric(df['Rating'], errors='coerce')
+
+
+def clean_dataframe(df, mean_rating=None):
+    """Run the full clean/transform on one frame of raw CSV rows.
+
+    mean_rating is used to fill missing ratings; when None it is taken from
+    this frame, which is only correct when the frame is the whole source.
+    """
+    df = filter_rows(df)
+
+    # String dinormalisasi satu pass per nilai unik (lihat normalize.py)
+    # App: buang emoji/simbol aneh tapi tetap pertahankan huruf, angka, spasi, &, -
+    df['App'] = map_unique(df['App'], normalize_app_name)
+
+    # Konsisten kapitalisasi (misal 'Everyone' bukan 'everyone')
+    for col in ['Category', 'Genres']:
+        df[col] = map_unique(df[col], normalize_title)
+    df['Content Rating'] = map_unique(df['Content Rating'], title_case)
+
+    # Clean kolom Size (sekarang tidak ada 'Varies with device')
+    df['Size'] = map_unique(df['Size'], strip_size)
+    df['Size'] = pd.to_numeric(df['Size'], errors='coerce').fillna(0)
+
+    # Clean kolom Price
+    df['Price'] = map_unique(df['Price'], strip_price)
+    df['Price'] = pd.to_numeric(df['Price'], errors='coerce').fillna(0)
+
+    # Buat kolom Type berdasarkan Price
+    df['Type'] = df['Price'].apply(lambda x: 'Free' if x == 0 else 'Paid')
+
+    # Clean kolom Installs
+    df['Installs'] = map_unique(df['Installs'], strip_installs)
+    df['Installs'] = pd.to_numeric(df['Installs'], errors='coerce').fillna(0)
+
+    # Clean Rating dan Reviews
+    df['Rating'] = clean_ratings(df)
+    if mean_rating is None:
+        mean_rating = df['Rating'].mean()
+    df['Rating'] = df['Rating'].fillna(mean_rating)
+    df['Reviews'] = pd.to_numeric(df['Reviews'], errors='coerce').fillna(0)
+
+    # Fill missing values dengan nilai default yang masuk akal
+    df['Content Rating'] = df['Content Rating'].fillna('Everyone')
+    df['Current Ver'] = df['Current Ver'].fillna('1.0')
+    df['Android Ver'] = df['Android Ver'].fillna('4.0 and up')
+    df['Android Ver'] = map_unique(df['Android Ver'], normalize_android_version)  # buang "and up"
+
+    # Process dates (format eksplisit supaya hasil parsing sama di setiap chunk)
+    df['Released'] = pd.to_datetime(df['Released'], format='%B %d, %Y', errors='coerce')
+    default_date = pd.Timestamp('2018-01-01')
+    df['release_date'] = df['Released'].fillna(default_date)
+    df['release_month'] = df['release_date'].dt.strftime('%B')
+    df['release_year'] = df['release_date'].dt.year
+
+    string_cols = df.select_dtypes(include='object').columns
+    for col in string_cols:
+        if col in NORMALIZED_COLUMNS:  # Content Rating di-skip agar tanda + tidak dihilangkan
+            continue
+        df[col] = map_unique(df[col], normalize_text)
+
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+
+    return df
+
+
+def clean_chunks(chunks, mean_rating, workers=1):
+    """Clean an iterator of raw chunks, yielding (rows_read, cleaned_df) in input order.
+
+    With workers > 1 the chunks are cleaned by a process pool. At most
+    2 * workers chunks are in flight, so memory stays bounded, and results
+    are yielded in submission order so the output matches the serial path.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield len(chunk), clean_dataframe(chunk, mean_rating)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), executor.submit(clean_dataframe, chunk, mean_rating)))
+            if len(pending) >= workers * 2:
+                rows_read, future = pending.popleft()
+                yield rows_read, future.result()
+        while pending:
+            rows_read, future = pending.popleft()
+            yield rows_read, future.result()
+
+
+def build_dimensions(df):
+    """Build the dimension members of a cleaned frame, using the DB column names"""
+    dim_app = df.groupby('App', as_index=False).agg({
+        'Category': 'first',
+        'Genres': 'first',
+        'Current Ver': 'first'
+    })
+    return {
+        'dim_app': dim_app.rename(columns={
+            'App': 'app_name', 'Category': 'category', 'Genres': 'genres', 'Current Ver': 'current_ver'
+        }),
+        'dim_price': df[['Price', 'Type']].drop_duplicates().rename(columns={
+            'Price': 'price_value', 'Type': 'price_type'
+        }),
+        'dim_contentRating': df[['Content Rating']].drop_duplicates().rename(columns={
+            'Content Rating': 'content_rating'
+        }),
+        'dim_device': df[['Android Ver', 'Size']].drop_duplicates().rename(columns={
+            'Android Ver': 'android_version', 'Size': 'size_mb'
+        }),
+        'dim_date': df[['release_date', 'release_month', 'release_year']].drop_duplicates(),
+    }